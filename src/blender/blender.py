@@ -1,11 +1,33 @@
+import os
 import bpy
+import bmesh
 import addon_utils
 import numpy as np
-import pathlib
 import glob
+from collections import deque, OrderedDict
 
 import src.blender.object as o  # noqa: E402
-import src.util.parser as p  # noqa: E402
+from src.util.configuration import load_configuration  # noqa: E402
+import src.util.bounds as bounds  # noqa: E402
+import src.util.poses as poses  # noqa: E402
+import src.util.masks as masks  # noqa: E402
+from src.util.cache import load_array, save_array  # noqa: E402
+from src.util.cache import hash_key, model_files, library_path  # noqa: E402
+
+# Paths of the background images, listed on first use
+backgrounds = []
+# Render engine Blender was started with, e.g. with -E CYCLES
+startup_engine = bpy.context.scene.render.engine
+
+
+def list_backgrounds():
+    """
+    Lists the background images, the folder is only read once per process.
+    :return: sorted list of paths to the background images
+    """
+    if not backgrounds:
+        backgrounds.extend(sorted(glob.glob('/workdir/Backgrounds/*.jpg')))
+    return backgrounds
 
 
 class Blender:
@@ -18,6 +40,17 @@ class Blender:
     # built-in functions.
     def __init__(self):
         self.camera = None
+        # Convex hull vertices and resting poses of the imported models by object name
+        self.hulls = {}
+        self.poses = {}
+        # Object and mesh name of the first import of every model by path
+        self.imported = {}
+        # Names of the loaded background images by path, the least recently used first
+        self.background_pool = OrderedDict()
+        # Names of the images evicted from the pool while still in use, removed once unused
+        self.evicted_backgrounds = []
+        # Area the labeled objects would cover if nothing hid them, by pass index - 1
+        self.silhouette_areas = []
 
     def clear_scene(self, except_objects):
         """
@@ -29,6 +62,16 @@ class Blender:
         self.select_objects(except_objects)
         bpy.ops.object.delete()
 
+    def reset_scene(self):
+        """
+        Loads the default scene, undoing everything a previous run added to it.
+        The render engine Blender was started with is kept, the default scene has its own.
+        :return: None
+        """
+        bpy.ops.wm.read_homefile()
+        bpy.context.scene.render.engine = startup_engine
+        self.forget_backgrounds()
+
     def setup_camera(self, coordinates, rotation):
         """
         Places camera at inputted coordinates.
@@ -57,33 +100,237 @@ class Blender:
         light_data.type = type  # in ['POINT', 'SUN', 'SPOT', 'HEMI', 'AREA']
         light_object.location = coordinates
 
-    def setup_object(self, object):
+    def setup_object(self, object, linked=True):
         """
         Imports the object from variable path.
         :param object: object to be setup.
-        :return: None
+        :param linked: Boolean, share the mesh with earlier imports of the same model,
+        False for a model whose mesh is going to be changed.
+        :return: the imported Blender object
         """
         # Import the current object (of input material) to the scene
-        bpy.ops.import_scene.obj(filepath=object.path)
-        obj = bpy.context.selected_objects[0]
+        obj = self.import_model(object.path, linked)
+        self.hulls[obj.name] = self.get_hull(obj, object.path)
+        self.poses[obj.name] = load_array(object.path, 'poses')
+        self.apply_skin(obj, object)
         self.set_object_location(obj, object.location)
         self.set_object_orientation(obj, object.orientation)
         # self.color_object(obj, object.color)
         return obj
 
-    def reset_objects(self):
+    def import_model(self, path, linked=True):
+        """
+        Imports a model once, later imports of the same model are linked duplicates:
+        new objects sharing the mesh of the first import, with their own transform and materials.
+        :param path: path to the obj file of the model.
+        :param linked: Boolean, share the mesh with earlier imports of the same model.
+        :return: the new Blender object
+        """
+        name, mesh_name = self.imported.get(path, ('', ''))
+        mesh = bpy.data.meshes.get(mesh_name)
+        # The mesh is gone or replaced when the scene was reset
+        if not linked or mesh is None or mesh.get('source') != path:
+            obj = self.load_model(path)
+            if linked:
+                self.imported[path] = (obj.name, obj.data.name)
+        else:
+            obj = bpy.data.objects.new(name, mesh)
+            bpy.context.collection.objects.link(obj)
+        self.link_materials(obj)
+        return obj
+
+    def load_model(self, path):
+        """
+        Loads a model from the Blender library it was converted to,
+        the obj file is only imported if there is no library yet or the model changed.
+        :param path: path to the obj file of the model.
+        :return: the new Blender object
+        """
+        obj = self.append_library(path)
+        if obj is None:
+            bpy.ops.import_scene.obj(filepath=path)
+            obj = bpy.context.selected_objects[0]
+            obj.data['source'] = path
+            self.write_library(obj, path)
+        return obj
+
+    def append_library(self, path):
+        """
+        Appends the object of the library of a model to the scene.
+        A library older than the model is only used if the model files still have the same hash.
+        :param path: path to the obj file of the model.
+        :return: the new Blender object or None if there is no library or it is outdated
+        """
+        library = library_path(path)
+        if not os.path.exists(library):
+            return None
+        with bpy.data.libraries.load(library) as (data_from, data_to):
+            data_to.objects = data_from.objects[:1]
+        obj = data_to.objects[0]
+        if os.path.getmtime(library) < max(map(os.path.getmtime, model_files(path))):
+            if obj.data.get('source_hash') != hash_key(model_files(path), {}):
+                bpy.data.objects.remove(obj)
+                return None
+            os.utime(library)
+        bpy.context.collection.objects.link(obj)
+        return obj
+
+    def write_library(self, obj, path):
+        """
+        Converts an imported model to a Blender library, which loads faster than the obj file.
+        :param obj: Blender object imported from the model.
+        :param path: path to the obj file of the model.
+        :return: None
+        """
+        obj.data['source_hash'] = hash_key(model_files(path), {})
+        library = library_path(path)
+        temporary_path = f'{library}.{os.getpid()}.blend'
+        bpy.data.libraries.write(temporary_path, {obj})
+        os.replace(temporary_path, library)
+
+    def link_materials(self, obj):
+        """
+        Moves the materials of an object from its mesh to the object itself,
+        so changing them does not change the other objects sharing the mesh.
+        :param obj: Blender object.
+        :return: None
+        """
+        for slot in obj.material_slots:
+            material = slot.material
+            slot.link = 'OBJECT'
+            slot.material = material
+
+    def apply_skin(self, obj, object):
+        """
+        Gives an imported model the skin chosen for the object.
+        :param obj: imported Blender object.
+        :param object: Object with the chosen skin.
+        :return: None
+        """
+        if object.skin_color is not None:
+            self.color_object(obj, object.skin_color)
+        if object.texture is not None:
+            self.set_texture(obj, object.texture, object.texture_slots)
+
+    def set_texture(self, obj, path, count):
+        """
+        Replaces the image of the textured materials of an object.
+        The materials are copied when they are shared, so other objects keep their skin.
+        An image is only read once, after that it is reused from bpy.data.images.
+        :param obj: Blender object.
+        :param path: path to the image.
+        :param count: integer number of textured materials to change, in the order of the slots.
+        :return: None
+        """
+        image = bpy.data.images.load(path, check_existing=True)
+        textured = [slot for slot in obj.material_slots if slot.material is not None and
+                    slot.material.use_nodes and any(node.type == 'TEX_IMAGE' for node in
+                                                    slot.material.node_tree.nodes)]
+        for slot in textured[:count]:
+            if slot.material.users > 1:
+                slot.material = slot.material.copy()
+            for node in slot.material.node_tree.nodes:
+                if node.type == 'TEX_IMAGE':
+                    node.image = image
+
+    def get_hull(self, obj, path):
+        """
+        Gets the convex hull of an imported model, from the cache next to the model if it is there.
+        :param obj: imported object of the model.
+        :param path: path to the obj file of the model.
+        :return: (N, 3) array of hull vertices in local coordinates
+        """
+        hull = load_array(path, 'hull')
+        if hull is None:
+            hull = self.convex_hull(obj)
+            save_array(path, 'hull', hull)
+        return hull
+
+    def convex_hull(self, obj):
+        """
+        Computes the vertices of the convex hull of the mesh of an object.
+        Flat meshes have no hull, for these all vertices are kept.
+        :param obj: mesh object.
+        :return: (N, 3) array of hull vertices in local coordinates
+        """
+        bm = bmesh.new()
+        bm.from_mesh(obj.data)
+        result = bmesh.ops.convex_hull(bm, input=bm.verts)
+        hull = [v.co[:] for v in result['geom'] if isinstance(v, bmesh.types.BMVert)]
+        if len(hull) < 4:
+            hull = [v.co[:] for v in bm.verts]
+        bm.free()
+        return np.array(hull, dtype=np.float64)
+
+    def reset_objects(self, seed=None):
         """
         Resets the objects above the plane.
+        :param seed: integer or numpy Generator for predicting randomness or None
         :return: none
         """
         self.select_objects(['background', 'border_1', 'border_2', 'border_3', 'border_4'])
-        random_object = o.Object(None, 'random', 'random', 'random', None)
-        for obj in bpy.context.selected_objects:
-            random_object.randomize_object(None)
-            self.set_object_location(obj, random_object.location)
-            self.set_object_orientation(obj, random_object.orientation)
+        names = [obj.name for obj in bpy.context.selected_objects]
+        random_object = o.Object(None, 'random', 'random', 'random', seed)
+        self.set_transforms(names, *random_object.random_transforms(len(names)))
         #  self.color_object(obj, random_object.color)
 
+    def place_from_pose_bank(self, attempts, extent, seed=None):
+        """
+        Places the objects above the plane in resting poses recorded by src/blender/pose_bank.py,
+        so they do not have to be simulated.
+        :param attempts: integer number of draws per object before giving up.
+        :param extent: float, objects are placed within this distance from the center.
+        :param seed: integer or numpy Generator for predicting randomness or None
+        :return: True if the objects were placed, False if a model has no poses or they do not fit
+        """
+        names = self.get_object_names()
+        banks = [self.poses.get(name) for name in names]
+        if any(bank is None for bank in banks):
+            return False
+        layout = poses.sample_layout(banks, np.random.default_rng(seed), extent, attempts)
+        if layout is None:
+            return False
+        self.set_transforms(names, [location for location, _ in layout],
+                            [orientation for _, orientation in layout])
+        # Before the first frame rigid bodies keep the transforms they were given
+        bpy.context.scene.frame_set(0)
+        return True
+
+    def setup_drop_plane(self, size):
+        """
+        Sets up a plane to drop models on, named like the background so it is not a model itself.
+        :param size: float length of the sides of the plane.
+        :return: None
+        """
+        bpy.ops.mesh.primitive_plane_add(size=size, location=(0, 0, 0))
+        bpy.ops.rigidbody.object_add(type='PASSIVE')
+        bpy.context.active_object.name = 'background'
+
+    def duplicate_object(self, obj, location, orientation):
+        """
+        Adds a copy of an object sharing its mesh.
+        :param obj: object to be copied.
+        :param location: list with 3 entries specifying x,y,z coordinates of the copy.
+        :param orientation: list with 3 entries specifying rotation of the copy.
+        :return: the copy
+        """
+        copy = obj.copy()
+        bpy.context.collection.objects.link(copy)
+        self.hulls[copy.name] = self.hulls.get(obj.name)
+        self.set_object_location(copy, location)
+        self.set_object_orientation(copy, orientation)
+        return copy
+
+    def get_resting_pose(self, obj):
+        """
+        Gets the pose a simulated object came to rest in.
+        :param obj: imported object or copy of one.
+        :return: array (z, rotation x, rotation y, rotation z, footprint radius)
+        """
+        matrix = obj.evaluated_get(bpy.context.evaluated_depsgraph_get()).matrix_world
+        return poses.resting_pose(self.hulls[obj.name], matrix.translation[:],
+                                  matrix.to_euler('XYZ')[:])
+
     def setup_border_plane(self, axis, translation, name):
         """
         Sets up vertical individual border plane.
@@ -117,7 +364,7 @@ class Blender:
         :param filename: string name of backgorund to be added.
         :param x_size: integer for x_size.
         :param y_size: integer for y_size.
-        :param seed: integer for predicting randomness
+        :param seed: integer or numpy Generator for predicting randomness or None
         :return: None
         """
         # Automatically enable 'Import-Export: Import images as Planes'
@@ -133,22 +380,118 @@ class Blender:
         plane.name = 'background'
         # Scale background to fit in camera
         plane.dimensions = (x_size, y_size, 1)
+        self.load_background(filename, None)
 
     def choose_background(self, filename, seed):
         """
         Method used for getting the right background or a random one
         :param filename: string name of file or 'random' for random
-        :param seed: integer for predicting randomness
+        :param seed: integer or numpy Generator for predicting randomness or None
         :return: string name of file
         """
-        if seed is not None:
-            np.random.seed(seed)
         if filename == 'random':
-            path = np.random.choice(glob.glob('/workdir/Backgrounds/*.jpg'))
+            path = str(np.random.default_rng(seed).choice(list_backgrounds()))
         else:
             path = '/workdir/Backgrounds/' + filename
         return path
 
+    def swap_background(self, filename, seed, pool_size=None):
+        """
+        Replaces the image of the background plane, without importing a new plane.
+        :param filename: string name of file or 'random' for random
+        :param seed: integer or numpy Generator for predicting randomness or None
+        :param pool_size: integer number of background images kept loaded, all if None
+        :return: None
+        """
+        image = self.load_background(self.choose_background(filename, seed), pool_size)
+        for node in bpy.data.objects['background'].active_material.node_tree.nodes:
+            if node.type == 'TEX_IMAGE':
+                node.image = image
+        self.release_backgrounds()
+
+    def get_background(self):
+        """
+        Gets the image shown on the background plane.
+        :return: string file name of the background image
+        """
+        image = self.background_image()
+        return None if image is None else os.path.basename(image.filepath)
+
+    def background_image(self):
+        """
+        Gets the image the background plane shows.
+        :return: the image or None
+        """
+        for node in bpy.data.objects['background'].active_material.node_tree.nodes:
+            if node.type == 'TEX_IMAGE':
+                return node.image
+        return None
+
+    def load_background(self, path, pool_size):
+        """
+        Gets a background image from the pool of loaded backgrounds, loading it if needed.
+        The least recently used images are evicted when the pool is full, and removed from
+        memory as soon as nothing uses them anymore.
+        :param path: path to the background image.
+        :param pool_size: integer number of background images kept loaded, all if None
+        :return: the image
+        """
+        image = bpy.data.images.load(path, check_existing=True)
+        self.background_pool.pop(path, None)
+        self.background_pool[path] = image.name
+        if image.name in self.evicted_backgrounds:
+            self.evicted_backgrounds.remove(image.name)
+        while pool_size is not None and len(self.background_pool) > pool_size:
+            self.evicted_backgrounds.append(self.background_pool.popitem(last=False)[1])
+        self.release_backgrounds()
+        return image
+
+    def release_backgrounds(self):
+        """
+        Removes the evicted background images from memory that are not used anymore.
+        :return: None
+        """
+        in_use = []
+        for name in self.evicted_backgrounds:
+            image = bpy.data.images.get(name)
+            if image is not None and image.users > 0:
+                in_use.append(name)
+            elif image is not None:
+                bpy.data.images.remove(image)
+        self.evicted_backgrounds = in_use
+
+    def forget_backgrounds(self):
+        """
+        Empties the pool of loaded backgrounds, for when a new scene replaced their images.
+        :return: None
+        """
+        self.background_pool.clear()
+        self.evicted_backgrounds = []
+
+    def save_template(self, path):
+        """
+        Saves the current scene as a template to start later runs from.
+        :param path: path of the .blend file.
+        :return: None
+        """
+        temporary_path = f'{path}.{os.getpid()}.blend'
+        bpy.ops.wm.save_as_mainfile(filepath=temporary_path, copy=True)
+        os.replace(temporary_path, path)
+
+    def open_template(self, path):
+        """
+        Replaces the current scene by a saved template, the pool of loaded backgrounds starts
+        over from the background of the template.
+        :param path: path of the .blend file.
+        :return: None
+        """
+        bpy.ops.wm.open_mainfile(filepath=path)
+        self.camera = bpy.context.scene.camera
+        self.forget_backgrounds()
+        image = self.background_image()
+        if image is not None:
+            self.load_background(bpy.path.abspath(image.filepath), None)
+
     def setup_crush_plane(self):
         """
         Setup plane for curshing.
@@ -180,6 +523,29 @@ class Blender:
         obj.rotation_euler[1] = orientation[1]
         obj.rotation_euler[2] = orientation[2]
 
+    def set_transforms(self, names, locations, orientations):
+        """
+        Places and rotates a number of objects at once. The transforms of all objects are read
+        and written in one call per property, instead of one call per coordinate of each object.
+        :param names: list of N object names.
+        :param locations: (N, 3) array of x,y,z coordinates.
+        :param orientations: (N, 3) array of rotations.
+        :return: None, raises KeyError if an object does not exist
+        """
+        objects = bpy.data.objects
+        indices = [objects.find(name) for name in names]
+        if -1 in indices:
+            raise KeyError(f'object {names[indices.index(-1)]} does not exist')
+        for attribute, values in [('location', locations), ('rotation_euler', orientations)]:
+            transforms = np.empty(len(objects) * 3, dtype=np.float32)
+            objects.foreach_get(attribute, transforms)
+            transforms = transforms.reshape(-1, 3)
+            transforms[indices] = np.reshape(values, (-1, 3))
+            objects.foreach_set(attribute, transforms.ravel())
+        # Writing in bulk skips the updates of the objects, so they are tagged afterwards
+        for name in names:
+            objects[name].update_tag(refresh={'OBJECT'})
+
     def select_objects(self, except_objects):
         """
         Select all models except for the names given.
@@ -211,17 +577,54 @@ class Blender:
             # Add rigid body to object
             self.activate_model(obj)
             bpy.ops.rigidbody.object_add()
+            # Collide with the hull of the undeformed mesh, Bullet builds it once per simulation
+            obj.rigid_body.collision_shape = 'CONVEX_HULL'
+            obj.rigid_body.mesh_source = 'BASE'
 
-    def simulate(self, frames):
+    def simulate(self, frames, threshold=None, window=5):
         """
         Simulates in blender for a certain amount of frames.
-        :param frames: integer amount of frames to simulate
-        :return: None
+        With a threshold it stops early, once no rigid body moved or turned more than the
+        threshold during the last window of frames.
+        :param frames: integer amount of frames to simulate, at most if there is a threshold
+        :param threshold: tuple (distance, angle in radians) or None to simulate all frames
+        :param window: integer number of frames the bodies have to be at rest for
+        :return: integer number of the last simulated frame
         """
         scene = bpy.data.scenes['Scene']
         scene.frame_set(0)
+        history = deque(maxlen=window + 1)
         for i in range(1, frames):
             scene.frame_set(i)
+            if threshold is not None:
+                history.append(self.get_body_matrices())
+                if len(history) > window and poses.at_rest(history[0], history[-1], *threshold):
+                    return i
+        return frames - 1
+
+    def get_transforms(self, names):
+        """
+        Gets the locations and orientations of objects where they are shown,
+        after a simulation these are the simulated ones.
+        :param names: list of N object names.
+        :return: tuple of (N, 3) arrays (locations, orientations)
+        """
+        depsgraph = bpy.context.evaluated_depsgraph_get()
+        matrices = [bpy.data.objects[name].evaluated_get(depsgraph).matrix_world
+                    for name in names]
+        return (np.array([matrix.translation[:] for matrix in matrices]).reshape(-1, 3),
+                np.array([matrix.to_euler('XYZ')[:] for matrix in matrices]).reshape(-1, 3))
+
+    def get_body_matrices(self):
+        """
+        Gets the simulated world matrices of the active rigid bodies.
+        :return: (N, 4, 4) array of world matrices
+        """
+        depsgraph = bpy.context.evaluated_depsgraph_get()
+        return np.array([np.array(obj.evaluated_get(depsgraph).matrix_world)
+                         for obj in bpy.context.scene.objects
+                         if obj.rigid_body is not None and obj.rigid_body.type == 'ACTIVE']
+                        ).reshape(-1, 4, 4)
 
     def render(self, src_dir, output_location, name):
         """
@@ -242,25 +645,86 @@ class Blender:
         bpy.ops.render.render(write_still=True)
         print('Rendering done!')
 
-    def set_render_output_parameters(self):
+    def set_render_output_parameters(self, render_configuration=None):
         """
         Sets the render output parameters which it gets from configuration.yaml
-        The parameters that will be changed are x and y resolution and percentage,
-        max amount of ray tracing bounces, samples, tile size
-        and set denoising to True.
+        The parameters that will be changed are the render engine, x and y resolution and
+        percentage, tile size and the samples of the engine, for Cycles also the max amount of
+        ray tracing bounces, adaptive sampling and denoising. With masks an object index pass is
+        rendered as well, only Cycles has one.
+        :param render_configuration: dictionary with the render configuration,
+        the one of configuration.yaml if None
         :return: None
         """
+        if render_configuration is None:
+            render_configuration = load_configuration()['render']
         scene = bpy.context.scene
-        configuration = p.Parser().parse_long_term_configuration(pathlib.Path(
-            '/workdir' + r"/configuration.yaml"))
-        scene.render.resolution_x = configuration['render']['res_width']
-        scene.render.resolution_y = configuration['render']['res_height']
-        scene.render.resolution_percentage = configuration['render']['res_percentage']
-        scene.cycles.max_bounces = configuration['render']['max_bounces']
-        scene.cycles.samples = configuration['render']['samples']
-        scene.render.tile_x = configuration['render']['tile_x']
-        scene.render.tile_y = configuration['render']['tile_y']
-        scene.view_layers['View Layer'].cycles.use_denoising = True
+        scene.render.engine = render_configuration.get('engine', 'CYCLES')
+        scene.render.resolution_x = render_configuration['res_width']
+        scene.render.resolution_y = render_configuration['res_height']
+        scene.render.resolution_percentage = render_configuration['res_percentage']
+        scene.render.tile_x = render_configuration['tile_x']
+        scene.render.tile_y = render_configuration['tile_y']
+        self.set_engine_parameters(render_configuration)
+        # Only Cycles has an object index pass, other engines are annotated with projected boxes
+        bpy.context.view_layer.use_pass_object_index = False
+        if render_configuration.get('masks') and scene.render.engine == 'CYCLES':
+            self.setup_index_pass()
+
+    def set_engine_parameters(self, render_configuration):
+        """
+        Sets the parameters of the render engine of the scene, the samples for Eevee
+        and the samples, bounces, adaptive sampling and denoising for Cycles.
+        :param render_configuration: dictionary with the render configuration.
+        :return: None
+        """
+        scene = bpy.context.scene
+        if scene.render.engine == 'BLENDER_EEVEE':
+            scene.eevee.taa_render_samples = render_configuration['samples']
+        if scene.render.engine != 'CYCLES':
+            return
+        scene.cycles.max_bounces = render_configuration['max_bounces']
+        scene.cycles.samples = render_configuration['samples']
+        scene.view_layers['View Layer'].cycles.use_denoising = \
+            render_configuration.get('denoising', True)
+        # Adaptive sampling and the choice of denoiser came with Blender 2.83
+        if hasattr(scene.cycles, 'use_adaptive_sampling'):
+            scene.cycles.use_adaptive_sampling = render_configuration.get('adaptive_sampling',
+                                                                          False)
+        if hasattr(scene.cycles, 'denoiser') and render_configuration.get('denoiser'):
+            scene.cycles.denoiser = render_configuration['denoiser']
+
+    def setup_index_pass(self):
+        """
+        Renders the object index of every pixel alongside the image, the compositor passes it to
+        a viewer node so it can be read after rendering without writing it to a file.
+        :return: None
+        """
+        bpy.context.view_layer.use_pass_object_index = True
+        scene = bpy.context.scene
+        scene.use_nodes = True
+        tree = scene.node_tree
+        layers = next(node for node in tree.nodes if node.type == 'R_LAYERS')
+        viewer = tree.nodes.get('Index Viewer')
+        if viewer is None:
+            viewer = tree.nodes.new('CompositorNodeViewer')
+            viewer.name = 'Index Viewer'
+        viewer.use_alpha = False
+        tree.links.new(layers.outputs['IndexOB'], viewer.inputs['Image'])
+
+    def get_index_image(self):
+        """
+        Reads the object index pass of the last render.
+        :return: (H, W) integer array with the top row first or None if there is no index pass
+        """
+        image = bpy.data.images.get('Viewer Node')
+        if not bpy.context.view_layer.use_pass_object_index or image is None \
+                or image.size[0] == 0:
+            return None
+        width, height = image.size
+        pixels = np.empty(width * height * 4, dtype=np.float32)
+        image.pixels.foreach_get(pixels)
+        return np.flipud(pixels.reshape(height, width, 4)[:, :, 0]).round().astype(np.int32)
 
     def set_render_device(self, device):
         """
@@ -281,28 +745,32 @@ class Blender:
         mat.diffuse_color = (rgba[0], rgba[1], rgba[2], rgba[3])
         obj.active_material = mat
 
-    def set_softbody(self):
+    def set_softbody(self, plastic=100, bend=1000):
         """
         Adds the SoftBody modifier to the active object
         This is for the realistic deformation of the object
+        :param plastic: integer for how much the deformation is permanent
+        :param bend: float for the bending stiffness
         :return: None
         """
         bpy.ops.object.modifier_add(type='SOFT_BODY')
         bpy.context.object.modifiers["Softbody"].settings.use_goal = False
-        bpy.context.object.modifiers["Softbody"].settings.plastic = 100
-        bpy.context.object.modifiers["Softbody"].settings.bend = 1000
+        bpy.context.object.modifiers["Softbody"].settings.plastic = plastic
+        bpy.context.object.modifiers["Softbody"].settings.bend = bend
 
-    def setup_cage(self, target):
+    def setup_cage(self, target, subsurf_levels=1):
         """
         Adds a cage to a target model.
         The cage is made from a sphere .
         It is made in the right form using the ShrinkWrap modifier.
         :param target: object for which the cage gets formed
+        :param subsurf_levels: integer number of subdivisions of the sphere
         :return: None
         """
         bpy.ops.mesh.primitive_uv_sphere_add(radius=5, location=(0, 0, 0))
         # Subdivide surface of sphere to make for better denting [OPTIONAL]
         bpy.ops.object.modifier_add(type='SUBSURF')
+        bpy.context.object.modifiers["Subsurf"].levels = subsurf_levels
         self.apply_modifier("Subsurf")
         bpy.ops.object.modifier_add(type='SHRINKWRAP')
         bpy.context.object.modifiers["Shrinkwrap"].target = target
@@ -310,16 +778,17 @@ class Blender:
         bpy.context.object.modifiers["Shrinkwrap"].show_viewport = False
         bpy.ops.object.modifier_apply(apply_as='DATA', modifier="Shrinkwrap")
 
-    def set_mesh_deform(self, target):
+    def set_mesh_deform(self, target, precision=3):
         """
         Adds the MeshDeform modifier to the active object.
         This binds all the vertices of the active object to the vertices of the (lower-poly) cage.
         :param target: the cage that the active object is mapped to
+        :param precision: integer precision of the binding
         :return: None
         """
         bpy.ops.object.modifier_add(type='MESH_DEFORM')
         bpy.context.object.modifiers["MeshDeform"].object = target
-        bpy.context.object.modifiers["MeshDeform"].precision = 3
+        bpy.context.object.modifiers["MeshDeform"].precision = precision
         bpy.ops.object.meshdeform_bind(modifier="MeshDeform")
 
     def apply_modifier(self, modifier):
@@ -363,22 +832,43 @@ class Blender:
         :param render_configuration: render configuration
         :return: a list of tuples (object name, bounding box)
         """
-        bounding_boxes = []
+        bounding_boxes, self.silhouette_areas = [], []
         bpy.context.view_layer.update()
         for obj in bpy.context.scene.objects:
             if obj.name in object_names:
                 bounding_box = self.camera_view_bounds_2d(bpy.context.scene, obj)
+                self.silhouette_areas.append(self.silhouette_area(bpy.context.scene, obj))
+                # The position in the list identifies the object in the object index pass
+                obj.pass_index = len(bounding_boxes) + 1
                 bounding_boxes.append((obj.name.split('.')[0], bounding_box))
         return bounding_boxes
 
-    def camera_view_bounds_2d(self, scene, obj):  # noqa: CFQ001
+    def get_labeled_object_masks(self, bounding_boxes):
+        """
+        Replaces the projected bounding boxes of the objects by the tight boxes of the pixels
+        they are seen in, and adds these pixels as a mask together with the fraction of the
+        object that is visible. This needs the object index pass of the image rendered after
+        get_labeled_object_bounding_boxes.
+        :param bounding_boxes: a list of tuples (object name, bounding box)
+        :return: a list of tuples (object name, bounding box, run-length encoded mask,
+        visible fraction), the bounding boxes unchanged if there is no index pass
+        """
+        index_image = self.get_index_image()
+        if index_image is None:
+            return bounding_boxes
+        instances = masks.instance_masks(index_image, len(bounding_boxes))
+        return [(name, box, rle, masks.visible_fraction(rle, silhouette_area))
+                for (name, _), (box, rle), silhouette_area in
+                zip(bounding_boxes, instances, self.silhouette_areas)]
+
+    def camera_view_bounds_2d(self, scene, obj):
         """
-        Taken from
+        Based on
         blender.stackexchange.com/questions/7198/save-the-2d-bounding-box-of-an-object-in-rendered-image-to-a-text-file
 
         Returns camera space bounding box of mesh object.
-
-        Negative 'z' value means the point is behind the camera.
+        Only the convex hull is projected if the object has one, which has the same extremes.
+        The vertices are read in bulk and projected as arrays, see src/util/bounds.py.
 
         Takes shift-x/y, lens angle and sensor size into account
         as well as perspective/ortho projections.
@@ -387,68 +877,56 @@ class Blender:
         :type scene: :class:`bpy.types.Scene`
         :arg obj: Untransformed Mesh.
         :type obj: :class:`bpy.types.Mesh´
-        :return: a Box object (call its to_tuple() method to get x, y, width and height)
-        :rtype: :class:`Box`
+        :return: a tuple (x, y, width, height)
         """
-        cam_ob = bpy.context.scene.objects['Camera']
-        mat = cam_ob.matrix_world.normalized().inverted()
-        depsgraph = bpy.context.evaluated_depsgraph_get()
-        mesh_eval = obj.evaluated_get(depsgraph)
-        me = mesh_eval.to_mesh()
-        me.transform(obj.matrix_world)
-        me.transform(mat)
+        coordinates, frame, perspective, resolution = self.camera_projection(scene, obj)
+        projected = bounds.project_bounds(coordinates, frame, perspective)
+        return bounds.to_pixel_box(projected, resolution)
 
+    def silhouette_area(self, scene, obj):
+        """
+        Gets the number of pixels the convex hull of an object would cover if nothing hid it,
+        also counting the pixels outside of the image.
+        :param scene: Scene to use for frame size.
+        :param obj: mesh object
+        :return: float area in pixels
+        """
+        return bounds.silhouette_area(*self.camera_projection(scene, obj))
+
+    def camera_projection(self, scene, obj):
+        """
+        Gets everything needed to project an object on the camera frame.
+        Only the convex hull is used if the object has one.
+        :param scene: Scene to use for frame size.
+        :param obj: mesh object
+        :return: tuple (camera space (N, 3) vertex coordinates, negated camera view frame,
+        True for a perspective camera, (width, height) of the rendered image)
+        """
+        cam_ob = bpy.context.scene.objects['Camera']
+        mat = cam_ob.matrix_world.normalized().inverted() @ obj.matrix_world
+        coordinates = self.hulls.get(obj.name)
+        if coordinates is None:
+            coordinates = self.get_vertex_coordinates(obj)
         camera = cam_ob.data
         frame = [-v for v in camera.view_frame(scene=scene)[:3]]
-        camera_persp = camera.type != 'ORTHO'
-
-        lx = []
-        ly = []
-
-        for v in me.vertices:
-            co_local = v.co
-            z = -co_local.z
-
-            if camera_persp:
-                if z == 0.0:
-                    lx.append(0.5)
-                    ly.append(0.5)
-                # Does it make any sense to drop these?
-                # if z <= 0.0:
-                #    continue
-                else:
-                    frame = [(v / (v.z / z)) for v in frame]
-
-            min_x, max_x = frame[1].x, frame[2].x
-            min_y, max_y = frame[0].y, frame[1].y
-
-            x = (co_local.x - min_x) / (max_x - min_x)
-            y = (co_local.y - min_y) / (max_y - min_y)
-
-            lx.append(x)
-            ly.append(y)
-
-        min_x = np.clip(min(lx), 0.0, 1.0)
-        max_x = np.clip(max(lx), 0.0, 1.0)
-        min_y = np.clip(min(ly), 0.0, 1.0)
-        max_y = np.clip(max(ly), 0.0, 1.0)
-
-        mesh_eval.to_mesh_clear()
-
         r = scene.render
         fac = r.resolution_percentage * 0.01
-        dim_x = r.resolution_x * fac
-        dim_y = r.resolution_y * fac
-        # Sanity check
-        if round((max_x - min_x) * dim_x) == 0 or round((max_y - min_y) * dim_y) == 0:
-            return 0, 0, 0, 0
-
-        return (
-            round(min_x * dim_x),  # X
-            round(dim_y - max_y * dim_y),  # Y
-            round((max_x - min_x) * dim_x),  # Width
-            round((max_y - min_y) * dim_y)  # Height
-        )
+        return bounds.to_camera_space(coordinates, mat), frame, camera.type != 'ORTHO', \
+            (r.resolution_x * fac, r.resolution_y * fac)
+
+    def get_vertex_coordinates(self, obj):
+        """
+        Reads the local vertex coordinates of the evaluated mesh of an object in one call.
+        :param obj: mesh object
+        :return: (N, 3) array of vertex coordinates
+        """
+        depsgraph = bpy.context.evaluated_depsgraph_get()
+        mesh_eval = obj.evaluated_get(depsgraph)
+        me = mesh_eval.to_mesh()
+        coordinates = np.empty(len(me.vertices) * 3, dtype=np.float32)
+        me.vertices.foreach_get('co', coordinates)
+        mesh_eval.to_mesh_clear()
+        return coordinates.reshape(-1, 3).astype(np.float64)
 
     def get_object_names(self):
         """
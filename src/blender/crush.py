@@ -1,34 +1,103 @@
+import numpy as np
+
 import src.blender.blender as b  # noqa: E402
 import src.blender.object as o  # noqa: E402
+from src.util.configuration import load_configuration  # noqa: E402
+from src.util.cache import FileCache, hash_key, model_files  # noqa: E402
+
+src_dir = "/workdir"
 
 
 class Crush:
 
-    def __init__(self):
+    def __init__(self, settings=None):
+        """
+        Constructor method for a crusher.
+        :param settings: dictionary with the crush settings, read from configuration.yaml if None
+        """
         self.blender = b.Blender()
+        if settings is None:
+            settings = load_configuration().crush
+        self.settings = settings
 
-    def crush_model(self, obj, folder):
+    def crush_model(self, obj, folder, seed=None):
         """
-        Executes all the different stages of the crushing in the right order.
+        Crushes a model, or reuses the cached crush of the same model with the same settings and
+        seed. The crushed models in folder are cached by a hash of these inputs. Processes that
+        need the same crush wait for the one crushing it, instead of writing its files too.
         :param obj: object that gets crushed
         :param folder: for where the model needs to be stored
+        :param seed: integer deciding how the model is dropped, a variant drawn by obj if None
         :return: Object that references to the location of the crushed model
         """
+        if seed is None:
+            seed = int(obj.generator.integers(self.settings['variants']))
+        cache = FileCache(folder, self.settings['cache_size'])
+        key = self.cache_key(obj, seed)
+        entry = cache.get(key)
+        if entry is None:
+            with cache.lock(key):
+                entry = cache.get(key)
+                if entry is None:
+                    entry = cache.put(key, self.crush(obj, folder, seed, key[:16]),
+                                      {'source': obj.path, 'seed': seed})
+        return o.Object(folder + entry['files'][0], 'random', 'random', 'random', obj.generator)
+
+    def cache_key(self, obj, seed):
+        """
+        Hashes everything that decides the outcome of a crush.
+        :param obj: object that gets crushed
+        :param seed: integer deciding how the model is dropped
+        :return: string key of the crush
+        """
+        return hash_key(model_files(obj.path), self.parameters(seed))
+
+    def parameters(self, seed):
+        """
+        Gets the settings that change the outcome of a crush.
+        :param seed: integer deciding how the model is dropped
+        :return: dictionary of the crush parameters
+        """
+        names = ['plastic', 'bend', 'subsurf_levels', 'frames', 'precision']
+        # The generator the pose is drawn with, crushes of the earlier RandomState are not reused
+        return dict({name: self.settings[name] for name in names}, seed=seed, generator='PCG64')
+
+    def crush_pose(self, seed):
+        """
+        Gets the location and orientation a model is dropped with.
+        :param seed: integer deciding how the model is dropped
+        :return: tuple of 3 entry lists (location, orientation)
+        """
+        generator = np.random.default_rng(seed)
+        location = np.append(generator.uniform(low=-0.5, high=0.5, size=2), 1)
+        orientation = generator.uniform(low=0, high=360, size=3) * np.pi / 180
+        return location.tolist(), orientation.tolist()
+
+    def crush(self, obj, folder, seed, version):
+        """
+        Executes all the different stages of the crushing in the right order.
+        :param obj: object that gets crushed
+        :param folder: for where the model needs to be stored
+        :param seed: integer deciding how the model is dropped
+        :param version: string added to the file name to tell crushes of one model apart
+        :return: list of the exported obj and mtl paths relative to folder
+        """
         # Clear scene
         self.blender.clear_scene([])
         # Setup plane
         self.blender.setup_crush_plane()
         # Import model into scene
-        model = self.blender.setup_object(obj)
+        location, orientation = self.crush_pose(seed)
+        model = self.blender.setup_object(o.Object(obj.path, location, orientation, 'random', None),
+                                          linked=False)  # The mesh gets deformed, so not shared
         # Setup cage for deformation
         self.setup_cage(model)
         # Simulate for frames
-        self.blender.simulate(20)
+        self.blender.simulate(self.settings['frames'])
         # Export model
-        self.export_model(model, folder + obj.material + "/")
-
-        return o.Object(folder + obj.material + "/" + model.name + ".obj",
-                        'random', 'random', 'random', None)
+        name = model.name + '.' + version
+        self.export_model(model, folder + obj.material + "/", name)
+        return [obj.material + "/" + name + ".obj", obj.material + "/" + name + ".mtl"]
 
     def setup_cage(self, model):
         """
@@ -37,22 +106,25 @@ class Crush:
         :return: none
         """
         # Set up cage by importing sphere and applying ShrinkWrap modifier
-        self.blender.setup_cage(model)
+        self.blender.setup_cage(model, self.settings['subsurf_levels'])
         # Bind model to cage using a MeshDeform modifier
         self.blender.activate_model(model)
-        self.blender.set_mesh_deform(self.blender.get_model("Sphere"))
+        self.blender.set_mesh_deform(self.blender.get_model("Sphere"), self.settings['precision'])
         # Add crushing physics using SoftBody modifier
         self.blender.activate_model(self.blender.get_model("Sphere"))
-        self.blender.set_softbody()
+        self.blender.set_softbody(self.settings['plastic'], self.settings['bend'])
 
-    def export_model(self, model, folder):
+    def export_model(self, model, folder, name=None):
         """
         Applies the deformation of the model and clears the rest of the scene.
         It then centers the object and exports it as an object.
         :param folder: for where the model needs to be stored
         :param model: The model that needs to be exported
+        :param name: file name without extension, the name of the model if None
         :return: none
         """
+        if name is None:
+            name = model.name
         # Apply deformation
         self.blender.activate_model(model)
         self.blender.apply_modifier("MeshDeform")
@@ -61,4 +133,4 @@ class Crush:
         # Clear out screen
         self.blender.clear_scene([model.name])
         # Export object
-        self.blender.export_scene(folder + model.name + ".obj")
+        self.blender.export_scene(folder + name + ".obj")
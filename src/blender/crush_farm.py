@@ -0,0 +1,130 @@
+import os
+import sys
+import json
+import argparse
+import pathlib
+import tempfile
+from subprocess import run
+from concurrent.futures import ThreadPoolExecutor
+
+src_dir = "/workdir"
+sys.path.insert(1, src_dir)
+
+from src.util.configuration import load_configuration  # noqa: E402
+
+crushed_folder = "Crushed Models/"
+
+
+def list_tasks(materials, variants):
+    """
+    Lists a crush task for every variant of every model of the materials.
+    :param materials: list of material names.
+    :param variants: integer number of variants per model.
+    :return: list of task dictionaries with the model path and variant id
+    """
+    return [{'model': str(path), 'variant': variant} for material in materials
+            for path in sorted(pathlib.Path(src_dir, 'Models', material).glob('**/*.obj'))
+            for variant in range(variants)]
+
+
+def count_vertices(path):
+    """
+    Counts the vertices of a Wavefront file.
+    :param path: path to the obj file.
+    :return: integer number of vertices
+    """
+    with open(path) as file:
+        return sum(1 for line in file if line.startswith('v '))
+
+
+def crush_chunk(tasks):
+    """
+    Crushes the models of a chunk of tasks, this runs inside Blender.
+    The variant id is the seed of the crush, so render jobs picking a variant reuse the result.
+    :param tasks: list of task dictionaries.
+    :return: list of manifest entries
+    """
+    # Only available inside Blender
+    from src.blender.crush import Crush  # noqa: E402
+    from src.blender.object import Object  # noqa: E402
+    crusher, entries = Crush(), []
+    for task in tasks:
+        crushed = crusher.crush_model(Object(task['model'], 'random', 'random', 'random', None),
+                                      crushed_folder, task['variant'])
+        entries.append(dict(task, params=crusher.parameters(task['variant']), path=crushed.path,
+                            vertices=count_vertices(crushed.path)))
+    return entries
+
+
+def run_chunk(command, threads, tasks, chunk_path):
+    """
+    Runs a headless Blender instance that crushes a chunk of tasks.
+    :param command: list with the command that runs this file in Blender.
+    :param threads: integer number of CPU threads for the instance.
+    :param tasks: list of task dictionaries.
+    :param chunk_path: path to the file passing the tasks and results.
+    :return: list of manifest entries
+    """
+    with open(chunk_path, 'w') as file:
+        json.dump(tasks, file)
+    run(command[:1] + ['-t', str(threads)] + command[1:] + ['--', '--chunk', str(chunk_path)],
+        cwd=src_dir, check=True)
+    with open(chunk_path) as file:
+        return json.load(file)
+
+
+def crush_library(command, tasks, workers, chunk_size):
+    """
+    Crushes all tasks in chunks over a pool of Blender instances and writes the manifest.
+    :param command: list with the command that runs this file in Blender.
+    :param tasks: list of task dictionaries.
+    :param workers: integer number of Blender instances running at the same time.
+    :param chunk_size: integer number of tasks per Blender instance.
+    :return: list of manifest entries
+    """
+    chunks = [tasks[i:i + chunk_size] for i in range(0, len(tasks), chunk_size)]
+    threads = max(1, os.cpu_count() // workers)
+    with tempfile.TemporaryDirectory() as directory, ThreadPoolExecutor(workers) as pool:
+        results = pool.map(lambda i: run_chunk(command, threads, chunks[i],
+                                               pathlib.Path(directory, f'chunk_{i}.json')),
+                           range(len(chunks)))
+        manifest = [entry for result in results for entry in result]
+    with open(pathlib.Path(src_dir, crushed_folder, 'manifest.json'), 'w') as file:
+        json.dump(manifest, file, indent=1)
+    return manifest
+
+
+def parse_farm_args(args, variants):
+    """
+    Parse the arguments of the crush farm.
+    :param args: list with arguments to be parsed.
+    :param variants: integer default number of variants per model.
+    :return: parsed arguments
+    """
+    parser = argparse.ArgumentParser(description='Build a library of crushed models')
+    parser.add_argument('-m', '--materials', nargs='+', default=["Aluminium"],
+                        help="a list of materials whose models are crushed")
+    parser.add_argument('-n', '--variants', type=int, default=variants,
+                        help="number of crushed variants per model")
+    parser.add_argument('-k', '--workers', type=int, default=os.cpu_count(),
+                        help="number of Blender instances crushing at the same time")
+    parser.add_argument('-cs', '--chunk_size', type=int, default=5,
+                        help="number of crushes per Blender instance")
+    parser.add_argument('--chunk', default=None,
+                        help="file with tasks to crush inside Blender, replaced by the results")
+    return parser.parse_args(args)
+
+
+if __name__ == "__main__":
+    configuration = load_configuration().crush
+    farm_args = parse_farm_args(sys.argv[sys.argv.index('--') + 1:] if '--' in sys.argv
+                                else sys.argv[1:], configuration['variants'])
+    if farm_args.chunk is not None:
+        with open(farm_args.chunk) as chunk_file:
+            chunk_tasks = json.load(chunk_file)
+        with open(farm_args.chunk, 'w') as chunk_file:
+            json.dump(crush_chunk(chunk_tasks), chunk_file)
+    else:
+        crush_library(configuration['farm_command'],
+                      list_tasks(farm_args.materials, farm_args.variants),
+                      farm_args.workers, farm_args.chunk_size)
@@ -1,6 +1,8 @@
+import os
 import sys
+import copy
+import socket
 import pathlib
-import random
 import time
 
 src_dir = "/workdir"
@@ -8,80 +10,164 @@ sys.path.insert(1, src_dir)
 time_data = {}
 
 from src.util.parser import Parser  # noqa: E402
-from src.util.annotate import write_file  # noqa: E402
+from src.util.configuration import load_configuration  # noqa: E402
+from src.util.annotate import write_file, patch_file  # noqa: E402
+from src.util.manifest import image_range, write_manifest, read_manifest  # noqa: E402
+from src.util.checkpoint import append_entry, log_boxes, logged_seed  # noqa: E402
+from src.util.checkpoint import finished_images, start_log  # noqa: E402
 from src.blender.scene import Scene  # noqa: E402
 from src.blender.object import Object  # noqa: E402
 from src.blender.crush import Crush  # noqa: E402
+from src.blender.blender import Blender  # noqa: E402
+from src.util.ledger import Ledger  # noqa: E402
+import src.util.seeds as seeds  # noqa: E402
 
 
 # Main method of our code.
 # Sets the paths of background and object.
-def main(args):  # noqa: CFQ001
+def main(args, progress=None):  # noqa: CFQ001
     """
     Main method of our code.
     Sets the paths of background and object.
     :param args: arguments used for parsing to values.
+    :param progress: function called with a dictionary each time an image is rendered or None
     :return: time_data: a dictionary with timestamps of the different stages of the pipeline
     """
+    # main is also called repeatedly by resident workers, so start from empty time data
+    time_data.clear()
     total_start_time = time.time()
 
     parser = Parser()
 
-    # Load the config file for camera and lights
-    configuration = parser.parse_long_term_configuration(pathlib.Path(
-        src_dir + r"/configuration.yaml"))
+    # Load the config file for camera and lights, parsed once per process
+    configuration = load_configuration()
 
     # Parse arguments provided as input by user
     args = parser.parse_args(args)
+    configuration = configuration.with_render_profile(args.render_profile)
 
-    # Load objects
-    if args.reuse_crushes:
-        material_dirs = list(map(lambda x: list(pathlib.Path(src_dir + r'/Crushed Models/' +
-                                                             x).glob('**/*.obj')), args.materials))
-    else:
-        material_dirs = list(map(lambda x: list(pathlib.Path(src_dir + r'/Models/' + x).glob(
-            '**/*.obj')), args.materials))
-
-    # List of the models
-    models = [list(map(lambda path: Object(str(
-        path), 'random', 'random', 'random', None), material)) for material in material_dirs]
+    # Render shards of a distributed run instead
+    if args.ledger is not None:
+        work_ledger(args.ledger, configuration['ledger'])
+        return dict(time_data)
 
-    # Calculate number of objects per material based on proportions
-    number_of_objects = list(map(lambda x: int(round(
-        args.objects_per_image * (x / 100))), args.proportions))
+    # Every random choice is derived from the seed of the run and the index of the image or
+    # object it is for, so a run or any image of it can be repeated
+    if args.resume and args.seed is None:
+        # A resumed run continues with the seed it was started with
+        args.seed = logged_seed(args.output_location)
+    args.seed = seeds.resolve_seed(args.seed)
 
-    objects = make_object_selection(args, number_of_objects, models)
+    # Images of an earlier run are rendered again with the objects in their manifests
+    if args.images is not None:
+        args.start_index, args.image_count = image_range(args.images)
+        objects = None
+        time_data['object_creation_time'] = 0
+    else:
+        objects = select_objects(args, configuration)
 
     if not args.only_crush:
         # Setup scene
         scene = Scene(configuration['camera']['location'], configuration['camera']['rotation'],
                       configuration['light']['location'], configuration['light']['energy'],
-                      configuration['light']['type'])
-        scene.add_background(args.background, None)
+                      configuration['light']['type'], configuration)
+        background_seed = seeds.image_generator(args.seed, args.start_index, seeds.BACKGROUND)
+        if args.scene_template:
+            scene.add_background_from_template(args.background, background_seed,
+                                               configuration['scene_template']['cache_size'])
+        else:
+            scene.add_background(args.background, background_seed)
 
         # Render images
-        image_object_bboxes = render(args, configuration['render'], scene, objects)
+        if args.images is not None:
+            rerender(args, configuration, scene, progress)
+        else:
+            render(args, configuration, scene, objects, progress)
 
-        # Write info file
-        write_file(configuration['info_json'],
-                   (configuration['render']['res_width'], configuration['render']['res_height']),
-                   'info', args.image_count, image_object_bboxes)
+        write_annotations(args, configuration)
 
     time_data['total'] = time.time() - total_start_time
 
     # Print time data
+    print('Seed: ' + str(args.seed))
     print('Total Time: ' + str(time_data['total']))
     print('Object Creation Time: ' + str(time_data['object_creation_time']))
     if not args.only_crush:
         print('Object Setup Time: ' + str(time_data['object_setup_time']))
         for i in range(args.image_count):
-            print('Image ' + str(i) + ' Time: ' + str(time_data['image_' + str(i)]))
+            print('Image ' + str(i) + ' Time: ' + str(time_data['image_' + str(i)]) +
+                  ' Frames: ' + str(time_data['image_' + str(i) + '_frames']))
 
     # To be displayed on the server page
-    return time_data
+    return dict(time_data)
 
 
-def render(args, render_configuration, scene, objects):
+def select_objects(args, configuration):
+    """
+    Lists the models of the materials and selects the objects of the run from them.
+    :param args: Arguments passed to the main
+    :param configuration: Long term configuration
+    :return: list of selected objects
+    """
+    # Load objects
+    folder = r'/Crushed Models/' if args.reuse_crushes else r'/Models/'
+    material_dirs = list(map(lambda x: list(pathlib.Path(src_dir + folder + x).glob('**/*.obj')),
+                             args.materials))
+
+    # List of the models
+    models = [list(map(lambda path: Object(str(path), 'random', 'random', 'random', None,
+                                           configuration), material)) for material in material_dirs]
+
+    # Calculate number of objects per material based on proportions
+    number_of_objects = list(map(lambda x: int(round(
+        args.objects_per_image * (x / 100))), args.proportions))
+
+    return make_object_selection(args, number_of_objects, models, configuration.crush)
+
+
+def write_annotations(args, configuration):
+    """
+    Writes the info file from the annotation log, or patches the info file of the earlier run
+    when images were rendered again. The bounding boxes are streamed from the log.
+    :param args: Arguments passed to the main
+    :param configuration: Long term configuration
+    :return: None
+    """
+    resolution = (configuration.render['res_width'], configuration.render['res_height'])
+    name = str(pathlib.Path(args.output_location, 'info'))
+    bounding_boxes = log_boxes(args.output_location, args.start_index, args.image_count)
+    if args.images is not None:
+        patch_file(configuration['info_json'], resolution, name, list(bounding_boxes),
+                   args.start_index)
+    else:
+        write_file(configuration['info_json'], resolution, name, args.image_count,
+                   bounding_boxes, args.start_index)
+
+
+def work_ledger(directory, ledger_configuration):
+    """
+    Renders shards from a job ledger until all shards of the run are done.
+    :param directory: path to the ledger directory
+    :param ledger_configuration: configuration of the lease time and poll interval
+    :return: None
+    """
+    ledger = Ledger(directory, ledger_configuration['lease_time'],
+                    ledger_configuration['poll_interval'])
+    ledger.work(f'{socket.gethostname()}:{os.getpid()}', render_shard)
+
+
+def render_shard(shard, renew):
+    """
+    Renders a single shard of a job ledger on a fresh scene.
+    :param shard: manifest dictionary of the shard
+    :param renew: function that renews the lease on the shard
+    :return: None
+    """
+    Blender().reset_scene()
+    main(shard['args'], lambda event: renew())
+
+
+def render(args, configuration, scene, objects, progress=None):
     """
     This method renders images with a static set of objects.
     It first makes random selection of models to be rendered.
@@ -89,52 +175,246 @@ def render(args, render_configuration, scene, objects):
     This makes for better performance since we reduce the imports
     form a linear to a constant time complexity.
     :param args: Arguments passed to the main
-    :param render_configuration: Current render configuration
+    :param configuration: Long term configuration
     :param scene: Scene containing the background and border planes
     :param objects: Objects to be rendered.
-    :return: time_data: for analyzing performance
+    :param progress: function called with a dictionary each time an image is rendered or None
+    :return: None, the bounding boxes are written to the annotation log
     """
-    # Set render output parameters
     scene.set_render_parameters()
-    # Setup scene by making a selection of objects and importing them
-    starting_time = time.time()
-    scene.clear_scene(['background', 'border_1', 'border_2', 'border_3', 'border_4'])
-    for obj in objects:
-        scene.add_object(obj)
-    scene.setup_bodies()  # Make models rigid bodies
-    time_data['object_setup_time'], image_object_bboxes = time.time() - starting_time, []
+    names = setup_objects(scene, objects)
+    finished = finished_before(args)
+    for i in range(args.image_count):
+        if args.start_index + i in finished:
+            skip_image(i, args.image_count, progress)
+            continue
+        starting_time = time.time()
+        time_data['image_' + str(i) + '_frames'] = arrange_scene(scene, configuration, args, i)
+        write_manifest(args.output_location, args.start_index + i,
+                       describe_image(scene, args, i, objects, names))
+        finish_image(scene, configuration, args, i, starting_time, progress)
+
+
+def finished_before(args):
+    """
+    Finds the images a resumed run finished before it was interrupted.
+    A run that is not resumed starts a new annotation log instead.
+    :param args: Arguments passed to the main
+    :return: set of image indices
+    """
+    if not args.resume:
+        start_log(args.output_location, {'seed': args.seed, 'start_index': args.start_index,
+                                         'image_count': args.image_count})
+        return set()
+    return finished_images(args.output_location, args.seed,
+                           range(args.start_index, args.start_index + args.image_count))
+
+
+def skip_image(i, image_count, progress):
+    """
+    Skips an image that was rendered and annotated before the run was resumed.
+    :param i: integer index of the image within this run
+    :param image_count: integer number of images in the run
+    :param progress: function called with a dictionary each time an image is rendered or None
+    :return: None
+    """
+    time_data['image_' + str(i)] = 0
+    time_data['image_' + str(i) + '_frames'] = 0
+    report_progress(progress, i, image_count)
+
+
+def rerender(args, configuration, scene, progress=None):
+    """
+    Renders images of an earlier run again from their manifests, the objects are placed
+    where they came to rest in that run so nothing is simulated.
+    :param args: Arguments passed to the main, with the range of images to render
+    :param configuration: Long term configuration
+    :param scene: Scene containing the background and border planes
+    :param progress: function called with a dictionary each time an image is rendered or None
+    :return: None, the bounding boxes are written to the annotation log
+    """
+    scene.set_render_parameters()
+    described, names = None, []
     for i in range(args.image_count):
         starting_time = time.time()
-        scene.reset_objects()
-        image_object_bboxes.append(scene.get_labeled_bounding_boxes(render_configuration))
-        scene.render_scene(args.output_location, str(i))
-        time_data['image_' + str(i)] = time.time() - starting_time
-    return image_object_bboxes
+        manifest = read_manifest(args.output_location, args.start_index + i)
+        # Images of a run share their objects, they are only set up again when they differ
+        if manifest['objects'] != described:
+            described = manifest['objects']
+            names = setup_objects(scene, [restore_object(description, configuration)
+                                          for description in described], bodies=False)
+        restore_scene(scene, configuration, manifest, names)
+        time_data['image_' + str(i) + '_frames'] = 0
+        finish_image(scene, configuration, args, i, starting_time, progress)
+
+
+def finish_image(scene, configuration, args, i, starting_time, progress):
+    """
+    Takes the bounding boxes of an arranged scene, renders it and adds the bounding boxes and
+    the masks of the objects to the annotation log, so they are kept if the run is interrupted.
+    :param scene: Scene containing the objects
+    :param configuration: Long term configuration
+    :param args: Arguments passed to the main
+    :param i: integer index of the image within this run
+    :param starting_time: time the image was started at
+    :param progress: function called with a dictionary each time an image is rendered or None
+    :return: None
+    """
+    bounding_boxes = scene.get_labeled_bounding_boxes(configuration.render)
+    scene.render_scene(args.output_location, str(args.start_index + i))
+    bounding_boxes = scene.get_labeled_masks(bounding_boxes)
+    append_entry(args.output_location, {'image': args.start_index + i, 'seed': args.seed,
+                                        'boxes': bounding_boxes})
+    time_data['image_' + str(i)] = time.time() - starting_time
+    report_progress(progress, i, args.image_count)
+
+
+def describe_image(scene, args, i, objects, names):
+    """
+    Describes an arranged image, with everything needed to render it again.
+    :param scene: Scene containing the objects
+    :param args: Arguments passed to the main
+    :param i: integer index of the image within this run
+    :param objects: Objects in the scene
+    :param names: list with the names the objects got in the scene
+    :return: json serializable dictionary for the manifest of the image
+    """
+    locations, orientations = scene.get_transforms(names)
+    return {'seed': args.seed, 'image': args.start_index + i,
+            'background': scene.get_background(),
+            'objects': [describe_object(obj) for obj in objects],
+            'locations': locations.tolist(), 'orientations': orientations.tolist()}
+
+
+def describe_object(obj):
+    """
+    Describes the model and skin of an object.
+    :param obj: Object to be described
+    :return: json serializable dictionary
+    """
+    return {'path': obj.path, 'texture': obj.texture, 'texture_slots': obj.texture_slots,
+            'skin_color': None if obj.skin_color is None else [float(value)
+                                                               for value in obj.skin_color]}
+
+
+def restore_object(description, configuration):
+    """
+    Creates an object as described in a manifest.
+    :param description: dictionary made by describe_object
+    :param configuration: Long term configuration
+    :return: Object with the described model and skin
+    """
+    obj = Object(description['path'], [0, 0, 1], [0, 0, 0], [1, 1, 1, 1], None, configuration)
+    obj.texture, obj.texture_slots = description['texture'], description['texture_slots']
+    obj.skin_color = description['skin_color']
+    return obj
+
+
+def restore_scene(scene, configuration, manifest, names):
+    """
+    Shows the background of an image and places the objects as described in its manifest.
+    :param scene: Scene containing the objects
+    :param configuration: Long term configuration
+    :param manifest: dictionary describing the image
+    :param names: list with the names the described objects got in the scene
+    :return: None
+    """
+    scene.swap_background(manifest['background'], None, configuration.background_pool_size)
+    scene.set_transforms(names, manifest['locations'], manifest['orientations'])
+
+
+def arrange_scene(scene, configuration, args, i):
+    """
+    Arranges the scene for an image: a new background if it is random and new object poses.
+    :param scene: Scene containing the objects
+    :param configuration: Long term configuration
+    :param args: Arguments passed to the main
+    :param i: integer index of the image
+    :return: integer number of simulated frames
+    """
+    image = args.start_index + i
+    # Every image gets its own random background, the first one was added with the plane
+    if i > 0 and args.background == 'random':
+        scene.swap_background(args.background,
+                              seeds.image_generator(args.seed, image, seeds.BACKGROUND),
+                              configuration.background_pool_size)
+    generator = seeds.image_generator(args.seed, image, seeds.POSES)
+    scene.reset_objects(generator)
+    return settle_objects(scene, configuration, args.pose_bank, generator)
+
+
+def settle_objects(scene, configuration, pose_bank, seed=None):
+    """
+    Brings the objects to rest, so the bounding boxes are taken where the objects are rendered.
+    With a pose bank the objects are placed in resting poses, they are only simulated
+    when that fails.
+    :param scene: Scene containing the objects
+    :param configuration: Long term configuration
+    :param pose_bank: Boolean, place the objects from the pose bank
+    :param seed: integer or numpy Generator to predict randomness
+    :return: integer number of simulated frames
+    """
+    if pose_bank and scene.place_from_pose_bank(configuration['pose_bank'], seed):
+        return 0
+    return scene.simulate(configuration['simulation'])
+
+
+def setup_objects(scene, objects, bodies=True):
+    """
+    Sets up the scene by importing the selected objects and making them rigid bodies.
+    :param scene: Scene containing the background and border planes
+    :param objects: Objects to be rendered.
+    :param bodies: Boolean, make the objects rigid bodies so they can be simulated
+    :return: list with the names the objects got in the scene
+    """
+    starting_time = time.time()
+    scene.clear_scene(['background', 'border_1', 'border_2', 'border_3', 'border_4'])
+    names = [scene.add_object(obj) for obj in objects]
+    if bodies:
+        scene.setup_bodies()  # Make models rigid bodies
+    time_data['object_setup_time'] = time.time() - starting_time
+    return names
+
+
+def report_progress(progress, i, image_count):
+    """
+    Reports a finished image to whoever is following the generation.
+    :param progress: function called with a dictionary describing the image or None
+    :param i: integer index of the finished image
+    :param image_count: integer number of images in the generation
+    :return: None
+    """
+    if progress is not None:
+        progress({'image': i, 'image_count': image_count, 'time': time_data['image_' + str(i)],
+                  'frames': time_data['image_' + str(i) + '_frames']})
 
 
-def make_object_selection(args, number_of_objects, models):  # noqa: CFQ001
+def make_object_selection(args, number_of_objects, models, crush_settings):  # noqa: CFQ001
     """
     Makes a random selection of objects that will be used in the scene with proper proportions.
     Checks if their needs to be a new crushing of objects or we will re-use.
     :param args: Arguments passed to the main
     :param number_of_objects: List with proportions to indicate the amount of material objects
     :param models: list of models
+    :param crush_settings: dictionary with the crush configuration
     :return: list of selected objects
     """
     starting_time = time.time()
     objects = list()
     if not (args.reuse_crushes or args.dont_crush):
-        crusher = Crush()
+        crusher = Crush(crush_settings)
     for j, number in enumerate(number_of_objects):
         for _ in range(number):
-            object_to_add = random.choice(models[j])  # Random choice out of models of material j
-            object_to_add.randomize_object(None)
-            object_to_add.randomize_skin(object_to_add)
-            # Crush model
-            if args.reuse_crushes or args.dont_crush:
-                objects.append(object_to_add)
-            else:
-                objects.append(crusher.crush_model(object_to_add, "Crushed Models/"))
+            generator = seeds.object_generator(args.seed, len(objects))
+            # Random choice out of models of material j, copied so every instance has its own skin
+            object_to_add = copy.copy(models[j][generator.integers(len(models[j]))])
+            object_to_add.set_seed(generator)
+            # Crush model, the source model is crushed so it can be found in the crush cache
+            if not (args.reuse_crushes or args.dont_crush):
+                object_to_add = crusher.crush_model(object_to_add, "Crushed Models/")
+            object_to_add.randomize_object()
+            object_to_add.randomize_skin()
+            objects.append(object_to_add)
 
     time_data['object_creation_time'] = time.time() - starting_time
     return objects
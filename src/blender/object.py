@@ -1,6 +1,5 @@
 import numpy as np
 import os
-import random
 import pathlib
 import sys
 
@@ -8,10 +7,7 @@ sys.path.append(os.getcwd())
 src_dir = "/workdir"
 sys.path.insert(1, src_dir)
 
-import src.blender.blender as b  # noqa: E402
-from src.util.parser import Parser  # noqa: E402
-
-configuration = "configuration.yaml"
+from src.util.configuration import load_configuration  # noqa: E402
 
 
 class Object:
@@ -19,7 +15,8 @@ class Object:
     Object class to divide logic between an object and blender.
     """
 
-    def __init__(self, path, location, orientation, color, seed):
+    def __init__(self, path, location, orientation, color, seed,  # noqa: CFQ001,CFQ002
+                 configuration=None):
         """
         Initializes properties of the object.
         :param path: string path specifying object path.
@@ -27,114 +24,138 @@ class Object:
         :param orientation: string specifying objects orientation or 'random'
         for random orientation.
         :param color: string specifying objects color or 'random' for random color.
-        :seed: integer for predictable randomness or None for actual randomness
+        :seed: integer or numpy Generator for predictable randomness or None for actual randomness
+        :param configuration: Configuration, the one of configuration.yaml if None.
         """
         self.path = path
+        self.generator = np.random.default_rng(seed)
+        self.configuration = configuration if configuration is not None else load_configuration()
+        # Skin applied after import, the image of the first textures or a color
+        self.texture, self.texture_slots, self.skin_color = None, 0, None
         if self.path is not None:
             self.material = str(pathlib.Path(path).parent.stem)
         if location != 'random':
             self.rand_location, self.location = False, location
         else:
-            self.rand_location, self.location = True, self.random_location(seed)
+            self.rand_location, self.location = True, self.random_location()
         if orientation != 'random':
             self.rand_orientation, self.orientation = False, orientation
         else:
-            self.rand_orientation, self.orientation = True, self.random_orientation(seed)
+            self.rand_orientation, self.orientation = True, self.random_orientation()
         if color != 'random':
             self.rand_color, self.color = False, color
         else:
-            self.rand_color, self.color = True, self.random_color(seed)
+            self.rand_color, self.color = True, self.random_color()
+
+    def set_seed(self, seed):
+        """
+        Gives the object its own random generator, e.g. for a copy of another object.
+        :param seed: integer or numpy Generator for predictable randomness or None
+        :return: None
+        """
+        self.generator = np.random.default_rng(seed)
 
-    def randomize_object(self, seed):
+    def randomize_object(self):
         """
         If user selects properties of object can be made random
-        :param seed: integer for repeatable randomness.
         :return: none
         """
         if self.rand_location:
-            self.location = self.random_location(seed)
+            self.location = self.random_location()
         if self.rand_orientation:
-            self.orientation = self.random_orientation(seed)
+            self.orientation = self.random_orientation()
         if self.rand_color:
-            self.color = self.random_color(seed)
+            self.color = self.random_color()
 
-    def random_location(self, seed):
+    def random_location(self):
         """
         Return random location.
-        :param seed: integer for repeatable randomness.
         :return: 3 entry list to indicate location
         """
-        np.random.seed(seed)
-        locations = np.random.uniform(low=-0.5, high=0.5, size=2)
+        locations = self.generator.uniform(low=-0.5, high=0.5, size=2)
         return np.append(locations, 1)
 
-    def random_orientation(self, seed):
+    def random_orientation(self):
         """
         Return random orientation
-        :param seed: integer for repeatable randomness.
         :return: 3 entry list to indicate orientation
         """
-        np.random.seed(seed)
-        rotations = np.random.uniform(low=0, high=360, size=3) * np.pi / 180
+        rotations = self.generator.uniform(low=0, high=360, size=3) * np.pi / 180
         return rotations
 
-    def random_color(self, seed):
+    def random_transforms(self, count):
+        """
+        Return random locations and orientations for a number of objects in one draw,
+        in the same ranges as random_location and random_orientation.
+        :param count: integer number of objects.
+        :return: tuple of (count, 3) arrays (locations, orientations)
+        """
+        locations = self.generator.uniform(low=-0.5, high=0.5, size=(count, 3))
+        locations[:, 2] = 1
+        orientations = self.generator.uniform(low=0, high=360, size=(count, 3)) * np.pi / 180
+        return locations, orientations
+
+    def random_color(self):
         """
         Return random color
-        :param seed: integer for repeatable randomness.
         :return: n4 entry list to indicate rgba
         """
-        np.random.seed(seed)
-        colors = np.random.uniform(low=0.0, high=1.0, size=4)
+        colors = self.generator.uniform(low=0.0, high=1.0, size=4)
         return colors
 
-    def randomize_skin(self, obj):
+    def randomize_skin(self):
         """
-        :param obj: Object whose skin will be changed
-        Randomizes skins using skins stored in config file by editing the mtl file.
+        Randomizes skins using skins stored in config file.
+        The skin is applied to the materials of the imported model by Blender.setup_object,
+        the model files are not changed.
         :return: None
         """
-        # Find path of mtl file
-        model_directory = os.path.splitext(self.path)
-        mtl_directory = model_directory[0] + '.mtl'
-
-        object_name = os.path.basename(model_directory[0]).split('.')[0]
-        material_name = os.path.basename(os.path.dirname(mtl_directory))
+        object_name = os.path.basename(os.path.splitext(self.path)[0]).split('.')[0]
+        material_name = os.path.basename(os.path.dirname(self.path))
 
         # Read skins from config file
         skins = self.read_skins_from_library()
 
         # Check if material exists and object is a type of material and exists in config file
         if material_name in skins and object_name in skins[material_name]:
-            # Find new skin and change file
-            new_skin = random.choice(skins[material_name][object_name])
-            self.change_skin(obj, object_name, mtl_directory, new_skin)
+            # Find new skin
+            new_skin = str(self.generator.choice(skins[material_name][object_name]))
+            self.change_skin(object_name, material_name, new_skin)
 
-    def change_skin(self, obj, object_name, mtl_directory, new_skin):
+    def change_skin(self, object_name, material_name, new_skin):
         """
-        Find line number(s) to be changed and change them.
-        :param obj: Object whose skin will be changed
-        :param mtl_directory: Directory of mtl file to be edited
+        Decides how many textures get the new skin, or whether the object gets a random color.
         :param object_name: object whose skin will be randomized
-        :param new_skin: New skin of object
+        :param material_name: material of the object
+        :param new_skin: file name of the new skin of object
         :return: None
         """
         # Read change_skin from config file
-        change_skin_dict = Parser().parse_long_term_configuration(
-            pathlib.Path(configuration))['change_skin']
+        change_skin_dict = self.configuration['change_skin']
         number = self.get_key(object_name, change_skin_dict)
         if number == 0:
-            p = Parser().parse_long_term_configuration(
-                pathlib.Path(configuration))['jazz']
-            chance = np.random.rand()
+            p = self.configuration['jazz']
+            chance = self.generator.random()
             if 1 - p < chance:
-                rgba = self.random_color(chance)
-                b.Blender().color_object(obj, rgba)
+                self.skin_color = self.random_color()
 
-        # Change skins at specified line numbers
+        # Change the textures of the first number of textured materials
         elif number is not None:
-            for i in range(int(number)):
-                self.change_mtl(mtl_directory, new_skin, 12 + 11 * i)
+            self.texture = self.find_skin(material_name, new_skin)
+            self.texture_slots = int(number)
+
+    def find_skin(self, material_name, skin):
+        """
+        Finds the image of a skin, next to the model or next to the original model of a crush.
+        :param material_name: material of the object
+        :param skin: file name of the skin
+        :return: path to the image or None if it does not exist
+        """
+        directories = [os.path.dirname(self.path), os.path.join(src_dir, 'Models', material_name)]
+        for directory in directories:
+            if os.path.exists(os.path.join(directory, skin)):
+                return os.path.join(directory, skin)
+        return None
 
     def get_key(self, val, my_dict):
         """
@@ -149,26 +170,9 @@ class Object:
 
         return None
 
-    def change_mtl(self, file_to_edit, new_skin, line_number):
-        """
-        Changes the map_Kd line in mtl file.
-        :param line_number: Line number of mtl file to be edited
-        :param file_to_edit: File containing line to be changed
-        :param new_skin: New line to replace file
-        :return: None
-        """
-        # Read and replace line mtl file
-        with open(file_to_edit, 'r') as file:
-            data = file.readlines()
-            data[line_number] = 'map_Kd ' + new_skin + '\n'
-
-        # Write back to mtl file
-        with open(file_to_edit, 'w') as file:
-            file.writelines(data)
-
     def read_skins_from_library(self):
         """
         Read skins from the config file.
         :return: Dict with skins
         """
-        return Parser().parse_long_term_configuration(pathlib.Path(configuration))['skins']
+        return self.configuration['skins']
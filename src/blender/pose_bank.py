@@ -0,0 +1,93 @@
+import sys
+import math
+import argparse
+import pathlib
+import numpy as np
+
+src_dir = "/workdir"
+sys.path.insert(1, src_dir)
+
+from src.util.configuration import load_configuration  # noqa: E402
+from src.util.cache import save_array  # noqa: E402
+from src.blender.blender import Blender  # noqa: E402
+from src.blender.object import Object  # noqa: E402
+
+
+def list_models(materials, reuse_crushes):
+    """
+    Lists the models of the materials.
+    :param materials: list of material names.
+    :param reuse_crushes: Boolean, list the crushed models instead of the original ones.
+    :return: list of paths to the obj files
+    """
+    folder = 'Crushed Models' if reuse_crushes else 'Models'
+    return [str(path) for material in materials
+            for path in sorted(pathlib.Path(src_dir, folder, material).glob('**/*.obj'))]
+
+
+def drop_grid(count, spacing):
+    """
+    Gets the positions models are dropped from, in a square grid around the origin.
+    :param count: integer number of drops.
+    :param spacing: float distance between neighbouring drops.
+    :return: list of (x, y) tuples
+    """
+    side = math.ceil(math.sqrt(count))
+    offsets = (np.arange(side) - (side - 1) / 2) * spacing
+    return [(float(x), float(y)) for y in offsets for x in offsets][:count]
+
+
+def record_poses(blender, path, settings, generator):
+    """
+    Drops copies of a model in random orientations on a plane at once and records how they rest.
+    :param blender: Blender instance.
+    :param path: path to the obj file of the model.
+    :param settings: dictionary with the number of drops and frames to simulate.
+    :param generator: numpy random generator for the orientations.
+    :return: (drops, 5) array of resting poses, see src/util/poses.py
+    """
+    blender.clear_scene([])
+    model = blender.setup_object(Object(path, [0, 0, 0], [0, 0, 0], 'random', None))
+    reach = float(np.max(np.linalg.norm(blender.hulls[model.name], axis=1)))
+    grid = drop_grid(settings['drops'], 2 * reach + 0.1)
+    blender.setup_drop_plane(2 * np.max(np.abs(grid)) + 2 * reach + 0.1)
+    drops = [([x, y, reach + 0.1], generator.uniform(0, 2 * np.pi, size=3).tolist())
+             for x, y in grid]
+    blender.set_object_location(model, drops[0][0])
+    blender.set_object_orientation(model, drops[0][1])
+    models = [model] + [blender.duplicate_object(model, location, orientation)
+                        for location, orientation in drops[1:]]
+    blender.setup_bodies()
+    blender.simulate(settings['frames'])
+    return np.array([blender.get_resting_pose(copy) for copy in models])
+
+
+def parse_pose_args(args, drops):
+    """
+    Parse the arguments of the pose bank.
+    :param args: list with arguments to be parsed.
+    :param drops: integer default number of drops per model.
+    :return: parsed arguments
+    """
+    parser = argparse.ArgumentParser(description='Record resting poses of models')
+    parser.add_argument('-m', '--materials', nargs='+', default=["Aluminium"],
+                        help="a list of materials whose models are dropped")
+    parser.add_argument('-n', '--drops', type=int, default=drops,
+                        help="number of drops per model")
+    parser.add_argument('-rc', '--reuse_crushes', action='store_true',
+                        help="record the poses of the crushed models")
+    parser.add_argument('-s', '--seed', type=int, default=None,
+                        help="integer for repeatable randomness")
+    return parser.parse_args(args)
+
+
+if __name__ == "__main__":
+    configuration = load_configuration()['pose_bank']
+    pose_args = parse_pose_args(sys.argv[sys.argv.index('--') + 1:] if '--' in sys.argv
+                                else [], configuration['drops'])
+    settings = dict(configuration, drops=pose_args.drops)
+    blender, random_generator = Blender(), np.random.default_rng(pose_args.seed)
+    for model_path in list_models(pose_args.materials, pose_args.reuse_crushes):
+        save_array(model_path, 'poses', record_poses(blender, model_path, settings,
+                                                     random_generator))
+        print('Recorded poses of ' + model_path)
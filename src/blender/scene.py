@@ -4,6 +4,12 @@ import math
 src_dir = "/workdir"
 sys.path.insert(1, src_dir)
 from src.blender.blender import Blender  # noqa: E402
+from src.util.configuration import load_configuration  # noqa: E402
+from src.util.cache import FileCache, hash_key  # noqa: E402
+
+template_folder = "Scene Templates/"
+# Changes when the way the scene is built changes, so older templates are not used
+template_version = 1
 
 
 class Scene:
@@ -11,7 +17,8 @@ class Scene:
     Sets up the scene.
     """
 
-    def __init__(self, camera_location, camera_rotation, light_location, light_energy, light_type):
+    def __init__(self, camera_location, camera_rotation, light_location,  # noqa: CFQ002
+                 light_energy, light_type, configuration=None):
         """
         Constructor method for a scene.
         :param camera_location: List with 3 entries stating x,y,z coordinates.
@@ -19,8 +26,10 @@ class Scene:
         :param light_location: List with 3 entries stating x,y,z coordinates.
         :param light_energy: Integer for light strength.
         :param light_type: Type of light.
+        :param configuration: Configuration, the one of configuration.yaml if None.
         """
         self.blender = Blender()
+        self.configuration = configuration if configuration is not None else load_configuration()
         self.camera_location = camera_location
         self.camera_rotation = camera_rotation
         self.light_location = light_location
@@ -55,7 +64,7 @@ class Scene:
         """
         Adds background plane to the scene.
         :param filename: String name of file.
-        :param seed: integer to predict randomness
+        :param seed: integer or numpy Generator to predict randomness
         :return: None
         """
         # angle of camera-view in radians
@@ -65,13 +74,57 @@ class Scene:
         self.blender.setup_background_plane(filename, x_size, y_size, seed)
         self.blender.setup_border_planes(x_size, y_size)
 
+    def swap_background(self, filename, seed, pool_size):
+        """
+        Swaps the image of the background plane.
+        :param filename: String name of file or 'random' for random.
+        :param seed: integer or numpy Generator to predict randomness
+        :param pool_size: integer number of background images kept loaded.
+        :return: None
+        """
+        self.blender.swap_background(filename, seed, pool_size)
+
+    def add_background_from_template(self, filename, seed, cache_size):
+        """
+        Sets up the background, border planes and render parameters by opening the template
+        saved for this configuration, only the background image is swapped, keeping at most
+        the pool size of the backgrounds configuration loaded.
+        Without a template the scene is built and saved as the template.
+        :param filename: String name of file.
+        :param seed: integer or numpy Generator to predict randomness
+        :param cache_size: integer maximum number of bytes of all templates together
+        :return: None
+        """
+        cache = FileCache(src_dir + '/' + template_folder, cache_size)
+        key = self.template_key()
+        entry = cache.get(key)
+        if entry is None:
+            self.clear_scene([])
+            self.add_background(filename, seed)
+            self.set_render_parameters()
+            self.blender.save_template(str(cache.directory / (key[:16] + '.blend')))
+            cache.put(key, [key[:16] + '.blend'], {})
+        else:
+            self.blender.open_template(str(cache.directory / entry['files'][0]))
+            self.swap_background(filename, seed, self.configuration.background_pool_size)
+
+    def template_key(self):
+        """
+        Hashes everything that goes into the template of the scene, except for the background.
+        :return: string key of the template
+        """
+        return hash_key([], {'version': template_version, 'camera_location': self.camera_location,
+                             'camera_rotation': self.camera_rotation,
+                             'light': [self.light_location, self.light_energy, self.light_type],
+                             'render': self.configuration.render})
+
     def add_object(self, object):
         """
         Adds an object to scene.
         :param object: Object to be added.
-        :return: None
+        :return: string name of the added object
         """
-        self.blender.setup_object(object)
+        return self.blender.setup_object(object).name
 
     def setup_bodies(self):
         """
@@ -80,12 +133,57 @@ class Scene:
         """
         self.blender.setup_bodies()
 
-    def reset_objects(self):
+    def reset_objects(self, seed=None):
         """
         Resets the bodies with a random color, location and orientation
+        :param seed: integer or numpy Generator to predict randomness
         :return: None
         """
-        self.blender.reset_objects()
+        self.blender.reset_objects(seed)
+
+    def get_transforms(self, names):
+        """
+        Gets the locations and orientations of objects where they are shown.
+        :param names: list of N object names.
+        :return: tuple of (N, 3) arrays (locations, orientations)
+        """
+        return self.blender.get_transforms(names)
+
+    def get_background(self):
+        """
+        Gets the image shown on the background plane.
+        :return: string file name of the background image
+        """
+        return self.blender.get_background()
+
+    def set_transforms(self, names, locations, orientations):
+        """
+        Places and rotates a number of objects at once.
+        :param names: list of N object names.
+        :param locations: (N, 3) array of x,y,z coordinates.
+        :param orientations: (N, 3) array of rotations.
+        :return: None
+        """
+        self.blender.set_transforms(names, locations, orientations)
+
+    def place_from_pose_bank(self, settings, seed=None):
+        """
+        Places the bodies in recorded resting poses instead of letting them fall.
+        :param settings: dictionary with the pose bank configuration
+        :param seed: integer or numpy Generator to predict randomness
+        :return: True if the bodies were placed, False if they still need to be simulated
+        """
+        return self.blender.place_from_pose_bank(settings['attempts'], settings['extent'], seed)
+
+    def simulate(self, settings):
+        """
+        Lets the bodies fall until they are at rest.
+        :param settings: dictionary with the simulation configuration
+        :return: integer number of simulated frames
+        """
+        return self.blender.simulate(settings['frames'], (settings['linear_threshold'],
+                                                          settings['angular_threshold']),
+                                     settings['window'])
 
     def render_scene(self, output_location, name):
         """
@@ -94,7 +192,6 @@ class Scene:
         :param name: String name of output image.
         :return: None
         """
-        self.blender.simulate(100)
         self.blender.render(src_dir, output_location, name)
 
     def set_render_parameters(self):
@@ -102,7 +199,7 @@ class Scene:
         Set the render output parameters.
         :return: None
         """
-        self.blender.set_render_output_parameters()
+        self.blender.set_render_output_parameters(self.configuration.render)
 
     def get_labeled_bounding_boxes(self, render_configuration):
         """
@@ -113,6 +210,16 @@ class Scene:
         object_names = self.blender.get_object_names()
         return self.blender.get_labeled_object_bounding_boxes(object_names, render_configuration)
 
+    def get_labeled_masks(self, bounding_boxes):
+        """
+        Gets the masks of the objects in the rendered image, with tight bounding boxes
+        and the fraction of every object that is visible
+        :param bounding_boxes: list of (object name, bounding box) taken before rendering
+        :return: list of (object name, bounding box, run-length encoded mask, visible fraction),
+        unchanged without an index pass
+        """
+        return self.blender.get_labeled_object_masks(bounding_boxes)
+
     def export_scene(self, filepath):
         """
         Export a specific scene as an object
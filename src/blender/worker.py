@@ -0,0 +1,72 @@
+import sys
+import argparse
+import traceback
+from multiprocessing.connection import Client
+
+src_dir = "/workdir"
+sys.path.insert(1, src_dir)
+
+from src.blender.main import main  # noqa: E402
+from src.blender.blender import Blender  # noqa: E402
+
+
+class Worker:
+    """
+    Resident Blender process that takes generation jobs from the server's worker pool.
+    Blender is booted once and every job is handled by calling main directly,
+    so only the first job pays for the start up of the container and Blender.
+    """
+
+    def __init__(self, address, authkey):
+        """
+        Connects to the worker pool.
+        :param address: tuple (host, port) the worker pool listens on.
+        :param authkey: bytes used to authenticate with the worker pool.
+        """
+        self.connection = Client(address, authkey=authkey)
+
+    def run(self):
+        """
+        Handles jobs until the worker pool sends None.
+        :return: None
+        """
+        while True:
+            args = self.connection.recv()
+            if args is None:
+                break
+            self.connection.send(self.handle(args))
+        self.connection.close()
+
+    def handle(self, args):
+        """
+        Runs a single job on a fresh scene.
+        Progress of the job is sent to the pool as ('progress', event) after every image.
+        :param args: list with the arguments of main.
+        :return: tuple ('done', time_data) or ('error', message)
+        """
+        # Start from the default scene so jobs have no side effects on each other
+        Blender().reset_scene()
+        try:
+            return 'done', main(args, lambda event: self.connection.send(('progress', event)))
+        except (Exception, SystemExit):
+            traceback.print_exc()
+            return 'error', traceback.format_exc(limit=1)
+
+
+def parse_worker_args(args):
+    """
+    Parse the arguments of the worker.
+    :param args: list with arguments to be parsed.
+    :return: tuple (address, authkey)
+    """
+    parser = argparse.ArgumentParser(description='Resident synthetic data generation worker')
+    parser.add_argument('--address', help="host:port of the worker pool", required=True)
+    parser.add_argument('--authkey', help="hex encoded key of the worker pool", required=True)
+    parsed_args = parser.parse_args(args)
+    host, port = parsed_args.address.rsplit(':', 1)
+    return (host, int(port)), bytes.fromhex(parsed_args.authkey)
+
+
+if __name__ == "__main__":
+    address, authkey = parse_worker_args(sys.argv[sys.argv.index('--') + 1:])
+    Worker(address, authkey).run()
@@ -1,8 +1,10 @@
-from io import StringIO
-from subprocess import run, PIPE
+import shlex
 from flask import render_template, flash
 
+from src.server.pool import WorkerPool
+
 generate_view = 'generate.html'
+pool = None
 
 
 def check_numerical_parameters(form, bash_script, flash_func, numerical):
@@ -50,48 +52,89 @@ def check_switches(form, bash_script, flash_func, switches):
     return bash_script, found_false_input
 
 
-def get_time_data(stdout):
+def check_render_profile(form, bash_script, flash_func, profiles):
     """
-    Parse the arguments.
-    :param stdout: output of the bash script
+    Checks the render profile.
+    :param form: dictionary of the request form
+    :param bash_script: script to insert values into
+    :param flash_func: function to flash the client with
+    :param profiles: names of the render profiles
+
+    :return bash_script: the edited script
+    :return found_false_input: if the profile does not exist
+   """
+    profile = form.get('render_profile') or ''
+    if profile == '':
+        return bash_script, False
+    if profile not in profiles:
+        flash_func('Unknown render profile', 'render_profile')
+        return bash_script, True
+    return bash_script + f"--render_profile={profile} ", False
+
+
+def format_time_data(time_data):
+    """
+    Gives the time data returned by a worker the names shown on the download page.
+    :param time_data: dictionary with the time data of main
     :return: time data.
     """
-    time_data = {}
-    for line in StringIO(stdout):
-        if 'Total Time: ' in line:
-            time_data['Total time'] = float(line.split(' ')[2][:-2])
-        elif 'Object Creation Time: ' in line:
-            time_data['Object creation'] = float(line.split(' ')[3][:-2])
-        elif 'Object Setup Time: ' in line:
-            time_data['Object setup'] = float(line.split(' ')[3][:-2])
-        elif 'Image ' in line and ' Time: ' in line:
-            time_data['Image ' + line.split(' ')[1]] = float(line.split(' ')[3][:-2])
-    return time_data
+    formatted = {'Total time': time_data['total'],
+                 'Object creation': time_data['object_creation_time']}
+    if 'object_setup_time' in time_data:
+        formatted['Object setup'] = time_data['object_setup_time']
+    for key, value in time_data.items():
+        if key.startswith('image_') and key.endswith('_frames'):
+            formatted['Image ' + key.split('_')[1] + ' frames'] = value
+        elif key.startswith('image_'):
+            formatted['Image ' + key.split('_')[1]] = value
+    return formatted
+
+
+def get_pool(configuration):
+    """
+    Gets the pool of resident Blender workers, starting it on first use.
+    :param configuration: configuration of the server
+    :return: the worker pool
+    """
+    global pool
+    if pool is None:
+        pool = WorkerPool(configuration['worker_command'], configuration['workers'],
+                          configuration['worker_address'], configuration.get('job_history', 100))
+    return pool
+
+
+def find_job(job_id):
+    """
+    Looks up a job that was handed to the worker pool.
+    :param job_id: string id of the job
+    :return: the job or None if it does not exist
+    """
+    if pool is None:
+        return None
+    return pool.get(job_id)
 
 
 def generate_images(form, material_list, material_prop, configuration):
     """
-    Parse the arguments and run the bash script
+    Parse the arguments and hand them to a resident Blender worker
     :param form: dictionary of the request form
     :param material_list: list of materials to insert
     :param material_prop: list of proportions to insert
     :param configuration: configuration of the server
 
-    :return: either download or generate view depending on the input
+    :return: either job or generate view depending on the input
     """
-    bash_script = 'docker run -it --rm -v "$(pwd)":/workdir ' \
-                  'recycleye blender -noaudio -b -E CYCLES -P src/blender/main.py -- ' \
-                  f'-m {material_list} ' + f'-p {material_prop} '
-    bash_script, found_false_input = \
-        check_numerical_parameters(form, bash_script, flash, configuration['numerical'])
-    bash_script, found_false_input_2 = \
-        check_switches(form, bash_script, flash, configuration['switches'])
-    if found_false_input or found_false_input_2:
+    arguments = f'-m {material_list} ' + f'-p {material_prop} '
+    arguments, found_false_input = \
+        check_numerical_parameters(form, arguments, flash, configuration['numerical'])
+    arguments, found_false_input_2 = \
+        check_switches(form, arguments, flash, configuration['switches'])
+    arguments, found_false_input_3 = \
+        check_render_profile(form, arguments, flash, configuration.get('render_profiles', []))
+    if found_false_input or found_false_input_2 or found_false_input_3:
         return render_template(generate_view, configuration=configuration, form=form)
-    completed_process = run(bash_script, shell=True, stdout=PIPE, encoding="utf-8")
-    print(completed_process.stdout)
-    time_data = get_time_data(completed_process.stdout)
-    return render_template('download.html', time_data=time_data)
+    job = get_pool(configuration).submit(shlex.split(arguments))
+    return render_template('job.html', job_id=job.id), 202
 
 
 def check_materials(form, materials, flash_func):
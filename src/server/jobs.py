@@ -0,0 +1,111 @@
+import uuid
+import threading
+
+
+class Job:
+    """
+    A generation job that is handled by one of the workers of the pool.
+    Keeps the progress events sent by the worker so they can be reported and streamed.
+    """
+
+    def __init__(self, args):
+        """
+        Constructor method for a job.
+        :param args: list with the arguments passed to main of the worker.
+        """
+        self.id = uuid.uuid4().hex
+        self.args = args
+        self.status = 'queued'
+        self.events = []
+        self.result = None
+        self.error = None
+        self.condition = threading.Condition()
+
+    def start(self):
+        """
+        Marks the job as picked up by a worker.
+        :return: None
+        """
+        with self.condition:
+            self.status = 'running'
+            self.condition.notify_all()
+
+    def progress(self, event):
+        """
+        Stores a progress event of the worker, e.g. a finished image.
+        :param event: dictionary describing the progress.
+        :return: None
+        """
+        with self.condition:
+            self.events.append(event)
+            self.condition.notify_all()
+
+    def finish(self, status, payload):
+        """
+        Stores the outcome of the job and wakes up everyone waiting for it.
+        :param status: string 'done' or 'error'.
+        :param payload: time data if the job is done, error message otherwise.
+        :return: None
+        """
+        with self.condition:
+            if status == 'done':
+                self.result = payload
+            else:
+                self.error = payload
+            self.status = status
+            self.condition.notify_all()
+
+    def is_finished(self):
+        """
+        Checks whether the worker is done with the job.
+        :return: True if the job is done or failed
+        """
+        return self.status in ('done', 'error')
+
+    def wait(self, timeout=None):
+        """
+        Blocks until the job is finished.
+        :param timeout: seconds to wait or None to wait forever.
+        :return: time data of the job, raises TimeoutError if it is not finished in time
+        """
+        with self.condition:
+            if not self.condition.wait_for(self.is_finished, timeout):
+                raise TimeoutError(f'job {self.id} did not finish in {timeout} seconds')
+        if self.error is not None:
+            raise RuntimeError(self.error)
+        return self.result
+
+    def events_since(self, index, timeout=None):
+        """
+        Blocks until there are events after index or the job is finished.
+        :param index: integer number of events already seen.
+        :param timeout: seconds to wait or None to wait forever.
+        :return: list of new events
+        """
+        with self.condition:
+            self.condition.wait_for(lambda: len(self.events) > index or self.is_finished(),
+                                    timeout)
+            return self.events[index:]
+
+    def follow(self):
+        """
+        Yields the progress events as they come in, ending with the outcome of the job.
+        :return: generator of event dictionaries
+        """
+        index = 0
+        while not self.is_finished() or index < len(self.events):
+            events = self.events_since(index)
+            index += len(events)
+            yield from events
+        yield self.to_dict()
+
+    def to_dict(self):
+        """
+        Describes the current state of the job.
+        :return: dictionary with status, finished images, time data and error of the job
+        """
+        with self.condition:
+            last = self.events[-1] if self.events else {}
+            return {'id': self.id, 'status': self.status,
+                    'images_done': len(self.events), 'image_count': last.get('image_count'),
+                    'images': list(self.events), 'time_data': self.result, 'error': self.error}
@@ -1,7 +1,8 @@
 from pathlib import Path
 from io import BytesIO
+import json
 import sys
-from flask import Flask, request, render_template, send_file
+from flask import Flask, Response, abort, jsonify, request, render_template, send_file
 import zipfile
 import os
 
@@ -9,13 +10,16 @@ src_dir = "/workdir"
 sys.path.insert(1, src_dir)
 sys.path.append(os.getcwd())
 
-from src.server.generate import check_generate  # noqa: E402
+from src.server.generate import check_generate, find_job, format_time_data  # noqa: E402
 from src.util.parser import Parser  # noqa: E402
 
 app = Flask(__name__, template_folder='../../templates', static_folder='../../static')
 app.secret_key = "don't tell anyone!!!"
 
-configuration = Parser().parse_long_term_configuration(Path("configuration.yaml"))['flask']
+long_term_configuration = Parser().parse_long_term_configuration(Path("configuration.yaml"))
+# The form offers the render profiles of the render configuration
+configuration = dict(long_term_configuration['flask'],
+                     render_profiles=list(long_term_configuration.get('render_profiles') or {}))
 
 
 @app.route("/")
@@ -62,5 +66,51 @@ def generate():
         return render_template('generate.html', configuration=configuration)
 
 
+def get_job(job_id):
+    """
+    Gets a job or aborts with 404 if it does not exist.
+    :param job_id: string id of the job
+    :return: the job
+    """
+    job = find_job(job_id)
+    if job is None:
+        abort(404)
+    return job
+
+
+@app.route('/jobs/<job_id>')
+def job_status(job_id):
+    """
+    Reports the progress of a generation job.
+    :param job_id: string id of the job
+    :return: json with the status, finished images and time data of the job.
+    """
+    return jsonify(get_job(job_id).to_dict())
+
+
+@app.route('/jobs/<job_id>/events')
+def job_events(job_id):
+    """
+    Streams the progress of a generation job as server-sent events.
+    Every finished image is an event, the last event is the state of the finished job.
+    :param job_id: string id of the job
+    :return: event stream response.
+    """
+    job = get_job(job_id)
+    stream = (f"data: {json.dumps(event)}\n\n" for event in job.follow())
+    return Response(stream, mimetype='text/event-stream')
+
+
+@app.route('/jobs/<job_id>/result')
+def job_result(job_id):
+    """
+    Renders the download page with the times of a finished generation job.
+    :param job_id: string id of the job
+    """
+    job = get_job(job_id)
+    time_data = format_time_data(job.result) if job.result is not None else None
+    return render_template('download.html', time_data=time_data)
+
+
 if __name__ == "__main__":
     app.run(port=5000)
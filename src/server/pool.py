@@ -0,0 +1,133 @@
+import os
+import queue
+import threading
+from collections import OrderedDict
+from subprocess import Popen
+from multiprocessing.connection import Listener
+
+from src.server.jobs import Job
+
+
+class WorkerPool:
+    """
+    Keeps a number of Blender processes resident and hands them jobs from a queue.
+    """
+
+    def __init__(self, command, size, address, history=100):
+        """
+        Starts listening for workers and launches them.
+        :param command: shell command that starts a worker, the address and key are appended.
+        :param size: integer number of resident workers.
+        :param address: list with host and port to listen on.
+        :param history: integer number of finished jobs kept to be looked up.
+        """
+        self.command = command
+        self.jobs = queue.Queue()
+        # Submitted jobs in order of submission, the oldest finished ones are dropped
+        self.registry = OrderedDict()
+        self.registry_lock = threading.Lock()
+        self.history = history
+        self.authkey = os.urandom(16)
+        self.listener = Listener(tuple(address), authkey=self.authkey)
+        self.processes = []
+        threading.Thread(target=self.accept, daemon=True).start()
+        for _ in range(size):
+            self.spawn()
+
+    def spawn(self):
+        """
+        Launches a worker process that connects back to the pool.
+        :return: None
+        """
+        host, port = self.listener.address
+        self.processes.append(Popen(f'{self.command} --address {host}:{port} '
+                                    f'--authkey {self.authkey.hex()}', shell=True))
+
+    def accept(self):
+        """
+        Accepts connecting workers and serves each of them on its own thread.
+        :return: None
+        """
+        while True:
+            try:
+                connection = self.listener.accept()
+            except OSError:
+                return
+            threading.Thread(target=self.serve, args=(connection,), daemon=True).start()
+
+    def serve(self, connection):
+        """
+        Feeds jobs from the queue to a single worker until the pool is closed.
+        A worker that dies during a job fails that job and is replaced.
+        :param connection: connection to the worker.
+        :return: None
+        """
+        job = self.jobs.get()
+        while job is not None:
+            try:
+                self.handle(connection, job)
+            except (EOFError, OSError):
+                job.finish('error', 'worker stopped while handling the job')
+                self.spawn()
+                return
+            job = self.jobs.get()
+        connection.send(None)
+        connection.close()
+
+    def handle(self, connection, job):
+        """
+        Sends a job to a worker and relays its progress until it is finished.
+        :param connection: connection to the worker.
+        :param job: Job to be handled.
+        :return: None
+        """
+        job.start()
+        connection.send(job.args)
+        status, payload = connection.recv()
+        while status == 'progress':
+            job.progress(payload)
+            status, payload = connection.recv()
+        job.finish(status, payload)
+
+    def submit(self, args):
+        """
+        Queues a job for the next free worker.
+        :param args: list with the arguments passed to main of the worker.
+        :return: the queued Job
+        """
+        job = Job(args)
+        with self.registry_lock:
+            self.registry[job.id] = job
+            self.prune()
+        self.jobs.put(job)
+        return job
+
+    def prune(self):
+        """
+        Drops the oldest finished jobs from the registry when more than history are finished.
+        Unfinished jobs are always kept.
+        :return: None
+        """
+        finished = [job_id for job_id, job in self.registry.items() if job.is_finished()]
+        for job_id in finished[:max(0, len(finished) - self.history)]:
+            del self.registry[job_id]
+
+    def get(self, job_id):
+        """
+        Looks up a submitted job.
+        :param job_id: string id of the job.
+        :return: the Job or None if there is no job with that id or it was dropped
+        """
+        with self.registry_lock:
+            return self.registry.get(job_id)
+
+    def close(self):
+        """
+        Stops all workers once they finished their current job.
+        :return: None
+        """
+        for _ in self.processes:
+            self.jobs.put(None)
+        for process in self.processes:
+            process.wait()
+        self.listener.close()
@@ -1,8 +1,29 @@
+import os
+import sys
 import json
+import numpy as np
+from itertools import islice
 from datetime import datetime
 from pathlib import Path
 
 src_dir = "/workdir"
+sys.path.insert(1, src_dir)
+
+from src.util.masks import rle_area  # noqa: E402
+
+# Boxes whose width plus height is not larger than min_box_size or whose area is smaller than
+# min_area are left out, unless the filter of the info json configuration says otherwise.
+# Objects with a mask of which less than min_visibility is seen are left out, or with occluded
+# set to 'flag' kept as crowd annotations, which evaluation ignores
+default_filter = {'min_box_size': 200, 'min_area': 0, 'min_visibility': 0, 'occluded': 'drop'}
+# Number of images whose annotations are made at once
+chunk_size = 1000
+annotation_template = ('{"id": %d, "image_id": %d, "category_id": %d, '
+                       '"segmentation": [[%s, %s, %s, %s, %s, %s, %s, %s]], '
+                       '"area": %s, "bbox": [%s, %s, %s, %s], "iscrowd": 0}')
+# Annotation of an object with a mask, the segmentation is its run-length encoding as json text
+mask_template = ('{"id": %d, "image_id": %d, "category_id": %d, "segmentation": %s, '
+                 '"area": %s, "bbox": [%s, %s, %s, %s], "visibility": %s, "iscrowd": %d}')
 
 
 def get_info(description, version, time_now):
@@ -18,27 +39,36 @@ def get_info(description, version, time_now):
                 date_created=f"{time_now.year}/{time_now.month}/{time_now.day}")
 
 
-def get_image_info(n_images, resolution, time_now):
+def get_image_info(n_images, resolution, time_now, start_index=0):
     """
     Gets the information about the images in the data set
     :param n_images: number of images
     :param resolution: resolution of the images
     :param time_now: current time
-    :return: a dict containing the needed information about the images
+    :param start_index: index of the first image
+    :return: a list containing the needed information about the images
+    """
+    return list(image_records(n_images, resolution, time_now, start_index))
+
+
+def image_records(n_images, resolution, time_now, start_index=0):
+    """
+    Generates the information about the images one image at a time
+    :param n_images: number of images
+    :param resolution: resolution of the images
+    :param time_now: current time
+    :param start_index: index of the first image
+    :return: generator of dicts containing the needed information about an image
     """
-    image_info = []
     date = f"{time_now.year}/{time_now.month}/{time_now.day}"
-    for i in range(n_images):
-        image_info.append(
-            {
-                'id': i,
-                'width': resolution[0],
-                'height': resolution[1],
-                'file_name': f"{i}.jpg",
-                'date_captured': date
-            }
-        )
-    return image_info
+    for i in range(start_index, start_index + n_images):
+        yield {
+            'id': i,
+            'width': resolution[0],
+            'height': resolution[1],
+            'file_name': f"{i}.jpg",
+            'date_captured': date
+        }
 
 
 def get_category_id(object_name, category_dict, name_dict):
@@ -58,28 +88,163 @@ def get_category_id(object_name, category_dict, name_dict):
     return -1
 
 
-def get_annotation_info(bounding_boxes, category_dict, name_dict):
+def get_category_table(category_dict, name_dict):
+    """
+    Gets the category id of every object name at once, so it is looked up in constant time
+    :param category_dict: dictionary of categories
+    :param name_dict: dictionary of names as keys and material as value
+    :return: a dict from object name to category id, names that are not in it have category -1
+    """
+    return {name: get_category_id(name, category_dict, name_dict) for name in name_dict}
+
+
+def get_annotation_info(bounding_boxes, category_dict, name_dict, start_index=0,
+                        box_filter=None):
     """
     Gets the annotations
     :param bounding_boxes: bounding boxes for each image
     :param category_dict: dictionary of categories as specified in the configuration
     :param name_dict: dictionary of names as keys and material as value
+    :param start_index: index of the first image
+    :param box_filter: dict with the min_box_size and min_area of a box, default_filter if None
     :return: a list containing all the annotations
     """
-    annotations = []
-    counter = 0
-    for i_image, image_bounding_boxes in enumerate(bounding_boxes):
-        for i_object, (object_name, object_bounding_box) in enumerate(image_bounding_boxes):
-            x, y, width, height = object_bounding_box
-            if width + height > 200:
-                annotations.append({
-                    "id": counter, "image_id": i_image,
-                    "category_id": get_category_id(object_name, category_dict, name_dict),
-                    "segmentation": [x, y, x + width, y - height, x + width, y, x, y - height],
-                    "area": width * height, "bbox": object_bounding_box, "iscrowd": 0,
-                })
-            counter += 1
-    return annotations
+    return list(annotation_records(bounding_boxes, category_dict, name_dict, start_index,
+                                   box_filter))
+
+
+def annotation_records(bounding_boxes, category_dict, name_dict, start_index=0,
+                       box_filter=None):
+    """
+    Generates the annotations one at a time, so the bounding boxes can be read as they are needed
+    :param bounding_boxes: iterable with the bounding boxes for each image
+    :param category_dict: dictionary of categories as specified in the configuration
+    :param name_dict: dictionary of names as keys and material as value
+    :param start_index: index of the first image
+    :param box_filter: dict with the min_box_size and min_area of a box, default_filter if None
+    :return: generator of annotation dicts
+    """
+    for rows in annotation_chunks(bounding_boxes, category_dict, name_dict, start_index,
+                                  box_filter):
+        for row in rows:
+            annotation = {"id": int(row[0]), "image_id": int(row[1]),
+                          "category_id": int(row[2]), "segmentation": [row[3:11]],
+                          "area": row[11], "bbox": row[12:16], "iscrowd": 0}
+            if row[18] is not None:
+                annotation.update(segmentation=row[18], visibility=row[16], iscrowd=row[17])
+            yield annotation
+
+
+def annotation_lines(bounding_boxes, category_dict, name_dict, start_index=0,
+                     box_filter=None):
+    """
+    Generates the annotations as json text, without building a dict for every annotation
+    :param bounding_boxes: iterable with the bounding boxes for each image
+    :param category_dict: dictionary of categories as specified in the configuration
+    :param name_dict: dictionary of names as keys and material as value
+    :param start_index: index of the first image
+    :param box_filter: dict with the min_box_size and min_area of a box, default_filter if None
+    :return: generator of json strings, one per annotation
+    """
+    for rows in annotation_chunks(bounding_boxes, category_dict, name_dict, start_index,
+                                  box_filter):
+        yield from (annotation_template % tuple(row[:16]) if row[18] is None else
+                    mask_template % (*row[:3], json.dumps(row[18]), *row[11:18]) for row in rows)
+
+
+def annotation_chunks(bounding_boxes, category_dict, name_dict, start_index=0,
+                      box_filter=None):
+    """
+    Annotates the images a chunk at a time, every chunk is filtered and measured all at once
+    :param bounding_boxes: iterable with the bounding boxes for each image
+    :param category_dict: dictionary of categories as specified in the configuration
+    :param name_dict: dictionary of names as keys and material as value
+    :param start_index: index of the first image
+    :param box_filter: dict with the min_box_size and min_area of a box, default_filter if None
+    :return: generator of lists of rows, see get_annotation_rows
+    """
+    category_table = get_category_table(category_dict, name_dict)
+    box_filter = default_filter if box_filter is None else box_filter
+    images, image_id, counter = iter(bounding_boxes), start_index, 0
+    chunk = list(islice(images, chunk_size))
+    while chunk:
+        labeled_boxes = [labeled_box for image_boxes in chunk for labeled_box in image_boxes]
+        image_ids = np.repeat(np.arange(image_id, image_id + len(chunk)),
+                              [len(image_boxes) for image_boxes in chunk])
+        yield get_annotation_rows(labeled_boxes, image_ids, counter, category_table, box_filter)
+        image_id, counter = image_id + len(chunk), counter + len(labeled_boxes)
+        chunk = list(islice(images, chunk_size))
+
+
+def get_annotation_rows(labeled_boxes, image_ids, first_id, category_table, box_filter):
+    """
+    Annotates boxes of any number of images at once
+    :param labeled_boxes: list of (object name, bounding box) or
+    (object name, bounding box, mask, visible fraction)
+    :param image_ids: array with the id of the image of every box
+    :param first_id: id of the annotation of the first box, the boxes are numbered in order
+    :param category_table: dict from object name to category id, see get_category_table
+    :param box_filter: dict with the min_box_size, min_area and optionally the min_visibility
+    of a box and whether occluded boxes are dropped or flagged, see default_filter
+    :return: list with a row per box that passes the filter: id, image id, category id,
+    8 polygon coordinates of the box, area, 4 bbox values, visible fraction, 1 if the box is
+    flagged as occluded else 0 and the mask or None
+    """
+    if len(labeled_boxes) == 0:
+        return []
+    boxes = np.array([labeled_box[1] for labeled_box in labeled_boxes]).reshape(-1, 4)
+    categories = np.array([category_table.get(labeled_box[0], -1) for labeled_box in labeled_boxes])
+    masks, visibility = get_masks(labeled_boxes)
+    x, y, width, height = boxes.T
+    area = get_areas(width * height, masks)
+    occluded = visibility < box_filter.get('min_visibility', 0)
+    kept = filter_boxes(width + height, area, occluded, box_filter)
+    rows = np.column_stack([first_id + np.arange(len(boxes)), image_ids, categories,
+                            x, y, x + width, y, x + width, y + height, x, y + height,
+                            area, boxes])[kept].tolist()
+    extras = list(zip(visibility.tolist(), occluded.astype(int).tolist(), masks))
+    return [row + list(extras[i]) for row, i in zip(rows, kept.tolist())]
+
+
+def filter_boxes(box_sizes, areas, occluded, box_filter):
+    """
+    Finds the boxes that pass the filter
+    :param box_sizes: array with the width plus height of every box
+    :param areas: array with the area of every box
+    :param occluded: boolean array, True for the boxes that are seen too little
+    :param box_filter: dict with the min_box_size and min_area of a box and optionally whether
+    occluded boxes are dropped or flagged, see default_filter
+    :return: array with the indices of the boxes that are kept
+    """
+    return np.flatnonzero((box_sizes > box_filter['min_box_size']) &
+                          (areas >= box_filter['min_area']) &
+                          (~occluded | (box_filter.get('occluded', 'drop') == 'flag')))
+
+
+def get_masks(labeled_boxes):
+    """
+    Gets the masks of the objects and the fraction of them that is visible
+    :param labeled_boxes: list of (object name, bounding box) or
+    (object name, bounding box, mask, visible fraction)
+    :return: tuple (list with the mask of every object or None,
+    array with the visible fraction of every object, 1 for an object without mask)
+    """
+    masks = [labeled_box[2] if len(labeled_box) > 2 else None for labeled_box in labeled_boxes]
+    visibility = [labeled_box[3] if len(labeled_box) > 3 else 1.0 for labeled_box in labeled_boxes]
+    return masks, np.array(visibility, dtype=np.float64)
+
+
+def get_areas(box_areas, masks):
+    """
+    Gets the area of every object, the pixels of its mask or else the area of its box
+    :param box_areas: array with the area of the box of every object
+    :param masks: list with the run-length encoded mask of every object or None
+    :return: array with the area of every object
+    """
+    if all(mask is None for mask in masks):
+        return box_areas
+    return np.array([box_area if mask is None else rle_area(mask)
+                     for box_area, mask in zip(box_areas.tolist(), masks)])
 
 
 def get_category_info(category_dict):
@@ -95,24 +260,112 @@ def get_category_info(category_dict):
     return categories
 
 
-def write_file(info_configuration, resolution, name, n_images, bounding_boxes):
+def write_file(info_configuration, resolution, name, n_images, bounding_boxes, start_index=0):
     """
-    Write the file with the needed dataset information
+    Write the file with the needed dataset information.
+    The images and annotations are written one at a time, so the bounding boxes can be streamed
+    from the annotation log instead of being held in memory. The file is replaced once complete.
     :param info_configuration: configuration of the info json
     :param resolution: resolution of the images
-    :param name: name of the file
+    :param name: path of the file relative to the source directory e.g. 'images/info'
     :param n_images: number of images
-    :param bounding_boxes: List of len (n_images)
+    :param bounding_boxes: iterable of len (n_images)
     containing the bounding boxes for each image.
+    :param start_index: index of the first image
     """
     time_now = datetime.now()
-    with open(Path(src_dir + r'/images/' + name + '.json'), 'w') as file:
-        json.dump({
-            "info": get_info(info_configuration['description'],
-                             info_configuration['version'], time_now),
-            "images": get_image_info(n_images, resolution, time_now),
-            "annotations": get_annotation_info(bounding_boxes, info_configuration['categories'],
-                                               info_configuration['names']),
-            "categories": get_category_info(info_configuration['categories'])
-        },
-            file)
+    path = Path(src_dir, name + '.json')
+    with open(path.with_suffix('.tmp'), 'w') as file:
+        file.write('{"info": ' + json.dumps(get_info(info_configuration['description'],
+                                                     info_configuration['version'], time_now)))
+        file.write(', "categories": ' +
+                   json.dumps(get_category_info(info_configuration['categories'])))
+        write_array(file, 'images', map(json.dumps, image_records(n_images, resolution, time_now,
+                                                                  start_index)))
+        write_array(file, 'annotations', annotation_lines(
+            bounding_boxes, info_configuration['categories'], info_configuration['names'],
+            start_index, info_configuration.get('filter')))
+        file.write('}')
+    os.replace(path.with_suffix('.tmp'), path)
+
+
+def write_array(file, key, records):
+    """
+    Writes a member of a json object whose value is an array, one record at a time.
+    :param file: file the object is written to, after at least one other member
+    :param key: name of the member
+    :param records: iterable of records as json text
+    :return: None
+    """
+    file.write(', "' + key + '": [')
+    for i, record in enumerate(records):
+        file.write((', ' if i > 0 else '') + record)
+    file.write(']')
+
+
+def patch_file(info_configuration, resolution, name, bounding_boxes, start_index):
+    """
+    Replaces the annotations of a range of images in an existing dataset file,
+    e.g. after these images were rendered again.
+    :param info_configuration: configuration of the info json
+    :param resolution: resolution of the images
+    :param name: path of the file relative to the source directory e.g. 'images/info'
+    :param bounding_boxes: list containing the bounding boxes for each image of the range.
+    :param start_index: index of the first image of the range
+    :return: None
+    """
+    path = Path(src_dir, name + '.json')
+    with open(path) as file:
+        dataset = json.load(file)
+    image_ids = {image['id'] for image in dataset['images']}
+    dataset['images'] += [image for image in get_image_info(len(bounding_boxes), resolution,
+                                                            datetime.now(), start_index)
+                          if image['id'] not in image_ids]
+    replace_annotations(dataset, get_annotation_info(
+        bounding_boxes, info_configuration['categories'], info_configuration['names'],
+        start_index, info_configuration.get('filter')),
+        range(start_index, start_index + len(bounding_boxes)))
+    temporary_path = path.with_suffix('.tmp')
+    with open(temporary_path, 'w') as file:
+        json.dump(dataset, file)
+    os.replace(temporary_path, path)
+
+
+def replace_annotations(dataset, annotations, image_ids):
+    """
+    Replaces the annotations of some images of a dataset, the new ones get unused ids.
+    :param dataset: dictionary of the dataset file, its annotations are changed.
+    :param annotations: list of the new annotations.
+    :param image_ids: ids of the images whose annotations are replaced.
+    :return: None
+    """
+    image_ids = set(image_ids)
+    kept = [annotation for annotation in dataset['annotations']
+            if annotation['image_id'] not in image_ids]
+    next_id = max([annotation['id'] for annotation in dataset['annotations']] + [-1]) + 1
+    dataset['annotations'] = kept + [dict(annotation, id=next_id + i)
+                                     for i, annotation in enumerate(annotations)]
+
+
+def merge_files(file_paths, output_path):
+    """
+    Merges the dataset files of several shards into one.
+    Image ids are already unique since every shard starts at its own index,
+    annotation ids are renumbered and file names are made relative to the merged file.
+    :param file_paths: list of paths to the dataset files of the shards
+    :param output_path: path of the merged dataset file
+    :return: None
+    """
+    merged = dict(images=[], annotations=[])
+    for file_path in file_paths:
+        with open(file_path) as file:
+            shard = json.load(file)
+        prefix = os.path.relpath(Path(file_path).parent, Path(output_path).parent)
+        merged.update(info=shard['info'], categories=shard['categories'])
+        for image in shard['images']:
+            merged['images'].append(dict(image, file_name=f"{prefix}/{image['file_name']}"))
+        for annotation in shard['annotations']:
+            merged['annotations'].append(dict(annotation, id=len(merged['annotations'])))
+    merged['images'].sort(key=lambda image: image['id'])
+    with open(output_path, 'w') as file:
+        json.dump(merged, file)
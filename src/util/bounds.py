@@ -0,0 +1,120 @@
+import numpy as np
+
+
+def to_camera_space(coordinates, matrix):
+    """
+    Transforms vertex coordinates with a 4x4 matrix.
+    :param coordinates: (N, 3) array of vertex coordinates.
+    :param matrix: 4x4 array, e.g. inverted camera matrix @ object matrix.
+    :return: (N, 3) array of transformed coordinates
+    """
+    matrix = np.asarray(matrix, dtype=np.float64)
+    return coordinates @ matrix[:3, :3].T + matrix[:3, 3]
+
+
+def project_bounds(coordinates, frame, perspective):
+    """
+    Projects camera space vertices on the camera frame and gets their normalized extremes.
+    For a perspective camera the frame is scaled to the depth of every vertex, a vertex at
+    depth 0 counts as the center of the frame and keeps the frame of the vertex before it.
+    :param coordinates: (N, 3) array of camera space vertex coordinates.
+    :param frame: (3, 3) array with the first three corners of the negated camera view frame.
+    :param perspective: True for a perspective camera, False for an orthographic one.
+    :return: tuple (min x, max x, min y, max y) clipped to [0, 1]
+    """
+    x, y = project_points(coordinates, frame, perspective)
+    if perspective and np.any(coordinates[:, 2] == 0.0):
+        x, y = np.append(x, 0.5), np.append(y, 0.5)
+    return tuple(float(value) for value in np.clip([x.min(), x.max(), y.min(), y.max()], 0, 1))
+
+
+def project_points(coordinates, frame, perspective):
+    """
+    Projects camera space vertices on the camera frame, see project_bounds.
+    :param coordinates: (N, 3) array of camera space vertex coordinates.
+    :param frame: (3, 3) array with the first three corners of the negated camera view frame.
+    :param perspective: True for a perspective camera, False for an orthographic one.
+    :return: tuple of (N,) arrays x and y, normalized to [0, 1] inside the frame but not clipped
+    """
+    frame = np.asarray(frame, dtype=np.float64)
+    scale = np.ones(len(coordinates))
+    if perspective:
+        scale = frame_scale(-coordinates[:, 2], frame[0, 2])
+    min_x, max_x = frame[1, 0] * scale, frame[2, 0] * scale
+    min_y, max_y = frame[0, 1] * scale, frame[1, 1] * scale
+    return (coordinates[:, 0] - min_x) / (max_x - min_x), \
+        (coordinates[:, 1] - min_y) / (max_y - min_y)
+
+
+def frame_scale(depth, frame_depth):
+    """
+    Gets the factor the frame is scaled with for every vertex of a perspective camera.
+    :param depth: (N,) array of vertex depths in front of the camera.
+    :param frame_depth: depth of the camera view frame.
+    :return: (N,) array with the depth of the last vertex with a nonzero depth over frame_depth
+    """
+    depths = np.concatenate(([frame_depth], depth))
+    last_nonzero = np.where(depths != 0.0, np.arange(len(depths)), 0)
+    return depths[np.maximum.accumulate(last_nonzero)][1:] / frame_depth
+
+
+def silhouette_area(coordinates, frame, perspective, resolution):
+    """
+    Gets the area the convex hull of an object would cover in the image if nothing hid it,
+    including the part that falls outside of the frame.
+    :param coordinates: (N, 3) array of camera space coordinates of the hull vertices.
+    :param frame: (3, 3) array with the first three corners of the negated camera view frame.
+    :param perspective: True for a perspective camera, False for an orthographic one.
+    :param resolution: tuple (width, height) of the rendered image in pixels.
+    :return: float area in pixels
+    """
+    x, y = project_points(coordinates, frame, perspective)
+    return convex_area(np.column_stack((x * resolution[0], y * resolution[1])))
+
+
+def convex_area(points):
+    """
+    Gets the area of the convex hull of points in the plane, using Andrew's monotone chain.
+    :param points: (N, 2) array of points.
+    :return: float area, 0 for fewer than three distinct points
+    """
+    points = sorted(set(map(tuple, np.asarray(points, dtype=np.float64).tolist())))
+    if len(points) < 3:
+        return 0.0
+    x, y = np.array(half_hull(points) + half_hull(points[::-1])).T
+    return float(abs(np.dot(x, np.roll(y, -1)) - np.dot(y, np.roll(x, -1))) / 2)
+
+
+def half_hull(points):
+    """
+    Gets the lower half of the convex hull of sorted points, the upper half for reversed points.
+    :param points: list of (x, y) tuples, sorted.
+    :return: list of the hull points in counterclockwise order, without the last point
+    """
+    hull = []
+    for point in points:
+        while len(hull) >= 2 and ((hull[-1][0] - hull[-2][0]) * (point[1] - hull[-2][1]) -
+                                  (hull[-1][1] - hull[-2][1]) * (point[0] - hull[-2][0])) <= 0:
+            hull.pop()
+        hull.append(point)
+    return hull[:-1]
+
+
+def to_pixel_box(bounds, resolution):
+    """
+    Converts normalized bounds to a pixel bounding box with the origin at the top left.
+    :param bounds: tuple (min x, max x, min y, max y) in [0, 1].
+    :param resolution: tuple (width, height) of the rendered image in pixels.
+    :return: tuple (x, y, width, height), all 0 if the box is empty
+    """
+    min_x, max_x, min_y, max_y = bounds
+    dim_x, dim_y = resolution
+    # Sanity check
+    if round((max_x - min_x) * dim_x) == 0 or round((max_y - min_y) * dim_y) == 0:
+        return 0, 0, 0, 0
+    return (
+        round(min_x * dim_x),  # X
+        round(dim_y - max_y * dim_y),  # Y
+        round((max_x - min_x) * dim_x),  # Width
+        round((max_y - min_y) * dim_y)  # Height
+    )
@@ -0,0 +1,178 @@
+import os
+import json
+import glob
+import time
+import fcntl
+import hashlib
+import pathlib
+import numpy as np
+from contextlib import contextmanager
+
+
+def hash_key(paths, parameters):
+    """
+    Hashes the contents of files together with the parameters used to process them.
+    :param paths: list of paths to the input files.
+    :param parameters: dictionary of json serializable parameters.
+    :return: string hex digest
+    """
+    digest = hashlib.sha256()
+    for path in paths:
+        with open(path, 'rb') as file:
+            digest.update(file.read())
+    digest.update(json.dumps(parameters, sort_keys=True).encode())
+    return digest.hexdigest()
+
+
+def model_files(path):
+    """
+    Lists the files a model is read from, the obj file and its mtl file if it has one.
+    :param path: path to the obj file of the model.
+    :return: list of paths
+    """
+    mtl_path = os.path.splitext(path)[0] + '.mtl'
+    return [path] + ([mtl_path] if os.path.exists(mtl_path) else [])
+
+
+def library_path(path):
+    """
+    Gets the path of the Blender library a model is converted to, next to the model itself.
+    :param path: path to the obj file of the model.
+    :return: string path of the .blend file
+    """
+    return os.path.splitext(path)[0] + '.mesh.blend'
+
+
+def array_path(path, name):
+    """
+    Gets the path of an array derived from a model, stored next to the model itself.
+    :param path: path to the obj file of the model.
+    :param name: string name of the array, e.g. 'hull'.
+    :return: string path of the array file
+    """
+    return os.path.splitext(path)[0] + '.' + name + '.npy'
+
+
+def load_array(path, name):
+    """
+    Loads an array derived from a model.
+    :param path: path to the obj file of the model.
+    :param name: string name of the array.
+    :return: the array or None if it is missing or older than the model
+    """
+    cached = array_path(path, name)
+    if not os.path.exists(cached) or os.path.getmtime(cached) < os.path.getmtime(path):
+        return None
+    return np.load(cached)
+
+
+def save_array(path, name, array):
+    """
+    Stores an array derived from a model, written atomically since shards may share models.
+    :param path: path to the obj file of the model.
+    :param name: string name of the array.
+    :param array: numpy array to be stored.
+    :return: None
+    """
+    cached = array_path(path, name)
+    temporary_path = f'{cached}.{os.getpid()}.npy'
+    np.save(temporary_path, array)
+    os.replace(temporary_path, cached)
+
+
+class FileCache:
+    """
+    Cache of generated files, addressed by a hash of whatever they were generated from.
+    An index file keeps track of the entries and when they were last used,
+    the least recently used entries are removed when the cache grows over its size limit.
+    """
+
+    def __init__(self, directory, size_limit):
+        """
+        Constructor method for a cache.
+        :param directory: path to the directory containing the cached files and the index.
+        :param size_limit: integer maximum number of bytes of all cached files together.
+        """
+        self.directory = pathlib.Path(directory)
+        self.size_limit = size_limit
+        self.index_path = self.directory / 'index.json'
+
+    @contextmanager
+    def index(self):
+        """
+        Opens the index for modification, locked against other processes using the cache.
+        :return: context manager giving the index dictionary, which is saved on exit
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with open(self.directory / 'index.lock', 'w') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            index = {}
+            if self.index_path.exists():
+                with open(self.index_path) as file:
+                    index = json.load(file)
+            yield index
+            with open(self.index_path.with_suffix('.tmp'), 'w') as file:
+                json.dump(index, file, indent=1)
+            os.replace(self.index_path.with_suffix('.tmp'), self.index_path)
+
+    @contextmanager
+    def lock(self, key):
+        """
+        Locks an entry against other processes, e.g. while one of them generates its files.
+        :param key: string key of the entry.
+        :return: context manager holding the lock
+        """
+        (self.directory / 'locks').mkdir(parents=True, exist_ok=True)
+        with open(self.directory / 'locks' / (key[:16] + '.lock'), 'w') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            yield
+
+    def get(self, key):
+        """
+        Looks up an entry and marks it as used.
+        :param key: string key of the entry.
+        :return: entry dictionary or None if the entry is missing or its files are gone
+        """
+        with self.index() as index:
+            entry = index.get(key)
+            if entry is None:
+                return None
+            if not all((self.directory / path).exists() for path in entry['files']):
+                del index[key]
+                return None
+            entry['last_used'] = time.time()
+            return entry
+
+    def put(self, key, files, metadata):
+        """
+        Adds an entry and evicts old entries if the cache is too large.
+        :param key: string key of the entry.
+        :param files: list of paths of the cached files, relative to the cache directory.
+        :param metadata: dictionary with information about the entry.
+        :return: the added entry dictionary
+        """
+        size = sum((self.directory / path).stat().st_size for path in files)
+        entry = dict(metadata, files=[str(path) for path in files], size=size,
+                     last_used=time.time())
+        with self.index() as index:
+            index[key] = entry
+            self.evict(index)
+        return entry
+
+    def evict(self, index):
+        """
+        Removes the least recently used entries until the cache fits in its size limit.
+        Files derived from the files of an entry, such as the hull of a model, go with them.
+        :param index: index dictionary, entries are removed from it.
+        :return: None
+        """
+        by_last_use = sorted(index, key=lambda key: index[key]['last_used'])
+        total_size = sum(entry['size'] for entry in index.values())
+        while total_size > self.size_limit and len(by_last_use) > 1:
+            entry = index.pop(by_last_use.pop(0))
+            total_size -= entry['size']
+            for path in map(self.directory.joinpath, entry['files']):
+                for derived in path.parent.glob(glob.escape(path.stem) + '.*'):
+                    derived.unlink()
+                if path.exists():
+                    path.unlink()
@@ -0,0 +1,135 @@
+import os
+import json
+import pathlib
+
+src_dir = "/workdir"
+
+
+def log_path(output_location):
+    """
+    Gets the path of the annotation log of an output location.
+    :param output_location: path to the image directory relative to the source directory.
+    :return: path of the log
+    """
+    return pathlib.Path(src_dir, output_location, 'annotations.jsonl')
+
+
+def start_log(output_location, run):
+    """
+    Starts a new annotation log for a run, beginning with a header describing the run.
+    The log of an earlier run in the same output location is kept as annotations.previous.jsonl,
+    so its entries are not mistaken for entries of this run.
+    :param output_location: path to the image directory relative to the source directory.
+    :param run: json serializable dictionary with at least the 'seed' of the run.
+    :return: None
+    """
+    path = log_path(output_location)
+    if path.exists():
+        os.replace(path, path.with_name('annotations.previous.jsonl'))
+    append_entry(output_location, {'run': run})
+
+
+def append_entry(output_location, entry):
+    """
+    Appends the annotations of a rendered image to the log, they are on disk when this returns.
+    A line cut off by a process that died while writing it is ended first.
+    :param output_location: path to the image directory relative to the source directory.
+    :param entry: json serializable dictionary with at least the index of the 'image'.
+    :return: None
+    """
+    path = log_path(output_location)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'a+b') as file:
+        if file.tell() > 0:
+            file.seek(-1, os.SEEK_END)
+            if file.read(1) != b'\n':
+                file.write(b'\n')
+        file.write(json.dumps(entry).encode() + b'\n')
+        file.flush()
+        os.fsync(file.fileno())
+
+
+def index_log(output_location):
+    """
+    Finds where the entry of every image starts in the log, the last entry of an image wins.
+    Lines cut off by a process that died while writing them and the header are skipped.
+    :param output_location: path to the image directory relative to the source directory.
+    :return: dictionary from image index to the offset of its entry
+    """
+    offsets, offset = {}, 0
+    if not log_path(output_location).exists():
+        return offsets
+    with open(log_path(output_location), 'rb') as file:
+        for line in file:
+            try:
+                offsets[json.loads(line)['image']] = offset
+            except (ValueError, KeyError):
+                pass
+            offset += len(line)
+    return offsets
+
+
+def read_entries(output_location, offsets, indices):
+    """
+    Reads the entries of some images from the log, one at a time.
+    :param output_location: path to the image directory relative to the source directory.
+    :param offsets: dictionary from image index to the offset of its entry, see index_log.
+    :param indices: iterable of image indices.
+    :return: generator of entry dictionaries, None for an image without entry
+    """
+    if not offsets:
+        yield from (None for _ in indices)
+        return
+    with open(log_path(output_location), 'rb') as file:
+        for index in indices:
+            if index in offsets:
+                file.seek(offsets[index])
+                yield json.loads(file.readline())
+            else:
+                yield None
+
+
+def logged_seed(output_location):
+    """
+    Gets the seed of the run that wrote the log, from its header.
+    :param output_location: path to the image directory relative to the source directory.
+    :return: integer seed or None if the log has no header
+    """
+    if not log_path(output_location).exists():
+        return None
+    with open(log_path(output_location), 'rb') as file:
+        try:
+            return json.loads(file.readline())['run']['seed']
+        except (ValueError, KeyError):
+            return None
+
+
+def log_boxes(output_location, start_index, image_count):
+    """
+    Reads the bounding boxes of a range of images from the log, one image at a time.
+    :param output_location: path to the image directory relative to the source directory.
+    :param start_index: index of the first image.
+    :param image_count: number of images.
+    :return: generator of lists of (object name, bounding box), empty for an image without entry
+    """
+    entries = read_entries(output_location, index_log(output_location),
+                           range(start_index, start_index + image_count))
+    return ([tuple(labeled_box) for labeled_box in entry['boxes']] if entry is not None else []
+            for entry in entries)
+
+
+def finished_images(output_location, seed, indices):
+    """
+    Finds the images of a run that were rendered and have their annotations in the log.
+    Images annotated with another seed belong to another run and are not finished.
+    :param output_location: path to the image directory relative to the source directory.
+    :param seed: integer seed of the run.
+    :param indices: image indices of the run.
+    :return: set of image indices
+    """
+    indices = list(indices)
+    rendered = {path.stem for path in pathlib.Path(src_dir, output_location).glob('*.*')
+                if path.suffix != '.json'}
+    entries = read_entries(output_location, index_log(output_location), indices)
+    return {index for index, entry in zip(indices, entries)
+            if entry is not None and entry.get('seed') == seed and str(index) in rendered}
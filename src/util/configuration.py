@@ -0,0 +1,110 @@
+import os
+import sys
+import copy
+
+src_dir = "/workdir"
+sys.path.insert(1, src_dir)
+
+from src.util.parser import Parser  # noqa: E402
+
+# Configurations that were loaded in this process by path
+loaded = {}
+
+
+class Configuration:
+    """
+    Long term configuration read from a yaml file, e.g. configuration.yaml.
+    Sections are read like a dictionary: configuration['render']['samples'], the sections the
+    generation reads on every run also as attributes: configuration.render['samples'].
+    """
+
+    def __init__(self, path):
+        """
+        Constructor method for a configuration, parses the file.
+        :param path: path to the yaml file.
+        """
+        self.path = str(path)
+        self.modified = os.path.getmtime(self.path)
+        self.data = Parser().parse_long_term_configuration(self.path)
+
+    def __getitem__(self, section):
+        """
+        Gets a section of the configuration.
+        :param section: string name of the section.
+        :return: the section, a dictionary for most sections
+        """
+        return self.data[section]
+
+    def __contains__(self, section):
+        """
+        Checks whether the configuration has a section.
+        :param section: string name of the section.
+        :return: True if the section exists
+        """
+        return section in self.data
+
+    @property
+    def render(self):
+        """
+        Gets the render section, with the render profile applied if there is one.
+        :return: dictionary of render settings
+        """
+        return self.data['render']
+
+    @property
+    def render_profiles(self):
+        """
+        Gets the render profiles, overrides of the render section by name.
+        :return: dictionary of render settings by profile name, empty without the section
+        """
+        return self.data.get('render_profiles') or {}
+
+    @property
+    def crush(self):
+        """
+        Gets the crush section.
+        :return: dictionary of crush settings
+        """
+        return self.data['crush']
+
+    @property
+    def background_pool_size(self):
+        """
+        Gets the number of background images kept loaded, from the backgrounds section.
+        :return: integer pool size or None to keep all loaded
+        """
+        return self.data['backgrounds']['pool_size']
+
+    def with_render_profile(self, profile):
+        """
+        Gets the configuration with its render section overridden by a render profile.
+        :param profile: string name of a profile in the render_profiles section or None.
+        :return: a copy of the Configuration, itself if profile is None
+        """
+        if profile is None:
+            return self
+        profiles = self.render_profiles
+        if profile not in profiles:
+            raise OSError(f"render profile should be one of {', '.join(profiles)}")
+        profiled = copy.copy(self)
+        profiled.data = dict(self.data, render=dict(self.render, **profiles[profile]))
+        return profiled
+
+    def is_outdated(self):
+        """
+        Checks whether the file changed since it was parsed.
+        :return: True if the file was modified
+        """
+        return os.path.getmtime(self.path) != self.modified
+
+
+def load_configuration(path=src_dir + r"/configuration.yaml"):
+    """
+    Gets the configuration of a file, it is only parsed again when the file changed.
+    :param path: path to the yaml file, configuration.yaml by default.
+    :return: Configuration
+    """
+    path = str(path)
+    if path not in loaded or loaded[path].is_outdated():
+        loaded[path] = Configuration(path)
+    return loaded[path]
@@ -0,0 +1,255 @@
+import os
+import sys
+import json
+import time
+import argparse
+import pathlib
+
+src_dir = "/workdir"
+sys.path.insert(1, src_dir)
+
+from src.util.parser import Parser  # noqa: E402
+from src.util.annotate import merge_files  # noqa: E402
+from src.util.shard import shard_arguments, shard_location  # noqa: E402
+from src.util.seeds import resolve_seed  # noqa: E402
+
+
+def write_json(path, data):
+    """
+    Writes a json file atomically, readers see either the old or the new content.
+    :param path: path of the file.
+    :param data: data to be written.
+    :return: None
+    """
+    temporary_path = pathlib.Path(path).with_suffix(f'.{os.getpid()}.tmp')
+    with open(temporary_path, 'w') as file:
+        json.dump(data, file)
+    os.replace(temporary_path, path)
+
+
+class LeaseLost(RuntimeError):
+    """
+    Raised when a worker finds that the lease on its shard expired and was taken over.
+    """
+
+
+class Ledger:
+    """
+    Job ledger in a directory shared by all hosts rendering a dataset.
+    The coordinator writes a manifest per shard, workers claim shards by creating lease files
+    and mark them done when the shard and its annotation fragment are written.
+    A lease that is not renewed in time expires, so the shard of a crashed or
+    stalled worker is picked up by another one.
+    """
+
+    def __init__(self, directory, lease_time=1800, poll_interval=10):
+        """
+        Constructor method for a ledger.
+        :param directory: path to the ledger directory.
+        :param lease_time: seconds a claim stays valid without being renewed.
+        :param poll_interval: seconds to wait before looking for expired claims again.
+        """
+        self.directory = pathlib.Path(directory)
+        self.lease_time = lease_time
+        self.poll_interval = poll_interval
+
+    def create(self, args, shard_size):
+        """
+        Splits a run into shards and writes their manifests.
+        :param args: list with the arguments of main for the whole run.
+        :param shard_size: integer number of images per shard.
+        :return: list of shard ids
+        """
+        for name in ['shards', 'leases', 'done']:
+            (self.directory / name).mkdir(parents=True, exist_ok=True)
+        parsed_args = Parser().parse_args(args)
+        starts = range(0, parsed_args.image_count, shard_size)
+        seed = resolve_seed(parsed_args.seed)
+        write_json(self.directory / 'job.json', {'args': args})
+        for index, start in enumerate(starts):
+            shard = (start, min(shard_size, parsed_args.image_count - start))
+            write_json(self.directory / 'shards' / f'{index:06d}.json',
+                       {'id': f'{index:06d}', 'start_index': start, 'image_count': shard[1],
+                        'args': shard_arguments(args, index, shard, seed)})
+        return self.shard_ids()
+
+    def shard_ids(self):
+        """
+        Gets the ids of all shards in the ledger.
+        :return: sorted list of shard ids
+        """
+        return sorted(path.stem for path in (self.directory / 'shards').glob('*.json'))
+
+    def is_done(self, shard_id):
+        """
+        Checks whether a shard was rendered.
+        :param shard_id: string id of the shard.
+        :return: True if the shard is done
+        """
+        return (self.directory / 'done' / f'{shard_id}.json').exists()
+
+    def current_lease(self, shard_id):
+        """
+        Gets the latest claim on a shard.
+        Claims are numbered, claiming a shard again creates the next number.
+        :param shard_id: string id of the shard.
+        :return: tuple (claim number, lease dictionary or None if never claimed)
+        """
+        numbers = [int(path.suffixes[0][1:]) for path in
+                   (self.directory / 'leases').glob(f'{shard_id}.*.json')]
+        if not numbers:
+            return 0, None
+        path = self.directory / 'leases' / f'{shard_id}.{max(numbers)}.json'
+        try:
+            with open(path) as file:
+                return max(numbers), json.load(file)
+        except ValueError:
+            # Left unreadable by a worker that died while writing it, it expires like any lease
+            return max(numbers), {'worker': None,
+                                  'expires': os.path.getmtime(path) + self.lease_time}
+
+    def try_claim(self, shard_id, worker):
+        """
+        Claims a shard if nobody holds a valid lease on it.
+        The lease is written to a temporary file and linked into place, linking fails if another
+        worker claimed it first, so the lease file is created complete in one atomic step.
+        :param shard_id: string id of the shard.
+        :param worker: string identifying the worker.
+        :return: True if the shard was claimed
+        """
+        number, lease = self.current_lease(shard_id)
+        if lease is not None and lease['expires'] > time.time():
+            return False
+        path = self.directory / 'leases' / f'{shard_id}.{number + 1}.json'
+        temporary_path = path.with_suffix(f'.{os.getpid()}.tmp')
+        with open(temporary_path, 'w') as file:
+            json.dump({'worker': worker, 'expires': time.time() + self.lease_time}, file)
+        try:
+            os.link(temporary_path, path)
+        except FileExistsError:
+            return False
+        finally:
+            os.unlink(temporary_path)
+        return True
+
+    def claim(self, worker):
+        """
+        Claims the next shard that is not done and not held by another worker.
+        Waits for leases to expire as long as there are unfinished shards.
+        :param worker: string identifying the worker.
+        :return: manifest dictionary of the claimed shard or None if all shards are done
+        """
+        remaining = [shard_id for shard_id in self.shard_ids() if not self.is_done(shard_id)]
+        while remaining:
+            for shard_id in remaining:
+                if self.try_claim(shard_id, worker):
+                    return self.read_shard(shard_id)
+            time.sleep(self.poll_interval)
+            remaining = [shard_id for shard_id in remaining if not self.is_done(shard_id)]
+        return None
+
+    def read_shard(self, shard_id):
+        """
+        Reads the manifest of a shard. A shard that was claimed before is resumed,
+        so the images the earlier worker finished are kept.
+        :param shard_id: string id of the shard.
+        :return: manifest dictionary of the shard
+        """
+        with open(self.directory / 'shards' / f'{shard_id}.json') as file:
+            shard = json.load(file)
+        if self.current_lease(shard_id)[0] > 1:
+            shard['args'] = shard['args'] + ['-re', '1']
+        return shard
+
+    def keep_lease(self, shard_id, worker):
+        """
+        Renews the lease of the worker on a shard.
+        :param shard_id: string id of the shard.
+        :param worker: string identifying the worker.
+        :return: None, raises LeaseLost if another worker took over the shard
+        """
+        if not self.renew(shard_id, worker):
+            raise LeaseLost(f'shard {shard_id} was taken over from {worker}')
+
+    def renew(self, shard_id, worker):
+        """
+        Extends the lease of the worker on a shard, if it still holds it.
+        :param shard_id: string id of the shard.
+        :param worker: string identifying the worker.
+        :return: True if the lease was extended
+        """
+        number, lease = self.current_lease(shard_id)
+        if lease is None or lease['worker'] != worker:
+            return False
+        write_json(self.directory / 'leases' / f'{shard_id}.{number}.json',
+                   {'worker': worker, 'expires': time.time() + self.lease_time})
+        return True
+
+    def complete(self, shard_id, worker):
+        """
+        Marks a shard as done.
+        :param shard_id: string id of the shard.
+        :param worker: string identifying the worker.
+        :return: None
+        """
+        write_json(self.directory / 'done' / f'{shard_id}.json',
+                   {'worker': worker, 'time': time.time()})
+
+    def work(self, worker, handle):
+        """
+        Claims and handles shards until all shards are done.
+        A shard whose lease was taken over is abandoned, its new owner finishes it.
+        :param worker: string identifying the worker.
+        :param handle: function called with the manifest of a shard and a function that
+        renews the lease, it should render the shard and its annotation fragment. The renew
+        function raises LeaseLost if the shard was taken over, which stops the handling.
+        :return: None
+        """
+        shard = self.claim(worker)
+        while shard is not None:
+            try:
+                handle(shard, lambda: self.keep_lease(shard['id'], worker))
+                self.keep_lease(shard['id'], worker)
+                self.complete(shard['id'], worker)
+            except LeaseLost:
+                pass
+            shard = self.claim(worker)
+
+    def merge(self):
+        """
+        Merges the annotation fragments of all shards into one dataset file.
+        :return: None
+        """
+        with open(self.directory / 'job.json') as file:
+            output_location = Parser().parse_args(json.load(file)['args']).output_location
+        merge_files([pathlib.Path(src_dir, shard_location(output_location, int(shard_id)),
+                                  'info.json') for shard_id in self.shard_ids()],
+                    pathlib.Path(src_dir, output_location, 'info.json'))
+
+
+def parse_ledger_args(args):
+    """
+    Parse the arguments of the coordinator, the arguments for main follow after '--'.
+    :param args: list with arguments to be parsed.
+    :return: tuple (parsed coordinator arguments, list with arguments for main)
+    """
+    parser = argparse.ArgumentParser(description='Coordinate rendering over several hosts')
+    parser.add_argument('action', choices=['create', 'status', 'merge'],
+                        help="create the shards of a run, show progress or merge the annotations")
+    parser.add_argument('directory', help="path to the ledger directory")
+    parser.add_argument('-n', '--shard_size', type=int, default=100,
+                        help="number of images per shard")
+    split = args.index('--') if '--' in args else len(args)
+    return parser.parse_args(args[:split]), args[split + 1:]
+
+
+if __name__ == "__main__":
+    ledger_args, main_args = parse_ledger_args(sys.argv[1:])
+    ledger = Ledger(ledger_args.directory)
+    if ledger_args.action == 'create':
+        print(f'Created {len(ledger.create(main_args, ledger_args.shard_size))} shards')
+    elif ledger_args.action == 'status':
+        done = [shard_id for shard_id in ledger.shard_ids() if ledger.is_done(shard_id)]
+        print(f'{len(done)} of {len(ledger.shard_ids())} shards done')
+    else:
+        ledger.merge()
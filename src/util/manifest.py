@@ -0,0 +1,52 @@
+import sys
+import json
+import pathlib
+
+src_dir = "/workdir"
+sys.path.insert(1, src_dir)
+
+from src.util.ledger import write_json  # noqa: E402
+
+
+def image_range(images):
+    """
+    Parses a range of image indices.
+    :param images: string index or inclusive range of indices, e.g. '1200-1299'.
+    :return: tuple (start index, image count)
+    """
+    start, _, end = images.partition('-')
+    return int(start), int(end or start) - int(start) + 1
+
+
+def manifest_path(output_location, index):
+    """
+    Gets the path of the manifest of an image.
+    :param output_location: path to the image directory relative to the source directory.
+    :param index: integer index of the image.
+    :return: path of the manifest
+    """
+    return pathlib.Path(src_dir, output_location, 'manifests', f'{index}.json')
+
+
+def write_manifest(output_location, index, manifest):
+    """
+    Writes the manifest of an image, everything needed to render it again.
+    :param output_location: path to the image directory relative to the source directory.
+    :param index: integer index of the image.
+    :param manifest: json serializable dictionary describing the image.
+    :return: None
+    """
+    path = manifest_path(output_location, index)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    write_json(path, manifest)
+
+
+def read_manifest(output_location, index):
+    """
+    Reads the manifest of an image.
+    :param output_location: path to the image directory relative to the source directory.
+    :param index: integer index of the image.
+    :return: dictionary describing the image
+    """
+    with open(manifest_path(output_location, index)) as file:
+        return json.load(file)
@@ -0,0 +1,76 @@
+import numpy as np
+
+
+def encode_rle(mask):
+    """
+    Encodes a mask as uncompressed COCO run-length encoding.
+    The pixels are read column by column and the counts start with a run of background.
+    :param mask: (H, W) boolean array.
+    :return: dictionary with the 'counts' list and the 'size' [H, W]
+    """
+    flat = np.asarray(mask, dtype=bool).ravel(order='F')
+    changes = np.flatnonzero(flat[1:] != flat[:-1]) + 1
+    counts = np.diff(np.concatenate(([0], changes, [flat.size])))
+    if flat.size > 0 and flat[0]:
+        counts = np.concatenate(([0], counts))
+    return {'counts': counts.tolist(), 'size': list(mask.shape)}
+
+
+def decode_rle(rle):
+    """
+    Decodes uncompressed COCO run-length encoding.
+    :param rle: dictionary with the 'counts' list and the 'size' [H, W].
+    :return: (H, W) boolean array
+    """
+    values = np.arange(len(rle['counts'])) % 2 == 1
+    height, width = rle['size']
+    return np.repeat(values, rle['counts']).reshape(width, height).T
+
+
+def rle_area(rle):
+    """
+    Counts the pixels of a run-length encoded mask.
+    :param rle: dictionary with the 'counts' list.
+    :return: integer number of pixels in the mask
+    """
+    return int(sum(rle['counts'][1::2]))
+
+
+def visible_fraction(rle, silhouette_area):
+    """
+    Gets the fraction of an object that is seen, the rest is hidden or outside of the image.
+    :param rle: run-length encoded mask of the pixels the object is seen in.
+    :param silhouette_area: number of pixels the object would cover if nothing hid it.
+    :return: float in [0, 1] rounded to 4 decimals, 0 if the object has no silhouette
+    """
+    if silhouette_area <= 0:
+        return 0.0
+    return round(min(1.0, rle_area(rle) / silhouette_area), 4)
+
+
+def mask_box(mask):
+    """
+    Gets the tight bounding box of a mask.
+    :param mask: (H, W) boolean array.
+    :return: list [x, y, width, height] with the origin at the top left, all 0 if it is empty
+    """
+    columns, rows = np.flatnonzero(mask.any(axis=0)), np.flatnonzero(mask.any(axis=1))
+    if len(columns) == 0:
+        return [0, 0, 0, 0]
+    return [int(columns[0]), int(rows[0]), int(columns[-1] - columns[0] + 1),
+            int(rows[-1] - rows[0] + 1)]
+
+
+def instance_masks(index_image, count):
+    """
+    Gets the mask of every object in an object index pass.
+    :param index_image: (H, W) integer array with the pass index of the object seen in every
+    pixel, 0 where no object is seen, the top row first.
+    :param count: integer number of objects, numbered 1 to count.
+    :return: list with per object a tuple (bounding box, run-length encoded mask)
+    """
+    masks = []
+    for index in range(1, count + 1):
+        mask = index_image == index
+        masks.append((mask_box(mask), encode_rle(mask)))
+    return masks
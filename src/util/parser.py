@@ -22,8 +22,9 @@ class Parser:
                                        help="number of objects per image", type=int, default=1)
         self.parser_field.add_argument('-i', '--image_count',
                                        help="number of images generated", type=int, default=1)
-        self.parser_field.add_argument('-b', '--background', help="name of background image file",
-                                       default='random')
+        self.parser_field.add_argument('-b', '--background', default='random',
+                                       help="name of background image file or 'random' for a"
+                                            " random background per image")
         self.parser_field.add_argument('-o', '--output_location',
                                        help="path to image directory", default="images/")
         self.parser_field.add_argument('-rc', '--reuse_crushes',
@@ -33,6 +34,30 @@ class Parser:
                                             " don't render images")
         self.parser_field.add_argument('-dc', '--dont_crush',
                                        help="don't crush the models")
+        self.parser_field.add_argument('-s', '--seed', type=int, default=None,
+                                       help="integer for repeatable randomness")
+        self.parser_field.add_argument('-si', '--start_index', type=int, default=0,
+                                       help="index of the first image, used when a dataset"
+                                            " is rendered in shards")
+        self.parser_field.add_argument('-l', '--ledger', default=None,
+                                       help="path to a job ledger, render its shards until"
+                                            " all are done")
+        self.parser_field.add_argument('-pb', '--pose_bank',
+                                       help="place objects in resting poses from the pose bank,"
+                                            " only simulate them if they don't fit")
+        self.parser_field.add_argument('-st', '--scene_template',
+                                       help="open the background, borders and render settings"
+                                            " from a template saved by an earlier run")
+        self.parser_field.add_argument('-im', '--images', default=None,
+                                       help="index or range of images of an earlier run, e.g."
+                                            " 1200-1299, to render again from their manifests")
+        self.parser_field.add_argument('-re', '--resume',
+                                       help="continue an interrupted run in the same output"
+                                            " location, skipping the images that were rendered"
+                                            " and annotated")
+        self.parser_field.add_argument('-rp', '--render_profile', default=None,
+                                       help="name of a render profile of the configuration, e.g."
+                                            " preview, overriding its render settings")
 
     def parse_args(self, args):
         """
@@ -54,13 +79,19 @@ class Parser:
             raise OSError('material list and proportions list should be of same size')
         if sum(parsed_args.proportions) != 100:
             raise OSError('proportions list should add up to 100')
+        if parsed_args.images is not None:
+            indices = parsed_args.images.split('-')
+            if len(indices) > 2 or not all(index.isdigit() for index in indices) \
+                    or int(indices[-1]) < int(indices[0]):
+                raise OSError('images should be an index or a range of indices like 1200-1299')
 
     def parse_long_term_configuration(self, name):
         """
         Parse long term configurations from yaml file.
+        Uses the loader of libyaml if it is available, it is a lot faster.
         :name: path to the file with configurations.
         :return: dictionary containing configurations.
         """
         with open(str(name)) as configuration:
-            data = yaml.load(configuration, Loader=yaml.Loader)
+            data = yaml.load(configuration, Loader=getattr(yaml, 'CLoader', yaml.Loader))
             return data
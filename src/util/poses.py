@@ -0,0 +1,80 @@
+import numpy as np
+
+
+def euler_matrix(orientation):
+    """
+    Gets the rotation matrix of an XYZ euler rotation, the rotation order Blender uses.
+    :param orientation: list with 3 entries specifying rotation around x, y and z in radians.
+    :return: 3x3 rotation matrix
+    """
+    (cx, cy, cz), (sx, sy, sz) = np.cos(orientation), np.sin(orientation)
+    x = np.array([[1, 0, 0], [0, cx, -sx], [0, sx, cx]])
+    y = np.array([[cy, 0, sy], [0, 1, 0], [-sy, 0, cy]])
+    z = np.array([[cz, -sz, 0], [sz, cz, 0], [0, 0, 1]])
+    return z @ y @ x
+
+
+def footprint_radius(hull, orientation):
+    """
+    Gets the radius of the circle around the origin covering an object seen from above.
+    Turning the object around the z axis does not change it.
+    :param hull: (N, 3) array of hull vertices in local coordinates.
+    :param orientation: list with 3 entries specifying the rotation of the object.
+    :return: float radius
+    """
+    rotated = hull @ euler_matrix(orientation).T
+    return float(np.max(np.hypot(rotated[:, 0], rotated[:, 1])))
+
+
+def resting_pose(hull, location, orientation):
+    """
+    Describes where an object came to rest, independent of where it was dropped.
+    :param hull: (N, 3) array of hull vertices in local coordinates.
+    :param location: list with the 3 entry resting location.
+    :param orientation: list with the 3 entry resting rotation.
+    :return: array (z, rotation x, rotation y, rotation z, footprint radius)
+    """
+    return np.array([location[2]] + list(orientation) +
+                    [footprint_radius(hull, orientation)])
+
+
+def sample_layout(banks, generator, extent, attempts):
+    """
+    Draws a resting pose for every object and places the objects without overlapping footprints.
+    Turning a resting object around the z axis adds to its z rotation, so every pose is drawn
+    with a random location and turn.
+    :param banks: list with per object an (P, 5) array of resting poses, see resting_pose.
+    :param generator: numpy random Generator.
+    :param extent: float, objects are placed within this distance from the center along x and y.
+    :param attempts: integer number of draws per object before giving up.
+    :return: list of (location, orientation) per object or None if the objects do not fit
+    """
+    placed, layout = np.empty((0, 3)), []
+    for bank in banks:
+        for _ in range(attempts):
+            z, rx, ry, rz, radius = bank[generator.integers(len(bank))]
+            x, y = generator.uniform(-extent, extent, size=2)
+            if np.all(np.hypot(x - placed[:, 0], y - placed[:, 1]) >= radius + placed[:, 2]):
+                break
+        else:
+            return None
+        placed = np.vstack((placed, [x, y, radius]))
+        layout.append(([x, y, z], [rx, ry, rz + generator.uniform(0, 2 * np.pi)]))
+    return layout
+
+
+def at_rest(previous, current, linear, angular):
+    """
+    Checks whether bodies moved and turned less than a threshold between two moments.
+    :param previous: (N, 4, 4) array of the world matrices of the bodies at the first moment.
+    :param current: (N, 4, 4) array of the world matrices of the bodies at the second moment.
+    :param linear: float distance every body must have moved less than.
+    :param angular: float angle in radians every body must have turned less than.
+    :return: True if all bodies are at rest
+    """
+    moved = np.linalg.norm(current[:, :3, 3] - previous[:, :3, 3], axis=1)
+    rotations = [matrices[:, :3, :3] / np.linalg.norm(matrices[:, :3, :3], axis=1, keepdims=True)
+                 for matrices in (previous, current)]
+    relative = np.einsum('nji,njk->nik', rotations[0], rotations[1])
+    turned = np.arccos(np.clip((np.trace(relative, axis1=1, axis2=2) - 1) / 2, -1, 1))
+    return bool(np.all(moved < linear) and np.all(turned < angular))
@@ -0,0 +1,48 @@
+import numpy as np
+
+# Branches of the seed tree below the seed of a run
+SELECTION, IMAGES = 0, 1
+# Streams of an image, so drawing one does not shift the other
+BACKGROUND, POSES = 0, 1
+
+
+def resolve_seed(seed):
+    """
+    Gets the seed of a run, drawing one when none was given so the run can still be repeated.
+    :param seed: integer seed of the run or None for actual randomness.
+    :return: integer seed
+    """
+    return seed if seed is not None else int(np.random.SeedSequence().entropy)
+
+
+def make_generator(seed, *key):
+    """
+    Gets the random generator of a node of the seed tree of a run.
+    Every node is derived from the seed and its key alone, so it does not depend on
+    how many numbers other nodes drew.
+    :param seed: integer seed of the run.
+    :param key: non-negative integers, the path from the run to the node.
+    :return: numpy random Generator
+    """
+    return np.random.default_rng(np.random.SeedSequence(seed, spawn_key=key))
+
+
+def object_generator(seed, slot):
+    """
+    Gets the random generator of a selected object, deciding its model, crush and skin.
+    :param seed: integer seed of the run.
+    :param slot: integer index of the object in the selection.
+    :return: numpy random Generator
+    """
+    return make_generator(seed, SELECTION, slot)
+
+
+def image_generator(seed, image, stream):
+    """
+    Gets the random generator of a stream of an image, deciding its background or its poses.
+    :param seed: integer seed of the run.
+    :param image: integer index of the image, counted from the start of the whole run.
+    :param stream: BACKGROUND or POSES.
+    :return: numpy random Generator
+    """
+    return make_generator(seed, IMAGES, image, stream)
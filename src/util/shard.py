@@ -0,0 +1,112 @@
+import os
+import sys
+import argparse
+import pathlib
+from subprocess import Popen
+
+src_dir = "/workdir"
+sys.path.insert(1, src_dir)
+
+from src.util.parser import Parser  # noqa: E402
+from src.util.configuration import load_configuration  # noqa: E402
+from src.util.annotate import merge_files  # noqa: E402
+from src.util.seeds import resolve_seed  # noqa: E402
+
+
+def split_range(image_count, shard_count):
+    """
+    Splits the image indices into consecutive ranges of nearly equal size.
+    :param image_count: integer number of images.
+    :param shard_count: integer number of shards.
+    :return: list of tuples (start index, image count), without empty shards
+    """
+    size, remainder = divmod(image_count, shard_count)
+    shards, start_index = [], 0
+    for index in range(shard_count):
+        count = size + 1 if index < remainder else size
+        if count > 0:
+            shards.append((start_index, count))
+        start_index += count
+    return shards
+
+
+def shard_location(output_location, index):
+    """
+    Gets the output subdirectory of a shard.
+    :param output_location: path to the image directory of the run.
+    :param index: integer index of the shard.
+    :return: string path to the image directory of the shard
+    """
+    return str(pathlib.Path(output_location, f'shard_{index}')) + '/'
+
+
+def shard_arguments(args, index, shard, seed):
+    """
+    Gets the arguments of main for a single shard.
+    The shard options are appended so they override the ones of the run.
+    Every shard gets the seed of the run, its images are seeded by their index in the run.
+    :param args: list with the arguments of the run.
+    :param index: integer index of the shard.
+    :param shard: tuple (start index, image count) of the shard.
+    :param seed: integer seed of the run.
+    :return: list with the arguments of the shard
+    """
+    parsed_args = Parser().parse_args(args)
+    return args + ['-si', str(parsed_args.start_index + shard[0]), '-i', str(shard[1]),
+                   '-s', str(seed), '-o', shard_location(parsed_args.output_location, index)]
+
+
+def launch_shard(command, threads, args, index, shard, seed):
+    """
+    Starts the Blender process of a single shard.
+    :param command: list with the command that runs main in Blender.
+    :param threads: integer number of CPU threads for the process.
+    :param args: list with the arguments of the run.
+    :param index: integer index of the shard.
+    :param shard: tuple (start index, image count) of the shard.
+    :param seed: integer seed of the run.
+    :return: the started process
+    """
+    return Popen(command[:1] + ['-t', str(threads)] + command[1:] + ['--'] +
+                 shard_arguments(args, index, shard, seed), cwd=src_dir)
+
+
+def render_shards(command, args, shard_count):
+    """
+    Renders a dataset with a Blender process per shard and merges their annotations.
+    The CPU threads are divided over the processes.
+    :param command: list with the command that runs main in Blender.
+    :param args: list with the arguments of the run.
+    :param shard_count: integer number of shards.
+    :return: None
+    """
+    parsed_args = Parser().parse_args(args)
+    shards = split_range(parsed_args.image_count, shard_count)
+    seed = resolve_seed(parsed_args.seed)
+    threads = max(1, os.cpu_count() // len(shards))
+    processes = [launch_shard(command, threads, args, index, shard, seed)
+                 for index, shard in enumerate(shards)]
+    if any([process.wait() != 0 for process in processes]):
+        raise OSError('rendering a shard failed, annotations are not merged')
+    merge_files([pathlib.Path(src_dir, shard_location(parsed_args.output_location, index),
+                              'info.json') for index in range(len(shards))],
+                pathlib.Path(src_dir, parsed_args.output_location, 'info.json'))
+
+
+def parse_shard_args(args):
+    """
+    Parse the arguments of the shard launcher, the arguments for main follow after '--'.
+    :param args: list with arguments to be parsed.
+    :return: tuple (number of shards, list with arguments for main)
+    """
+    parser = argparse.ArgumentParser(description='Render synthetic data in parallel shards')
+    parser.add_argument('-k', '--shards', type=int, default=os.cpu_count(),
+                        help="number of Blender processes to render with")
+    split = args.index('--') if '--' in args else len(args)
+    return parser.parse_args(args[:split]).shards, args[split + 1:]
+
+
+if __name__ == "__main__":
+    shard_count, main_args = parse_shard_args(sys.argv[1:])
+    configuration = load_configuration()
+    render_shards(configuration['shard']['command'], main_args, shard_count)
@@ -1,15 +1,19 @@
+import os
 import sys
 import argparse
 import unittest
 from pathlib import Path
 
 import bpy
+import numpy as np
 
 src_dir = "/workdir"
 sys.path.insert(1, src_dir)
-from src.blender.blender import Blender  # noqa: E402
+from src.blender.blender import Blender, list_backgrounds, startup_engine  # noqa: E402
 from src.blender.object import Object  # noqa: E402
 import src.util.parser as p  # noqa: E402
+from src.util.configuration import load_configuration  # noqa: E402
+from src.util.cache import library_path  # noqa: E402
 
 
 class BlenderTestCase(unittest.TestCase):
@@ -46,10 +50,78 @@ class BlenderTestCase(unittest.TestCase):
         plane_location = bpy.context.active_object.location
         self.assertEqual((0.0, 0.0, 0.0), (plane_location.x, plane_location.y, plane_location.z))
 
+    def test_list_backgrounds(self):
+        self.assertIs(list_backgrounds(), list_backgrounds())
+        self.assertEqual(sorted(list_backgrounds()), list_backgrounds())
+        self.assertIn('/workdir/Backgrounds/' + self.background, list_backgrounds())
+
+    def test_swap_background(self):
+        self.blender.setup_background_plane(self.background, 2, 2, None)
+        self.blender.swap_background('BYWA0420.jpg', None, 1)
+        nodes = bpy.data.objects['background'].active_material.node_tree.nodes
+        images = [node.image for node in nodes if node.type == 'TEX_IMAGE']
+        self.assertEqual('/workdir/Backgrounds/BYWA0420.jpg', bpy.path.abspath(images[0].filepath))
+
+    def test_get_background(self):
+        self.blender.setup_background_plane(self.background, 2, 2, None)
+        self.blender.swap_background('BYWA0420.jpg', None, 1)
+        self.assertEqual('BYWA0420.jpg', self.blender.get_background())
+
+    def test_background_pool(self):
+        first = self.blender.load_background('/workdir/Backgrounds/BYWA0420.jpg', 1).name
+        self.blender.load_background('/workdir/Backgrounds/BYWA0421.jpg', 1)
+        # The least recently used image is not used by anything, so it is removed
+        self.assertIsNone(bpy.data.images.get(first))
+        self.assertEqual(['/workdir/Backgrounds/BYWA0421.jpg'],
+                         list(self.blender.background_pool))
+
+    def test_background_pool_releases_used_image(self):
+        self.blender.setup_background_plane(self.background, 2, 2, None)
+        first = self.blender.background_image().name
+        self.blender.swap_background('BYWA0420.jpg', None, 1)
+        # The first background was in use when it was evicted, it is removed after the swap
+        self.assertIsNone(bpy.data.images.get(first))
+        self.assertEqual([], self.blender.evicted_backgrounds)
+        self.assertEqual(['/workdir/Backgrounds/BYWA0420.jpg'],
+                         list(self.blender.background_pool))
+
     def test_import_object(self):
         object_pack = self.import_testing_object()
         self.assertEqual(object_pack[0].name, bpy.data.objects[1].name[:9])
 
+    def test_import_linked_duplicate(self):
+        obj = Object(src_dir + "/test/test_objects/test_cube.obj",
+                     "random", "random", "random", 420)
+        first = self.blender.setup_object(obj)
+        second = self.blender.setup_object(obj)
+        self.assertNotEqual(first.name, second.name)
+        self.assertEqual(first.data, second.data)
+        self.assertEqual('OBJECT', second.material_slots[0].link)
+        self.assertIn(second.name, self.blender.hulls)
+
+    def test_import_not_linked(self):
+        obj = Object(src_dir + "/test/test_objects/test_cube.obj",
+                     "random", "random", "random", 420)
+        first = self.blender.setup_object(obj)
+        second = self.blender.setup_object(obj, linked=False)
+        self.assertNotEqual(first.data, second.data)
+
+    def test_load_model_from_library(self):
+        path = src_dir + "/test/test_objects/test_cube.obj"
+        first = self.blender.load_model(path)
+        self.assertTrue(os.path.exists(library_path(path)))
+        second = self.blender.append_library(path)
+        self.assertNotEqual(first.data, second.data)
+        self.assertEqual(first.data['source_hash'], second.data['source_hash'])
+
+    def test_load_model_from_touched_library(self):
+        path = src_dir + "/test/test_objects/test_cube.obj"
+        self.blender.load_model(path)
+        # A library older than the model is used if the model did not change
+        os.utime(library_path(path), (0, 0))
+        self.assertIsNotNone(self.blender.append_library(path))
+        self.assertLess(0, os.path.getmtime(library_path(path)))
+
     def test_set_orientation(self):
         object_pack = self.import_testing_object()
         self.blender.set_object_orientation(object_pack[0], [1, 1, 1])
@@ -63,14 +135,26 @@ class BlenderTestCase(unittest.TestCase):
         self.assertAlmostEqual(1, object_pack[0].location.x, 4)
         self.assertAlmostEqual(1, object_pack[0].location.y, 4)
 
+    def test_set_transforms(self):
+        object_pack = self.import_testing_object()
+        self.blender.set_transforms([object_pack[0].name], [[1, 2, 3]], [[0.1, 0.2, 0.3]])
+        self.assertAlmostEqual(2, object_pack[0].location.y, 4)
+        self.assertAlmostEqual(3, object_pack[0].location.z, 4)
+        self.assertAlmostEqual(0.3, object_pack[0].rotation_euler[2], 4)
+
     def import_testing_object(self):
         object_name = 'test_cube'
         object_path = src_dir + "/test/test_objects/" + object_name + ".obj"
         obj = Object(object_path, 'random', 'random', 'random', 420)
-        obj.randomize_object(420)
+        obj.randomize_object()
         self.blender.setup_object(obj)
         return [bpy.data.objects[1], obj, object_name]
 
+    def test_reset_scene_keeps_engine(self):
+        bpy.context.scene.render.engine = 'BLENDER_WORKBENCH'
+        self.blender.reset_scene()
+        self.assertEqual(startup_engine, bpy.context.scene.render.engine)
+
     def test_set_render_device(self):
         self.blender.set_render_device('CPU')
         self.assertEqual('CPU', bpy.context.scene.cycles.device)
@@ -87,6 +171,16 @@ class BlenderTestCase(unittest.TestCase):
         self.assertEqual(configuration['render']['res_percentage'],
                          scene.render.resolution_percentage)
 
+    def test_set_render_output_parameters_profile(self):
+        configuration = load_configuration().with_render_profile('preview')
+        self.blender.set_render_output_parameters(configuration['render'])
+        scene = bpy.context.scene
+        self.assertEqual('BLENDER_EEVEE', scene.render.engine)
+        self.assertEqual(configuration['render']['samples'], scene.eevee.taa_render_samples)
+        self.assertFalse(bpy.context.view_layer.use_pass_object_index)
+        self.blender.set_render_output_parameters()
+        self.assertEqual('CYCLES', scene.render.engine)
+
     def test_color_object(self):
         object_pack = self.import_testing_object()
         color = (0.5, 0.6, 0.7, 0)
@@ -126,6 +220,18 @@ class BlenderTestCase(unittest.TestCase):
         self.assertEqual(bpy.context.object.modifiers["MeshDeform"].object, sphere)
         self.assertEqual(bpy.context.object.modifiers["MeshDeform"].precision, 3)
 
+    def test_set_texture(self):
+        object_pack = self.import_testing_object()
+        path = src_dir + '/test/test_objects/cube/NewSkin.png'
+        self.blender.set_texture(object_pack[0], path, 1)
+        self.blender.set_texture(object_pack[0], path, 1)
+        images = [node.image for node in object_pack[0].material_slots[0].material.node_tree.nodes
+                  if node.type == 'TEX_IMAGE']
+        self.assertEqual(path, bpy.path.abspath(images[0].filepath))
+        # The image is only loaded once
+        self.assertEqual(1, len([image for image in bpy.data.images
+                                 if bpy.path.abspath(image.filepath) == path]))
+
     def test_get_model(self):
         self.import_testing_object()
         obj = bpy.data.objects[1]
@@ -150,15 +256,88 @@ class BlenderTestCase(unittest.TestCase):
         self.blender.setup_bodies()
         self.assertEqual(bpy.data.objects[1].rigid_body, bpy.context.object.rigid_body)
 
+    def test_setup_bodies_collision_shape(self):
+        self.import_testing_object()
+        self.blender.setup_bodies()
+        self.assertEqual('CONVEX_HULL', bpy.data.objects[1].rigid_body.collision_shape)
+        self.assertEqual('BASE', bpy.data.objects[1].rigid_body.mesh_source)
+
+    def test_convex_hull(self):
+        object_pack = self.import_testing_object()
+        # All corners of the cube are on its hull
+        self.assertEqual((8, 3), self.blender.convex_hull(object_pack[0]).shape)
+
+    def test_hull_bounds(self):
+        object_pack = self.import_testing_object()
+        bpy.context.view_layer.update()
+        hull_box = self.blender.camera_view_bounds_2d(bpy.context.scene, object_pack[0])
+        del self.blender.hulls[object_pack[0].name]
+        mesh_box = self.blender.camera_view_bounds_2d(bpy.context.scene, object_pack[0])
+        self.assertEqual(mesh_box, hull_box)
+
+    def test_silhouette_area(self):
+        object_pack = self.import_testing_object()
+        bpy.context.view_layer.update()
+        x, y, width, height = self.blender.camera_view_bounds_2d(bpy.context.scene, object_pack[0])
+        area = self.blender.silhouette_area(bpy.context.scene, object_pack[0])
+        self.assertTrue(0 < area <= width * height + width + height)
+
+    def test_place_from_pose_bank(self):
+        object_pack = self.import_testing_object()
+        self.blender.poses[object_pack[0].name] = np.array([[1.0, 0.0, 0.0, 0.5, 0.1]])
+        self.assertTrue(self.blender.place_from_pose_bank(20, 0.5))
+        self.assertAlmostEqual(1, object_pack[0].location.z, 4)
+        self.assertEqual(0, bpy.context.scene.frame_current)
+
+    def test_place_without_pose_bank(self):
+        object_pack = self.import_testing_object()
+        self.blender.poses[object_pack[0].name] = None
+        self.assertFalse(self.blender.place_from_pose_bank(20, 0.5))
+
     def test_simulate(self):
         self.blender.simulate(50)
         # From 0 up and including 49 = 50
         self.assertEqual(49, bpy.context.scene.frame_current)
 
+    def test_simulate_until_at_rest(self):
+        # Without moving bodies everything is at rest after the first window
+        self.assertEqual(6, self.blender.simulate(50, (0.001, 0.01), 5))
+        self.assertEqual(6, bpy.context.scene.frame_current)
+
+    def test_get_transforms(self):
+        object_pack = self.import_testing_object()
+        self.blender.set_transforms([object_pack[0].name], [[1, 2, 3]], [[0.1, 0.2, 0.3]])
+        locations, orientations = self.blender.get_transforms([object_pack[0].name])
+        np.testing.assert_array_almost_equal([[1, 2, 3]], locations, 4)
+        np.testing.assert_array_almost_equal([[0.1, 0.2, 0.3]], orientations, 4)
+
+    def test_set_transforms_missing_object(self):
+        self.assertRaises(KeyError, lambda: self.blender.set_transforms(['missing'], [[0, 0, 0]],
+                                                                        [[0, 0, 0]]))
+
+    def test_get_body_matrices(self):
+        self.import_testing_object()
+        self.assertEqual((0, 4, 4), self.blender.get_body_matrices().shape)
+        self.blender.setup_bodies()
+        self.assertEqual((1, 4, 4), self.blender.get_body_matrices().shape)
+
     def test_render(self):
         self.blender.render("./tmp", "", "test.png")
         self.assertEqual(True, Path('./tmp/test.png').is_file())
 
+    def test_setup_index_pass(self):
+        self.blender.setup_index_pass()
+        self.blender.setup_index_pass()
+        self.assertTrue(bpy.context.view_layer.use_pass_object_index)
+        viewers = [node for node in bpy.context.scene.node_tree.nodes if node.type == 'VIEWER']
+        self.assertEqual(1, len(viewers))
+        self.assertEqual('IndexOB', viewers[0].inputs['Image'].links[0].from_socket.name)
+
+    def test_get_labeled_object_masks_without_index_pass(self):
+        bpy.context.view_layer.use_pass_object_index = False
+        bounding_boxes = [('test', (0, 0, 10, 10))]
+        self.assertEqual(bounding_boxes, self.blender.get_labeled_object_masks(bounding_boxes))
+
     def test_export_scene(self):
         self.import_testing_object()
         self.blender.export_scene("./tmp/test.obj")
@@ -30,12 +30,24 @@ class CrushTestCase(unittest.TestCase):
         self.assertEqual(True, Path('./tmp/' + bpy.data.objects[1].name + '.obj').is_file())
 
     def test_crush_model(self):
-        BlenderTestCase.import_testing_object(self)
         obj = Object(src_dir + '/test/test_objects/test_cube.obj',
                      'random', 'random', 'random', 420)
-        self.crush.crush_model(obj, self.temporary_path)
-        self.assertEqual(True,
-                         Path(self.temporary_path + bpy.data.objects[1].name + '.obj').is_file())
+        crushed = self.crush.crush_model(obj, self.temporary_path, 1)
+        self.assertEqual(True, Path(crushed.path).is_file())
+
+    def test_crush_model_cached(self):
+        obj = Object(src_dir + '/test/test_objects/test_cube.obj',
+                     'random', 'random', 'random', 420)
+        crushed = self.crush.crush_model(obj, self.temporary_path, 2)
+        modified = Path(crushed.path).stat().st_mtime
+        self.assertEqual(crushed.path, self.crush.crush_model(obj, self.temporary_path, 2).path)
+        self.assertEqual(modified, Path(crushed.path).stat().st_mtime)
+
+    def test_crush_model_variants(self):
+        obj = Object(src_dir + '/test/test_objects/test_cube.obj',
+                     'random', 'random', 'random', 420)
+        self.assertNotEqual(self.crush.crush_model(obj, self.temporary_path, 3).path,
+                            self.crush.crush_model(obj, self.temporary_path, 4).path)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,37 @@
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+src_dir = "/workdir"
+sys.path.insert(1, src_dir)
+
+from src.blender import crush_farm  # noqa: E402
+
+
+class CrushFarmTestCase(unittest.TestCase):
+
+    def test_list_tasks(self):
+        tasks = crush_farm.list_tasks(['Mask'], 3)
+        self.assertEqual([0, 1, 2], [task['variant'] for task in tasks])
+        self.assertTrue(all(task['model'].endswith('Mask.obj') for task in tasks))
+
+    def test_list_tasks_unknown_material(self):
+        self.assertEqual([], crush_farm.list_tasks(['DoesNotExist'], 3))
+
+    def test_count_vertices(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory, 'model.obj')
+            path.write_text('o model\nv 0 0 0\nv 1 0 0\nvt 0 0\nv 0 1 0\nf 1 2 3\n')
+            self.assertEqual(3, crush_farm.count_vertices(path))
+
+    def test_parse_farm_args(self):
+        farm_args = crush_farm.parse_farm_args(['-m', 'PET', 'HDPE', '-k', '2'], 10)
+        self.assertEqual(['PET', 'HDPE'], farm_args.materials)
+        self.assertEqual(10, farm_args.variants)
+        self.assertEqual(2, farm_args.workers)
+        self.assertIsNone(farm_args.chunk)
+
+
+if __name__ == '__main__':
+    unittest.main(argv=sys.argv[0:1])
@@ -9,20 +9,14 @@ sys.path.insert(1, src_dir)
 from src.blender.object import Object  # noqa: E402
 
 
-def read_mtl_map_kd(edit_file):
-    """
-    Helper method to read the line being edited.
-    :param edit_file: File to be edited
-    :return: Edited line of file
-    """
-    with open(edit_file, 'r') as file:
-        data = file.readlines()
-        return data[12]
-
-
 class ObjectTestCase(unittest.TestCase):
     seed = 420
 
+    def test_configuration(self):
+        configuration = {'skins': {'Aluminium': {'Can': ['Skin.png']}}}
+        test_object = Object("name", 'random', 'random', 'random', 420, configuration)
+        self.assertEqual(configuration['skins'], test_object.read_skins_from_library())
+
     def test_normal_setup(self):
         normal_object = Object("name", [1, 2, 3], [4, 5, 6], [7, 8, 9], 420)
         self.assertEqual("name", normal_object.path)
@@ -31,61 +25,85 @@ class ObjectTestCase(unittest.TestCase):
         self.assertEqual([7, 8, 9], normal_object.color)
 
     def test_random_location(self):
-        random_object = Object("name", 'random', 'random', 'random', 420)
-        random_object.randomize_object(420)
+        random_object = Object("name", 'random', 'random', 'random', self.seed)
         [x, y, z] = random_object.location
-        np.random.seed(self.seed)
-        self.assertEquals(np.random.uniform(low=-0.5, high=0.5), x)
-        self.assertEquals(np.random.uniform(low=-0.5, high=0.5), y)
-        self.assertEquals(1, z)
+        generator = np.random.default_rng(self.seed)
+        self.assertEqual(generator.uniform(low=-0.5, high=0.5), x)
+        self.assertEqual(generator.uniform(low=-0.5, high=0.5), y)
+        self.assertEqual(1, z)
 
     def test_random_color(self):
-        random_object = Object("name", 'random', 'random', 'random', 420)
-        random_object.randomize_object(420)
+        random_object = Object("name", 'random', 'random', 'random', self.seed)
         [r, g, b, a] = random_object.color
-        np.random.seed(self.seed)
-        self.assertEquals(np.random.uniform(low=0.0, high=1.0), r)
-        self.assertEquals(np.random.uniform(low=0.0, high=1.0), g)
-        self.assertEquals(np.random.uniform(low=0.0, high=1.0), b)
+        generator = np.random.default_rng(self.seed)
+        # The location and orientation are drawn first
+        generator.uniform(size=5)
+        self.assertEqual(generator.uniform(low=0.0, high=1.0), r)
+        self.assertEqual(generator.uniform(low=0.0, high=1.0), g)
+        self.assertEqual(generator.uniform(low=0.0, high=1.0), b)
 
     def test_random_orientation(self):
-        random_object = Object("name", 'random', 'random', 'random', 420)
-        random_object.randomize_object(420)
+        random_object = Object("name", 'random', 'random', 'random', self.seed)
         [x, y, z] = random_object.orientation
-        np.random.seed(self.seed)
-        self.assertEquals(np.random.uniform(low=0, high=360) * np.pi / 180, x)
-        self.assertEquals(np.random.uniform(low=0, high=360) * np.pi / 180, y)
-        self.assertEquals(np.random.uniform(low=0, high=360) * np.pi / 180, z)
-
-    def test_change_mtl(self):
-        # Create object
-        test_object = Object("name", "random", "random", "random", 420)
-
-        # Setup object since it requires an external file to be edited
-        file_to_edit = pathlib.Path("./test/test_objects/test_cube.mtl")
-        test_object.change_mtl(file_to_edit, "TestDoesNotExist.png", 12)
-        # Verify initial map_Kd
-        assert read_mtl_map_kd(file_to_edit) == "map_Kd TestDoesNotExist.png\n"
-
-        # Change map_Kd to test and assert
-        test_object.change_mtl(file_to_edit, "NewSkin.png", 12)
-        assert read_mtl_map_kd(file_to_edit) == "map_Kd NewSkin.png\n"
+        generator = np.random.default_rng(self.seed)
+        generator.uniform(size=2)
+        self.assertEqual(generator.uniform(low=0, high=360) * np.pi / 180, x)
+        self.assertEqual(generator.uniform(low=0, high=360) * np.pi / 180, y)
+        self.assertEqual(generator.uniform(low=0, high=360) * np.pi / 180, z)
+
+    def test_randomize_object(self):
+        random_object = Object("name", 'random', 'random', 'random', self.seed)
+        same_object = Object("name", 'random', 'random', 'random', self.seed)
+        first_location = random_object.location
+        random_object.randomize_object()
+        same_object.randomize_object()
+        self.assertFalse(np.array_equal(first_location, random_object.location))
+        np.testing.assert_array_equal(same_object.location, random_object.location)
+        np.testing.assert_array_equal(same_object.color, random_object.color)
+
+    def test_set_seed(self):
+        generator = np.random.default_rng(self.seed)
+        random_object = Object("name", 'random', 'random', 'random', None)
+        random_object.set_seed(generator)
+        self.assertIs(generator, random_object.generator)
+
+    def test_random_transforms(self):
+        random_object = Object("name", 'random', 'random', 'random', self.seed)
+        locations, orientations = random_object.random_transforms(100)
+        self.assertEqual((100, 3), locations.shape)
+        self.assertEqual((100, 3), orientations.shape)
+        self.assertTrue(np.all(np.abs(locations[:, :2]) <= 0.5))
+        self.assertTrue(np.all(locations[:, 2] == 1))
+        self.assertTrue(np.all((orientations >= 0) & (orientations <= 2 * np.pi)))
+        same_object = Object("name", 'random', 'random', 'random', self.seed)
+        np.testing.assert_array_equal(locations, same_object.random_transforms(100)[0])
 
     def test_randomize_skin(self):
-        # Create object
-        random_object = Object("./test/test_objects/cube/random_cube.obj",
+        configuration = {'skins': {'cube': {'random_cube': ['NewSkin.png']}},
+                         'change_skin': {1: ['random_cube']}, 'jazz': 1}
+        random_object = Object(src_dir + "/test/test_objects/cube/random_cube.obj",
+                               "random", "random", "random", 420, configuration)
+        mtl_file = pathlib.Path(src_dir + "/test/test_objects/cube/random_cube.mtl")
+        mtl = mtl_file.read_text()
+        random_object.randomize_skin()
+        self.assertEqual(src_dir + "/test/test_objects/cube/NewSkin.png", random_object.texture)
+        self.assertEqual(1, random_object.texture_slots)
+        # The model itself is not changed
+        self.assertEqual(mtl, mtl_file.read_text())
+
+    def test_randomize_skin_color(self):
+        configuration = {'skins': {'cube': {'random_cube': ['NewSkin.png']}},
+                         'change_skin': {0: ['random_cube']}, 'jazz': 1}
+        random_object = Object(src_dir + "/test/test_objects/cube/random_cube.obj",
+                               "random", "random", "random", 420, configuration)
+        random_object.randomize_skin()
+        self.assertIsNone(random_object.texture)
+        self.assertEqual(4, len(random_object.skin_color))
+
+    def test_find_missing_skin(self):
+        random_object = Object(src_dir + "/test/test_objects/cube/random_cube.obj",
                                "random", "random", "random", 420)
-
-        # Setup object since it requires an external file to be edited
-        file_to_edit = pathlib.Path("./test/test_objects/cube/random_cube.mtl")
-        random_object.change_mtl(file_to_edit, "TestDoesNotExist.png", 12)
-        # Verify initial map_Kd
-        assert read_mtl_map_kd(file_to_edit) == "map_Kd TestDoesNotExist.png\n"
-
-        src_dir = "./test/test_objects/cube"
-        random_object.randomize_skin(src_dir)
-
-        assert read_mtl_map_kd(file_to_edit) == 'map_Kd NewSkin.png\n'
+        self.assertIsNone(random_object.find_skin('cube', 'DoesNotExist.png'))
 
 
 if __name__ == '__main__':
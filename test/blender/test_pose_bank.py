@@ -0,0 +1,38 @@
+import sys
+import unittest
+import numpy as np
+
+src_dir = "/workdir"
+sys.path.insert(1, src_dir)
+
+from src.blender import pose_bank  # noqa: E402
+from src.blender.blender import Blender  # noqa: E402
+
+
+class PoseBankTestCase(unittest.TestCase):
+    # Runs before every test
+    def setUp(self):
+        self.blender = Blender()
+
+    # Runs after every test
+    def tearDown(self):
+        self.blender.clear_scene([])
+
+    def test_list_models(self):
+        models = pose_bank.list_models(['Mask'], False)
+        self.assertTrue(models)
+        self.assertTrue(all(model.endswith('.obj') for model in models))
+
+    def test_drop_grid(self):
+        self.assertEqual([(-1.5, -1.5), (1.5, -1.5), (-1.5, 1.5)], pose_bank.drop_grid(3, 3))
+
+    def test_record_poses(self):
+        poses = pose_bank.record_poses(self.blender, src_dir + '/test/test_objects/test_cube.obj',
+                                       {'drops': 4, 'frames': 100}, np.random.default_rng(0))
+        self.assertEqual((4, 5), poses.shape)
+        # The cube is 2 high, so it rests with its center 1 above the plane
+        np.testing.assert_allclose(poses[:, 0], 1, atol=0.1)
+
+
+if __name__ == '__main__':
+    unittest.main(argv=sys.argv[0:1])
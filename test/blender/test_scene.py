@@ -45,6 +45,19 @@ class SceneTestCase(unittest.TestCase):
                          [light_object.location.x, light_object.location.y, light_object.location.z]
                          )
 
+    def test_template_key(self):
+        other = Scene([0, 0, 3], self.camera_rotation, self.light_location, self.light_energy,
+                      self.light_type)
+        self.assertEqual(self.scene.template_key(), self.scene.template_key())
+        self.assertNotEqual(self.scene.template_key(), other.template_key())
+
+    def test_add_background_from_template(self):
+        self.scene.add_background_from_template('BYWA0419.jpg', None, 100000000)
+        self.scene.add_background_from_template('random', None, 100000000)
+        self.assertIsNotNone(bpy.data.objects.get('background'))
+        self.assertIsNotNone(bpy.data.objects.get('border_4'))
+        self.assertEqual(self.camera_location, list(bpy.context.scene.camera.location))
+
 
 if __name__ == '__main__':
     unittest.main(argv=sys.argv[0:1])
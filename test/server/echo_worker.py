@@ -0,0 +1,16 @@
+import sys
+from multiprocessing.connection import Client
+
+# Stand-in for src/blender/worker.py that answers every job without Blender
+if __name__ == "__main__":
+    args = sys.argv[sys.argv.index('--') + 1:]
+    host, port = args[1].rsplit(':', 1)
+    connection = Client((host, int(port)), authkey=bytes.fromhex(args[3]))
+    job = connection.recv()
+    while job is not None:
+        if job == ['fail']:
+            connection.send(('error', 'failed'))
+        else:
+            connection.send(('progress', {'image': 0, 'image_count': 1, 'time': 0.0}))
+            connection.send(('done', {'total': len(job)}))
+        job = connection.recv()
@@ -70,13 +70,25 @@ class ServerGenerateTestCase(unittest.TestCase):
         self.assertEquals('--test 1 ', bash_script)
         self.assertTrue(found_false_input)
 
-    def test_get_time_data(self):
-        output = 'Total Time: 68.92672538757324\n' \
-                 'Object Creation Time: 35.33028221130371\n' \
-                 'Object Setup Time: 5.924004077911377\n' \
-                 'Image 0 Time: 27.30325198173523\n'
-        time_data = generate.get_time_data(output)
-        self.assertAlmostEqual(time_data['Total time'], 68.92672538757324)
-        self.assertAlmostEqual(time_data['Object creation'], 35.33028221130371)
-        self.assertAlmostEqual(time_data['Object setup'], 5.924004077911377)
-        self.assertAlmostEqual(time_data['Image 0'], 27.30325198173523)
+    def test_render_profile_good(self):
+        form = dict(render_profile='preview')
+        bash_script, found_false_input = generate.check_render_profile(form, '', lambda x, y: None,
+                                                                       ['preview', 'final'])
+        self.assertEqual('--render_profile=preview ', bash_script)
+        self.assertFalse(found_false_input)
+        self.assertEqual(('', False), generate.check_render_profile(dict(render_profile=''), '',
+                                                                    lambda x, y: None, []))
+
+    def test_render_profile_bad(self):
+        form = dict(render_profile='cinema')
+        bash_script, found_false_input = generate.check_render_profile(form, '', lambda x, y: None,
+                                                                       ['preview', 'final'])
+        self.assertEqual('', bash_script)
+        self.assertTrue(found_false_input)
+
+    def test_format_time_data(self):
+        time_data = generate.format_time_data({'total': 3.0, 'object_creation_time': 1.0,
+                                               'object_setup_time': 0.5, 'image_0': 1.5,
+                                               'image_0_frames': 40})
+        self.assertEqual({'Total time': 3.0, 'Object creation': 1.0, 'Object setup': 0.5,
+                          'Image 0': 1.5, 'Image 0 frames': 40}, time_data)
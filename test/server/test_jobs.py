@@ -0,0 +1,54 @@
+import sys
+import unittest
+
+src_dir = "/workdir"
+sys.path.insert(1, src_dir)
+
+from src.server.jobs import Job  # noqa: E402
+
+
+class JobTestCase(unittest.TestCase):
+    # Runs before every test
+    def setUp(self):
+        self.job = Job(['-i', '2'])
+
+    def test_status(self):
+        self.assertEqual('queued', self.job.status)
+        self.job.start()
+        self.assertEqual('running', self.job.status)
+        self.job.finish('done', {'total': 1.0})
+        self.assertEqual('done', self.job.status)
+        self.assertEqual({'total': 1.0}, self.job.wait(0))
+
+    def test_error(self):
+        self.job.finish('error', 'failed')
+        self.assertRaises(RuntimeError, lambda: self.job.wait(0))
+        self.assertEqual('failed', self.job.to_dict()['error'])
+
+    def test_wait_timeout(self):
+        self.job.start()
+        self.assertRaises(TimeoutError, lambda: self.job.wait(0))
+
+    def test_to_dict(self):
+        self.job.progress({'image': 0, 'image_count': 2, 'time': 1.5})
+        report = self.job.to_dict()
+        self.assertEqual(1, report['images_done'])
+        self.assertEqual(2, report['image_count'])
+        self.assertEqual('queued', report['status'])
+
+    def test_follow(self):
+        self.job.progress({'image': 0, 'image_count': 2, 'time': 1.5})
+        self.job.progress({'image': 1, 'image_count': 2, 'time': 2.5})
+        self.job.finish('done', {'total': 4.0})
+        events = list(self.job.follow())
+        self.assertEqual([0, 1], [event['image'] for event in events[:2]])
+        self.assertEqual('done', events[2]['status'])
+
+    def test_events_since(self):
+        self.job.progress({'image': 0, 'image_count': 2, 'time': 1.5})
+        self.assertEqual([], self.job.events_since(1, 0))
+        self.assertEqual(1, len(self.job.events_since(0, 0)))
+
+
+if __name__ == '__main__':
+    unittest.main(argv=sys.argv[0:1])
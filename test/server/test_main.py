@@ -27,3 +27,7 @@ class ServerMainTestCase(unittest.TestCase):
                                                             image_count=5,
                                                             object_count=1)).status_code
         self.assertEqual(400, status_code)
+
+    def test_job_not_found(self):
+        status_code = main.app.test_client().get('/jobs/unknown').status_code
+        self.assertEqual(404, status_code)
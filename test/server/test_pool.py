@@ -0,0 +1,48 @@
+import sys
+import unittest
+
+src_dir = "/workdir"
+sys.path.insert(1, src_dir)
+
+from src.server.pool import WorkerPool  # noqa: E402
+
+
+class WorkerPoolTestCase(unittest.TestCase):
+    # Runs before every test
+    def setUp(self):
+        command = f'{sys.executable} {src_dir}/test/server/echo_worker.py --'
+        self.pool = WorkerPool(command, 2, ['127.0.0.1', 0])
+
+    # Runs after every test
+    def tearDown(self):
+        self.pool.close()
+
+    def test_prune(self):
+        self.pool.history = 2
+        jobs = [self.pool.submit(['-i', str(i)]) for i in range(4)]
+        for job in jobs:
+            job.wait(10)
+        self.pool.submit(['-i', '4']).wait(10)
+        self.assertEqual([None, None] + jobs[2:], [self.pool.get(job.id) for job in jobs])
+
+    def test_submit(self):
+        job = self.pool.submit(['-i', '1'])
+        self.assertEqual({'total': 2}, job.wait(10))
+
+    def test_submit_many(self):
+        jobs = [self.pool.submit(['-i'] * i) for i in range(5)]
+        self.assertEqual([{'total': i} for i in range(5)], [job.wait(10) for job in jobs])
+
+    def test_submit_progress(self):
+        job = self.pool.submit(['-i', '1'])
+        job.wait(10)
+        self.assertEqual(job, self.pool.get(job.id))
+        self.assertEqual([{'image': 0, 'image_count': 1, 'time': 0.0}], job.events)
+
+    def test_submit_error(self):
+        job = self.pool.submit(['fail'])
+        self.assertRaises(RuntimeError, lambda: job.wait(10))
+
+
+if __name__ == '__main__':
+    unittest.main(argv=sys.argv[0:1])
@@ -14,10 +14,24 @@ from test.blender.test_blender import BlenderTestCase  # noqa: E402
 from test.blender.test_object import ObjectTestCase  # noqa: E402
 from test.blender.test_scene import SceneTestCase  # noqa: E402
 from test.blender.test_crush import CrushTestCase  # noqa: E402
+from test.blender.test_crush_farm import CrushFarmTestCase  # noqa: E402
+from test.blender.test_pose_bank import PoseBankTestCase  # noqa: E402
 from test.util.test_parser import ParserTestCase  # noqa: E402
 from test.util.test_annotate import AnnotateTestCase  # noqa: E402
+from test.util.test_shard import ShardTestCase  # noqa: E402
+from test.util.test_ledger import LedgerTestCase  # noqa: E402
+from test.util.test_cache import CacheTestCase  # noqa: E402
+from test.util.test_bounds import BoundsTestCase  # noqa: E402
+from test.util.test_poses import PosesTestCase  # noqa: E402
+from test.util.test_configuration import ConfigurationTestCase  # noqa: E402
+from test.util.test_seeds import SeedsTestCase  # noqa: E402
+from test.util.test_manifest import ManifestTestCase  # noqa: E402
+from test.util.test_checkpoint import CheckpointTestCase  # noqa: E402
+from test.util.test_masks import MasksTestCase  # noqa: E402
 from test.server.test_main import ServerMainTestCase  # noqa: E402
 from test.server.test_generate import ServerGenerateTestCase  # noqa: E402
+from test.server.test_pool import WorkerPoolTestCase  # noqa: E402
+from test.server.test_jobs import JobTestCase  # noqa: E402
 
 import unittest  # noqa: E402
 
@@ -27,10 +41,24 @@ if __name__ == '__main__':
     suites.append(unittest.defaultTestLoader.loadTestsFromTestCase(ObjectTestCase))
     suites.append(unittest.defaultTestLoader.loadTestsFromTestCase(SceneTestCase))
     suites.append(unittest.defaultTestLoader.loadTestsFromTestCase(CrushTestCase))
+    suites.append(unittest.defaultTestLoader.loadTestsFromTestCase(CrushFarmTestCase))
+    suites.append(unittest.defaultTestLoader.loadTestsFromTestCase(PoseBankTestCase))
     suites.append(unittest.defaultTestLoader.loadTestsFromTestCase(ParserTestCase))
     suites.append(unittest.defaultTestLoader.loadTestsFromTestCase(ServerMainTestCase))
     suites.append(unittest.defaultTestLoader.loadTestsFromTestCase(ServerGenerateTestCase))
+    suites.append(unittest.defaultTestLoader.loadTestsFromTestCase(WorkerPoolTestCase))
+    suites.append(unittest.defaultTestLoader.loadTestsFromTestCase(JobTestCase))
     suites.append(unittest.defaultTestLoader.loadTestsFromTestCase(AnnotateTestCase))
+    suites.append(unittest.defaultTestLoader.loadTestsFromTestCase(ShardTestCase))
+    suites.append(unittest.defaultTestLoader.loadTestsFromTestCase(LedgerTestCase))
+    suites.append(unittest.defaultTestLoader.loadTestsFromTestCase(CacheTestCase))
+    suites.append(unittest.defaultTestLoader.loadTestsFromTestCase(BoundsTestCase))
+    suites.append(unittest.defaultTestLoader.loadTestsFromTestCase(PosesTestCase))
+    suites.append(unittest.defaultTestLoader.loadTestsFromTestCase(ConfigurationTestCase))
+    suites.append(unittest.defaultTestLoader.loadTestsFromTestCase(SeedsTestCase))
+    suites.append(unittest.defaultTestLoader.loadTestsFromTestCase(ManifestTestCase))
+    suites.append(unittest.defaultTestLoader.loadTestsFromTestCase(CheckpointTestCase))
+    suites.append(unittest.defaultTestLoader.loadTestsFromTestCase(MasksTestCase))
     all_tests = unittest.TestSuite(suites)
     success = unittest.TextTestRunner().run(all_tests).wasSuccessful()
 
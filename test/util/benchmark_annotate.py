@@ -0,0 +1,30 @@
+import sys
+import json
+import numpy as np
+
+src_dir = "/workdir"
+sys.path.insert(1, src_dir)
+
+from src.util.annotate import annotation_lines  # noqa: E402
+from test_annotate import categories, names, loop_annotations, random_boxes  # noqa: E402
+from benchmark_bounds import measure  # noqa: E402
+
+
+def loop_lines(bounding_boxes, category_dict, name_dict):
+    """
+    Annotates one box at a time and encodes every annotation, like the file used to be written.
+    """
+    return [json.dumps(annotation)
+            for annotation in loop_annotations(bounding_boxes, category_dict, name_dict)]
+
+
+if __name__ == '__main__':
+    generator = np.random.default_rng(0)
+    print(f"{'images':>10} {'loop (s)':>10} {'numpy (s)':>10} {'speedup':>8}")
+    for count in [100, 1000, 10000, 100000]:
+        bounding_boxes = random_boxes(count, 20, generator)
+        loop_time, expected = measure(loop_lines, bounding_boxes, categories, names)
+        numpy_time, result = measure(lambda: list(annotation_lines(bounding_boxes, categories,
+                                                                   names)))
+        assert [json.loads(line) for line in expected] == [json.loads(line) for line in result]
+        print(f"{count:>10} {loop_time:>10.4f} {numpy_time:>10.4f} {loop_time / numpy_time:>8.1f}")
@@ -0,0 +1,30 @@
+import sys
+import time
+import numpy as np
+
+src_dir = "/workdir"
+sys.path.insert(1, src_dir)
+
+from src.util.bounds import project_bounds  # noqa: E402
+from test_bounds import frame, loop_bounds  # noqa: E402
+
+
+def measure(function, *args):
+    """
+    Times a single call of a function.
+    :return: tuple (seconds, result)
+    """
+    start = time.perf_counter()
+    result = function(*args)
+    return time.perf_counter() - start, result
+
+
+if __name__ == '__main__':
+    generator = np.random.RandomState(0)
+    print(f"{'vertices':>10} {'loop (s)':>10} {'numpy (s)':>10} {'speedup':>8}")
+    for count in [100, 1000, 10000, 100000, 1000000]:
+        coordinates = generator.uniform([-1, -1, -10], [1, 1, -2], size=(count, 3))
+        loop_time, expected = measure(loop_bounds, coordinates, frame, True)
+        numpy_time, result = measure(project_bounds, coordinates, frame, True)
+        assert np.allclose(expected, result)
+        print(f"{count:>10} {loop_time:>10.4f} {numpy_time:>10.4f} {loop_time / numpy_time:>8.1f}")
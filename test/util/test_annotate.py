@@ -1,5 +1,9 @@
 import sys
+import json
+import tempfile
 import unittest
+import numpy as np
+from pathlib import Path
 from datetime import datetime
 
 src_dir = "/workdir"
@@ -8,6 +12,39 @@ sys.path.insert(1, src_dir)
 from src.util import annotate  # noqa: E402
 
 
+categories = {'materials': {'Aluminium': 1, 'PET': 4}}
+names = {'Can': 'Aluminium', 'PlasticBottle': 'PET', 'Unknown': 'Glass'}
+
+
+def loop_annotations(bounding_boxes, category_dict, name_dict, min_box_size=200):
+    """
+    Reference implementation that annotates one box at a time.
+    """
+    annotations, counter = [], 0
+    for i_image, image_bounding_boxes in enumerate(bounding_boxes):
+        for object_name, object_bounding_box in image_bounding_boxes:
+            x, y, width, height = object_bounding_box
+            if width + height > min_box_size:
+                annotations.append({
+                    "id": counter, "image_id": i_image,
+                    "category_id": annotate.get_category_id(object_name, category_dict,
+                                                            name_dict),
+                    "segmentation": [[x, y, x + width, y, x + width, y + height, x, y + height]],
+                    "area": width * height, "bbox": list(object_bounding_box), "iscrowd": 0,
+                })
+            counter += 1
+    return annotations
+
+
+def random_boxes(image_count, boxes_per_image, generator):
+    """
+    Makes labeled boxes like the ones taken of rendered images.
+    """
+    labels = list(names) + ['Other']
+    return [[(labels[generator.integers(len(labels))], generator.integers(0, 400, 4).tolist())
+             for _ in range(boxes_per_image)] for _ in range(image_count)]
+
+
 class AnnotateTestCase(unittest.TestCase):
 
     def test_get_info(self):
@@ -31,6 +68,116 @@ class AnnotateTestCase(unittest.TestCase):
         self.assertEquals(image_info[0]['height'], resolution[1])
         self.assertEquals(image_info[0]['date_captured'], date_captured)
 
+    def test_get_image_info_start_index(self):
+        image_info = annotate.get_image_info(2, (1200, 800), datetime.now(), 10)
+        self.assertEqual([10, 11], [image['id'] for image in image_info])
+        self.assertEqual('11.jpg', image_info[1]['file_name'])
+
+    def test_get_annotation_info_start_index(self):
+        bounding_boxes = [[('test_name', [0, 0, 200, 200])]]
+        annotation = annotate.get_annotation_info(bounding_boxes, {}, {}, 10)[0]
+        self.assertEqual(10, annotation['image_id'])
+
+    def test_merge_files(self):
+        with tempfile.TemporaryDirectory() as directory:
+            shard_files = []
+            for index in range(2):
+                Path(directory, f'shard_{index}').mkdir()
+                shard_files.append(Path(directory, f'shard_{index}', 'info.json'))
+                with open(shard_files[-1], 'w') as file:
+                    json.dump({'info': {}, 'categories': [],
+                               'images': [{'id': 1 - index, 'file_name': f'{1 - index}.jpg'}],
+                               'annotations': [{'id': 0, 'image_id': 1 - index}]}, file)
+            annotate.merge_files(shard_files, Path(directory, 'info.json'))
+            with open(Path(directory, 'info.json')) as file:
+                merged = json.load(file)
+        self.assertEqual(['shard_1/0.jpg', 'shard_0/1.jpg'],
+                         [image['file_name'] for image in merged['images']])
+        self.assertEqual([0, 1], [annotation['id'] for annotation in merged['annotations']])
+
+    def test_write_file(self):
+        configuration = {'description': 'test', 'version': 0,
+                         'categories': {'materials': {'Aluminium': 1}}, 'names': {}}
+        with tempfile.TemporaryDirectory() as directory:
+            name = str(Path(directory, 'info'))
+            # The bounding boxes are read as they are written
+            annotate.write_file(configuration, (1200, 800), name, 2,
+                                (boxes for boxes in [[('a', [0, 0, 200, 200])], []]), 5)
+            with open(name + '.json') as file:
+                dataset = json.load(file)
+        self.assertEqual([5, 6], [image['id'] for image in dataset['images']])
+        self.assertEqual([5], [annotation['image_id'] for annotation in dataset['annotations']])
+        self.assertEqual('Aluminium', dataset['categories'][0]['name'])
+        self.assertEqual('test', dataset['info']['description'])
+
+    def test_patch_file(self):
+        configuration = {'categories': {'materials': {}}, 'names': {}}
+        with tempfile.TemporaryDirectory() as directory:
+            name = str(Path(directory, 'info'))
+            annotate.write_file(dict(configuration, description='', version=0), (1200, 800),
+                                name, 3, [[('a', [0, 0, 200, 200])]] * 3)
+            annotate.patch_file(configuration, (1200, 800), name,
+                                [[('b', [0, 0, 300, 300]), ('c', [0, 0, 400, 400])]], 1)
+            with open(name + '.json') as file:
+                patched = json.load(file)
+        self.assertEqual(3, len(patched['images']))
+        self.assertEqual([0, 2, 1, 1], [annotation['image_id']
+                                        for annotation in patched['annotations']])
+        self.assertEqual([0, 2, 3, 4], [annotation['id'] for annotation in patched['annotations']])
+        self.assertEqual(300, patched['annotations'][2]['bbox'][2])
+
+    def test_get_annotation_info_like_loop(self):
+        bounding_boxes = random_boxes(20, 10, np.random.default_rng(0))
+        self.assertEqual(loop_annotations(bounding_boxes, categories, names),
+                         annotate.get_annotation_info(bounding_boxes, categories, names))
+
+    def test_get_annotation_info_filter(self):
+        bounding_boxes = [[('Can', [0, 0, 50, 50]), ('Can', [0, 0, 300, 10])]]
+        annotations = annotate.get_annotation_info(bounding_boxes, categories, names, 0,
+                                                   {'min_box_size': 0, 'min_area': 3000})
+        self.assertEqual([1], [annotation['id'] for annotation in annotations])
+
+    def test_annotation_lines(self):
+        bounding_boxes = random_boxes(20, 10, np.random.default_rng(1))
+        lines = annotate.annotation_lines(bounding_boxes, categories, names)
+        self.assertEqual(loop_annotations(bounding_boxes, categories, names),
+                         json.loads('[' + ', '.join(lines) + ']'))
+
+    def test_get_annotation_info_masks(self):
+        rle = {'counts': [10, 20, 70], 'size': [10, 10]}
+        bounding_boxes = [[('Can', [1, 0, 150, 100], rle), ('Can', [0, 0, 300, 300])]]
+        annotations = annotate.get_annotation_info(bounding_boxes, categories, names, 0,
+                                                   {'min_box_size': 0, 'min_area': 0})
+        self.assertEqual([rle, [[0, 0, 300, 0, 300, 300, 0, 300]]],
+                         [annotation['segmentation'] for annotation in annotations])
+        self.assertEqual([20, 90000], [annotation['area'] for annotation in annotations])
+        lines = annotate.annotation_lines(bounding_boxes, categories, names, 0,
+                                          {'min_box_size': 0, 'min_area': 0})
+        self.assertEqual(annotations, json.loads('[' + ', '.join(lines) + ']'))
+
+    def test_get_annotation_info_mask_area_filter(self):
+        bounding_boxes = [[('Can', [0, 0, 100, 100], {'counts': [0, 5], 'size': [1, 5]})]]
+        self.assertEqual([], annotate.get_annotation_info(bounding_boxes, categories, names, 0,
+                                                          {'min_box_size': 0, 'min_area': 6}))
+
+    def test_get_annotation_info_visibility(self):
+        rle = {'counts': [0, 100], 'size': [10, 10]}
+        bounding_boxes = [[('Can', [0, 0, 10, 10], rle, 0.05), ('Can', [0, 0, 10, 10], rle, 0.5)]]
+        box_filter = {'min_box_size': 0, 'min_area': 0, 'min_visibility': 0.1}
+        dropped = annotate.get_annotation_info(bounding_boxes, categories, names, 0, box_filter)
+        self.assertEqual([(1, 0.5, 0)], [(annotation['id'], annotation['visibility'],
+                                          annotation['iscrowd']) for annotation in dropped])
+        flagged = annotate.get_annotation_info(bounding_boxes, categories, names, 0,
+                                               dict(box_filter, occluded='flag'))
+        self.assertEqual([1, 0], [annotation['iscrowd'] for annotation in flagged])
+        lines = annotate.annotation_lines(bounding_boxes, categories, names, 0,
+                                          dict(box_filter, occluded='flag'))
+        self.assertEqual(flagged, json.loads('[' + ', '.join(lines) + ']'))
+
+    def test_get_category_table(self):
+        self.assertEqual({'Can': 1, 'PlasticBottle': 4, 'Unknown': -1},
+                         annotate.get_category_table(categories, names))
+
     def test_get_annotation_info_bad(self):
         x, y, width, height = 0, 0, 1, 1
         bounding_box = [x, y, width, height]
@@ -43,8 +190,8 @@ class AnnotateTestCase(unittest.TestCase):
         bounding_box = [x, y, width, height]
         bounding_boxes = [[('test_name', bounding_box)]]
         annotation = annotate.get_annotation_info(bounding_boxes, {}, {})[0]
-        self.assertEqual(annotation['segmentation'], [x, y, x + width, y - height,
-                                                      x + width, y, x, y - height])
+        self.assertEqual(annotation['segmentation'], [[x, y, x + width, y,
+                                                       x + width, y + height, x, y + height]])
         self.assertEqual(annotation['area'], width * height)
         self.assertEqual(annotation['bbox'], bounding_box)
         self.assertEqual(annotation['category_id'], -1)
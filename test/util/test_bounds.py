@@ -0,0 +1,87 @@
+import sys
+import unittest
+import numpy as np
+
+src_dir = "/workdir"
+sys.path.insert(1, src_dir)
+
+from src.util.bounds import to_camera_space, project_bounds, to_pixel_box, convex_area, \
+    silhouette_area  # noqa: E402
+
+# Negated view frame of the default camera, at 1 unit in front of it
+frame = [[-0.5, -0.28, 1.0], [-0.5, 0.28, 1.0], [0.5, 0.28, 1.0]]
+
+
+def loop_bounds(coordinates, frame, perspective):
+    """
+    The vertex by vertex projection the vectorised one replaces.
+    """
+    frame = [np.array(corner, dtype=np.float64) for corner in frame]
+    lx, ly = [], []
+    for co in coordinates:
+        z = -co[2]
+        if perspective:
+            if z == 0.0:
+                lx.append(0.5)
+                ly.append(0.5)
+            else:
+                frame = [(v / (v[2] / z)) for v in frame]
+        min_x, max_x = frame[1][0], frame[2][0]
+        min_y, max_y = frame[0][1], frame[1][1]
+        lx.append((co[0] - min_x) / (max_x - min_x))
+        ly.append((co[1] - min_y) / (max_y - min_y))
+    return tuple(float(np.clip(value, 0.0, 1.0)) for value in [min(lx), max(lx), min(ly), max(ly)])
+
+
+class BoundsTestCase(unittest.TestCase):
+    # Runs before every test
+    def setUp(self):
+        generator = np.random.RandomState(0)
+        self.coordinates = generator.uniform([-1, -1, -10], [1, 1, -2], size=(1000, 3))
+
+    def test_to_camera_space(self):
+        matrix = np.eye(4)
+        matrix[:3, 3] = [1, 2, 3]
+        matrix[:3, :3] = [[0, -1, 0], [1, 0, 0], [0, 0, 1]]
+        result = to_camera_space(np.array([[1.0, 0.0, 0.0], [0.0, 1.0, 1.0]]), matrix)
+        np.testing.assert_allclose(result, [[1, 3, 3], [0, 2, 4]])
+
+    def test_project_bounds_perspective(self):
+        np.testing.assert_allclose(project_bounds(self.coordinates, frame, True),
+                                   loop_bounds(self.coordinates, frame, True))
+
+    def test_project_bounds_orthographic(self):
+        np.testing.assert_allclose(project_bounds(self.coordinates, frame, False),
+                                   loop_bounds(self.coordinates, frame, False))
+
+    def test_project_bounds_zero_depth(self):
+        self.coordinates[[0, 10, 11], 2] = 0.0
+        np.testing.assert_allclose(project_bounds(self.coordinates, frame, True),
+                                   loop_bounds(self.coordinates, frame, True))
+
+    def test_project_bounds_inside(self):
+        coordinates = np.array([[0.0, 0.0, -4.0], [0.5, 0.25, -4.0]])
+        np.testing.assert_allclose(project_bounds(coordinates, frame, True),
+                                   (0.5, 0.625, 0.5, 0.5 + 0.25 / 2.24))
+
+    def test_to_pixel_box(self):
+        self.assertEqual(to_pixel_box((0.25, 0.5, 0.5, 1.0), (200, 100)), (50, 0, 50, 50))
+
+    def test_to_pixel_box_empty(self):
+        self.assertEqual(to_pixel_box((0.25, 0.251, 0.5, 1.0), (200, 100)), (0, 0, 0, 0))
+
+    def test_convex_area(self):
+        square = [[0, 0], [2, 0], [2, 2], [0, 2], [1, 1], [1, 0], [0, 0]]
+        self.assertAlmostEqual(convex_area(square), 4.0)
+        self.assertEqual(convex_area([[0, 0], [1, 1], [2, 2]]), 0.0)
+
+    def test_silhouette_area(self):
+        # A square of 0.5 by 0.28 at the depth of the frame covers a quarter of the image
+        coordinates = np.array([[0.0, 0.0, -1.0], [0.5, 0.0, -1.0], [0.5, 0.28, -1.0],
+                                [0.0, 0.28, -1.0], [0.25, 0.1, -1.0]])
+        self.assertAlmostEqual(silhouette_area(coordinates, frame, True, (200, 100)), 5000.0)
+        self.assertAlmostEqual(silhouette_area(coordinates * 2, frame, True, (200, 100)), 5000.0)
+
+
+if __name__ == '__main__':
+    unittest.main(argv=sys.argv[0:1])
@@ -0,0 +1,104 @@
+import os
+import sys
+import fcntl
+import tempfile
+import unittest
+from pathlib import Path
+import numpy as np
+
+src_dir = "/workdir"
+sys.path.insert(1, src_dir)
+
+from src.util.cache import FileCache, hash_key  # noqa: E402
+from src.util.cache import array_path, load_array, save_array  # noqa: E402
+from src.util.cache import model_files, library_path  # noqa: E402
+
+
+class CacheTestCase(unittest.TestCase):
+    # Runs before every test
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache = FileCache(self.directory.name, 10)
+
+    # Runs after every test
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def add_file(self, name, size):
+        with open(Path(self.directory.name, name), 'w') as file:
+            file.write('x' * size)
+        return self.cache.put(name, [name], {'name': name})
+
+    def test_hash_key(self):
+        path = Path(self.directory.name, 'source')
+        path.write_text('mesh')
+        self.assertEqual(hash_key([path], {'a': 1, 'b': 2}), hash_key([path], {'b': 2, 'a': 1}))
+        self.assertNotEqual(hash_key([path], {'a': 1}), hash_key([path], {'a': 2}))
+
+    def test_get(self):
+        self.add_file('a', 4)
+        self.assertEqual('a', self.cache.get('a')['name'])
+        self.assertIsNone(self.cache.get('b'))
+
+    def test_get_removed_file(self):
+        self.add_file('a', 4)
+        Path(self.directory.name, 'a').unlink()
+        self.assertIsNone(self.cache.get('a'))
+
+    def test_evict_least_recently_used(self):
+        self.add_file('a', 4)
+        self.add_file('b', 4)
+        self.cache.get('a')
+        self.add_file('c', 4)
+        self.assertIsNotNone(self.cache.get('a'))
+        self.assertIsNone(self.cache.get('b'))
+        self.assertFalse(Path(self.directory.name, 'b').exists())
+
+    def test_evict_derived_files(self):
+        self.add_file('a.obj', 4)
+        Path(self.directory.name, 'a.hull.npy').write_text('hull')
+        self.add_file('b.obj', 8)
+        self.assertFalse(Path(self.directory.name, 'a.hull.npy').exists())
+        self.assertTrue(Path(self.directory.name, 'b.obj').exists())
+
+    def test_lock(self):
+        with self.cache.lock('abc'):
+            with open(Path(self.directory.name, 'locks', 'abc.lock')) as lock:
+                self.assertRaises(BlockingIOError,
+                                  lambda: fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB))
+        with open(Path(self.directory.name, 'locks', 'abc.lock')) as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+    def test_model_files(self):
+        path = Path(self.directory.name, 'model.obj')
+        path.write_text('v 0 0 0')
+        self.assertEqual([str(path)], model_files(str(path)))
+        path.with_suffix('.mtl').write_text('newmtl Material')
+        self.assertEqual([str(path), str(path.with_suffix('.mtl'))], model_files(str(path)))
+
+    def test_library_path(self):
+        self.assertEqual('Models/Aluminium/Can.mesh.blend',
+                         library_path('Models/Aluminium/Can.obj'))
+
+    def test_array_path(self):
+        self.assertEqual('Models/Aluminium/Can.hull.npy',
+                         array_path('Models/Aluminium/Can.obj', 'hull'))
+
+    def test_save_and_load_array(self):
+        path = Path(self.directory.name, 'model.obj')
+        path.write_text('v 0 0 0')
+        self.assertIsNone(load_array(str(path), 'hull'))
+        save_array(str(path), 'hull', np.eye(3))
+        np.testing.assert_array_equal(np.eye(3), load_array(str(path), 'hull'))
+        self.assertEqual(['model.hull.npy', 'model.obj'], sorted(os.listdir(self.directory.name)))
+
+    def test_load_stale_array(self):
+        path = Path(self.directory.name, 'model.obj')
+        path.write_text('v 0 0 0')
+        save_array(str(path), 'hull', np.eye(3))
+        os.utime(array_path(str(path), 'hull'), (0, 0))
+        self.assertIsNone(load_array(str(path), 'hull'))
+
+
+if __name__ == '__main__':
+    unittest.main(argv=sys.argv[0:1])
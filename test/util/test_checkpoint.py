@@ -0,0 +1,66 @@
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+src_dir = "/workdir"
+sys.path.insert(1, src_dir)
+
+from src.util import checkpoint  # noqa: E402
+
+
+class CheckpointTestCase(unittest.TestCase):
+
+    def test_read_missing_log(self):
+        with tempfile.TemporaryDirectory() as directory:
+            self.assertEqual({}, checkpoint.index_log(directory))
+            self.assertEqual([[], []], list(checkpoint.log_boxes(directory, 0, 2)))
+            self.assertIsNone(checkpoint.logged_seed(directory))
+
+    def test_append_entry(self):
+        with tempfile.TemporaryDirectory() as directory:
+            checkpoint.start_log(directory, {'seed': 7})
+            checkpoint.append_entry(directory, {'image': 3, 'seed': 7,
+                                                'boxes': [['Can', [0, 0, 1, 1]]]})
+            checkpoint.append_entry(directory, {'image': 3, 'seed': 7, 'boxes': []})
+            checkpoint.append_entry(directory, {'image': 4, 'seed': 7,
+                                                'boxes': [['Can', [0, 0, 2, 2]]]})
+            offsets = checkpoint.index_log(directory)
+            entries = list(checkpoint.read_entries(directory, offsets, [3, 5]))
+            # The last entry of an image wins
+            self.assertEqual([{'image': 3, 'seed': 7, 'boxes': []}, None], entries)
+            self.assertEqual([[], [('Can', [0, 0, 2, 2])], []],
+                             list(checkpoint.log_boxes(directory, 3, 3)))
+            self.assertEqual(7, checkpoint.logged_seed(directory))
+
+    def test_read_cut_off_log(self):
+        with tempfile.TemporaryDirectory() as directory:
+            checkpoint.append_entry(directory, {'image': 0, 'boxes': []})
+            with open(checkpoint.log_path(directory), 'a') as file:
+                file.write('{"image": 1, "bo')
+            # The cut off line is ended, so the next entry is not lost
+            checkpoint.append_entry(directory, {'image': 2, 'boxes': []})
+            self.assertEqual([0, 2], list(checkpoint.index_log(directory)))
+
+    def test_finished_images(self):
+        with tempfile.TemporaryDirectory() as directory:
+            for index in [0, 2, 3]:
+                Path(directory, f'{index}.png').touch()
+            for index, seed in [(0, 7), (1, 7), (3, 8), (10, 7)]:
+                checkpoint.append_entry(directory, {'image': index, 'seed': seed, 'boxes': []})
+            self.assertEqual({0}, checkpoint.finished_images(directory, 7, range(4)))
+            self.assertEqual(set(), checkpoint.finished_images(directory, 7, range(1, 4)))
+
+    def test_start_log(self):
+        with tempfile.TemporaryDirectory() as directory:
+            checkpoint.start_log(directory, {'seed': 7})
+            checkpoint.append_entry(directory, {'image': 0, 'seed': 7, 'boxes': []})
+            checkpoint.start_log(directory, {'seed': 8})
+            self.assertEqual(8, checkpoint.logged_seed(directory))
+            self.assertEqual({}, checkpoint.index_log(directory))
+            self.assertEqual(set(), checkpoint.finished_images(directory, 7, range(1)))
+            self.assertTrue(Path(directory, 'annotations.previous.jsonl').exists())
+
+
+if __name__ == '__main__':
+    unittest.main(argv=sys.argv[0:1])
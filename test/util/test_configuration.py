@@ -0,0 +1,68 @@
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+src_dir = "/workdir"
+sys.path.insert(1, src_dir)
+
+from src.util.configuration import Configuration, load_configuration  # noqa: E402
+
+
+class ConfigurationTestCase(unittest.TestCase):
+    # Runs before every test
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = Path(self.directory.name, 'test.yaml')
+        shutil.copy(src_dir + '/test/util/test.yaml', self.path)
+
+    # Runs after every test
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_sections(self):
+        configuration = Configuration(self.path)
+        self.assertEqual([1, 2, 3], configuration['key2']['key2.2'])
+        self.assertIn('key1', configuration)
+        self.assertNotIn('key3', configuration)
+
+    def test_load_once(self):
+        self.assertIs(load_configuration(self.path), load_configuration(self.path))
+
+    def test_reload_when_modified(self):
+        configuration = load_configuration(self.path)
+        with open(self.path, 'a') as file:
+            file.write('\nkey3: 3\n')
+        os.utime(self.path, (0, 0))
+        self.assertTrue(configuration.is_outdated())
+        self.assertEqual(3, load_configuration(self.path)['key3'])
+
+    def test_render_profile(self):
+        with open(self.path, 'a') as file:
+            file.write('\nrender: {engine: CYCLES, samples: 30}\n'
+                       'render_profiles: {preview: {engine: BLENDER_EEVEE}}\n')
+        configuration = Configuration(self.path)
+        self.assertIs(configuration, configuration.with_render_profile(None))
+        preview = configuration.with_render_profile('preview')
+        self.assertEqual({'engine': 'BLENDER_EEVEE', 'samples': 30}, preview['render'])
+        self.assertEqual('CYCLES', configuration['render']['engine'])
+        self.assertRaises(OSError, lambda: configuration.with_render_profile('final'))
+
+    def test_accessors(self):
+        with open(self.path, 'a') as file:
+            file.write('\nrender: {samples: 30}\ncrush: {variants: 2}\n'
+                       'backgrounds: {pool_size: 5}\n')
+        configuration = Configuration(self.path)
+        self.assertIs(configuration['render'], configuration.render)
+        self.assertIs(configuration['crush'], configuration.crush)
+        self.assertEqual(5, configuration.background_pool_size)
+        self.assertEqual({}, configuration.render_profiles)
+
+    def test_load_default(self):
+        self.assertIn('render', load_configuration())
+
+
+if __name__ == '__main__':
+    unittest.main(argv=sys.argv[0:1])
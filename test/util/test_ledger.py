@@ -0,0 +1,120 @@
+import sys
+import json
+import time
+import tempfile
+import unittest
+from pathlib import Path
+from multiprocessing import Process
+
+src_dir = "/workdir"
+sys.path.insert(1, src_dir)
+
+from src.util.ledger import Ledger  # noqa: E402
+from src.util.parser import Parser  # noqa: E402
+
+
+def record_shard(shard, renew):
+    """
+    Stand-in for rendering a shard, writes the worker that handled it.
+    :param shard: manifest dictionary of the shard
+    :param renew: function that renews the lease on the shard
+    :return: None
+    """
+    renew()
+    with open(Path(shard['directory'], f"{shard['id']}.{time.time()}.rendered"), 'w'):
+        pass
+
+
+def run_worker(directory, worker):
+    """
+    Stand-in for a worker process, handles shards until all are done.
+    :param directory: path to the ledger directory
+    :param worker: string identifying the worker
+    :return: None
+    """
+    Ledger(directory, poll_interval=0.01).work(
+        worker, lambda shard, renew: record_shard(dict(shard, directory=directory), renew))
+
+
+class LedgerTestCase(unittest.TestCase):
+    # Runs before every test
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.ledger = Ledger(self.directory.name, poll_interval=0.01)
+        self.shard_ids = self.ledger.create(['-i', '10', '-s', '1'], 3)
+
+    # Runs after every test
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_create(self):
+        self.assertEqual(['000000', '000001', '000002', '000003'], self.shard_ids)
+        with open(Path(self.directory.name, 'shards', '000003.json')) as file:
+            shard = json.load(file)
+        self.assertEqual(9, shard['start_index'])
+        self.assertEqual(1, shard['image_count'])
+
+    def test_create_run_seed(self):
+        for shard_id in self.shard_ids:
+            with open(Path(self.directory.name, 'shards', f'{shard_id}.json')) as file:
+                self.assertEqual(1, Parser().parse_args(json.load(file)['args']).seed)
+
+    def test_claim(self):
+        self.assertEqual('000000', self.ledger.claim('a')['id'])
+        self.assertEqual('000001', self.ledger.claim('b')['id'])
+
+    def test_claim_expired(self):
+        expired_ledger = Ledger(self.directory.name, lease_time=0)
+        self.assertTrue(expired_ledger.try_claim('000000', 'a'))
+        self.assertTrue(self.ledger.try_claim('000000', 'b'))
+        self.assertFalse(self.ledger.try_claim('000000', 'c'))
+        self.assertFalse(expired_ledger.renew('000000', 'a'))
+        self.assertTrue(self.ledger.renew('000000', 'b'))
+
+    def test_claim_empty_lease(self):
+        lease_path = Path(self.directory.name, 'leases', '000000.1.json')
+        lease_path.touch()
+        self.assertFalse(self.ledger.try_claim('000000', 'a'))
+        expired_ledger = Ledger(self.directory.name, lease_time=0)
+        self.assertTrue(expired_ledger.try_claim('000000', 'b'))
+        self.assertEqual(2, self.ledger.current_lease('000000')[0])
+        self.assertEqual([], list(Path(self.directory.name, 'leases').glob('*.tmp')))
+
+    def test_claim_again_resumes(self):
+        self.assertNotIn('-re', self.ledger.claim('a')['args'])
+        expired_ledger = Ledger(self.directory.name, lease_time=0)
+        self.assertTrue(expired_ledger.try_claim('000001', 'a'))
+        self.assertTrue(self.ledger.try_claim('000001', 'b'))
+        self.assertEqual(['-re', '1'], self.ledger.read_shard('000001')['args'][-2:])
+
+    def test_work_lease_lost(self):
+        def take_over(shard, renew):
+            Ledger(self.directory.name, lease_time=0).renew(shard['id'], 'a')
+            self.ledger.try_claim(shard['id'], 'b')
+            self.ledger.complete(shard['id'], 'b')
+            renew()
+        self.ledger.shard_ids = lambda: ['000000']
+        self.ledger.work('a', take_over)
+        with open(Path(self.directory.name, 'done', '000000.json')) as file:
+            self.assertEqual('b', json.load(file)['worker'])
+
+    def test_complete(self):
+        for shard_id in self.shard_ids:
+            self.ledger.complete(shard_id, 'a')
+        self.assertIsNone(self.ledger.claim('a'))
+
+    def test_work_processes(self):
+        workers = [Process(target=run_worker, args=(self.directory.name, str(i)))
+                   for i in range(3)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join(30)
+        self.assertTrue(all(self.ledger.is_done(shard_id) for shard_id in self.shard_ids))
+        rendered = sorted(path.name.split('.')[0]
+                          for path in Path(self.directory.name).glob('*.rendered'))
+        self.assertEqual(self.shard_ids, rendered)
+
+
+if __name__ == '__main__':
+    unittest.main(argv=sys.argv[0:1])
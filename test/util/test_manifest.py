@@ -0,0 +1,32 @@
+import sys
+import tempfile
+import unittest
+
+src_dir = "/workdir"
+sys.path.insert(1, src_dir)
+
+from src.util import manifest  # noqa: E402
+
+
+class ManifestTestCase(unittest.TestCase):
+
+    def test_image_range(self):
+        self.assertEqual((1200, 100), manifest.image_range('1200-1299'))
+        self.assertEqual((5, 1), manifest.image_range('5'))
+
+    def test_manifest_path(self):
+        self.assertEqual(src_dir + '/images/manifests/7.json',
+                         str(manifest.manifest_path('images/', 7)))
+
+    def test_write_manifest(self):
+        description = {'seed': 420, 'image': 7, 'background': 'BYWA0420.jpg',
+                       'objects': [{'path': 'Models/Aluminium/Can.obj', 'texture': None,
+                                    'texture_slots': 0, 'skin_color': None}],
+                       'locations': [[0.1, 0.2, 0.3]], 'orientations': [[0, 0, 1]]}
+        with tempfile.TemporaryDirectory() as directory:
+            manifest.write_manifest(directory, 7, description)
+            self.assertEqual(description, manifest.read_manifest(directory, 7))
+
+
+if __name__ == '__main__':
+    unittest.main(argv=sys.argv[0:1])
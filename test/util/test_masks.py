@@ -0,0 +1,50 @@
+import sys
+import unittest
+import numpy as np
+
+src_dir = "/workdir"
+sys.path.insert(1, src_dir)
+
+from src.util import masks  # noqa: E402
+
+
+class MasksTestCase(unittest.TestCase):
+
+    def test_encode_rle_column_order(self):
+        mask = np.array([[0, 1, 1],
+                         [0, 1, 0]], dtype=bool)
+        self.assertEqual({'counts': [2, 3, 1], 'size': [2, 3]}, masks.encode_rle(mask))
+
+    def test_encode_rle_starts_with_object(self):
+        mask = np.array([[1, 0], [1, 0]], dtype=bool)
+        self.assertEqual([0, 2, 2], masks.encode_rle(mask)['counts'])
+
+    def test_decode_rle(self):
+        mask = np.random.default_rng(0).random((7, 5)) > 0.5
+        rle = masks.encode_rle(mask)
+        np.testing.assert_array_equal(mask, masks.decode_rle(rle))
+        self.assertEqual(int(mask.sum()), masks.rle_area(rle))
+
+    def test_visible_fraction(self):
+        rle = {'counts': [5, 20, 75], 'size': [10, 10]}
+        self.assertEqual(0.25, masks.visible_fraction(rle, 80))
+        self.assertEqual(1.0, masks.visible_fraction(rle, 19.5))
+        self.assertEqual(0.0, masks.visible_fraction(rle, 0))
+
+    def test_mask_box(self):
+        mask = np.zeros((6, 8), dtype=bool)
+        mask[2:4, 3:7] = True
+        self.assertEqual([3, 2, 4, 2], masks.mask_box(mask))
+        self.assertEqual([0, 0, 0, 0], masks.mask_box(np.zeros((6, 8), dtype=bool)))
+
+    def test_instance_masks(self):
+        index_image = np.array([[0, 1, 1],
+                                [2, 2, 1]])
+        (box_1, rle_1), (box_2, rle_2), (box_3, rle_3) = masks.instance_masks(index_image, 3)
+        self.assertEqual(([1, 0, 2, 2], 3), (box_1, masks.rle_area(rle_1)))
+        self.assertEqual(([0, 1, 2, 1], 2), (box_2, masks.rle_area(rle_2)))
+        self.assertEqual(([0, 0, 0, 0], 0), (box_3, masks.rle_area(rle_3)))
+
+
+if __name__ == '__main__':
+    unittest.main(argv=sys.argv[0:1])
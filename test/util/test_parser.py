@@ -27,6 +27,15 @@ class ParserTestCase(unittest.TestCase):
                                                                    '1', '-i', '1', '-b',
                                                                    'background', '-o', 'images']))
 
+    def test_images(self):
+        self.assertEqual('1200-1299', self.parser.parse_args(['-im', '1200-1299']).images)
+        self.assertRaises(OSError, lambda: self.parser.parse_args(['-im', '1299-1200']))
+        self.assertRaises(OSError, lambda: self.parser.parse_args(['-im', 'all']))
+
+    def test_render_profile(self):
+        self.assertEqual('preview', self.parser.parse_args(['-rp', 'preview']).render_profile)
+        self.assertIsNone(self.parser.parse_args([]).render_profile)
+
     def test_yaml(self):
         data = self.parser.parse_long_term_configuration(pathlib.Path(
             src_dir + r"/test/util/test.yaml"))
@@ -0,0 +1,72 @@
+import sys
+import unittest
+import numpy as np
+
+src_dir = "/workdir"
+sys.path.insert(1, src_dir)
+
+from src.util.poses import euler_matrix, footprint_radius  # noqa: E402
+from src.util.poses import resting_pose, sample_layout, at_rest  # noqa: E402
+
+
+class PosesTestCase(unittest.TestCase):
+    # Runs before every test
+    def setUp(self):
+        # Corners of a 2 x 2 x 4 box standing upright
+        self.hull = np.array([[x, y, z] for x in [-1, 1] for y in [-1, 1] for z in [-2, 2]])
+        self.bank = np.array([[1.0, 0.0, 0.0, 0.0, 0.1]])
+
+    def test_euler_matrix(self):
+        np.testing.assert_allclose(euler_matrix([0, 0, np.pi / 2]) @ [1, 0, 0], [0, 1, 0],
+                                   atol=1e-12)
+        np.testing.assert_allclose(euler_matrix([np.pi / 2, 0, np.pi / 2]) @ [0, 1, 0],
+                                   [0, 0, 1], atol=1e-12)
+
+    def test_footprint_radius(self):
+        self.assertAlmostEqual(np.sqrt(2), footprint_radius(self.hull, [0, 0, 0]))
+        # Lying on its side the box covers more
+        self.assertAlmostEqual(np.sqrt(5), footprint_radius(self.hull, [np.pi / 2, 0, 0]))
+
+    def test_footprint_radius_turned(self):
+        self.assertAlmostEqual(footprint_radius(self.hull, [0.3, 0.2, 0]),
+                               footprint_radius(self.hull, [0.3, 0.2, 1.4]))
+
+    def test_resting_pose(self):
+        np.testing.assert_allclose(resting_pose(self.hull, [4, 5, 2], [0, 0, 1]),
+                                   [2, 0, 0, 1, np.sqrt(2)])
+
+    def test_sample_layout(self):
+        layout = sample_layout([self.bank] * 5, np.random.default_rng(0), 0.5, 20)
+        self.assertEqual(5, len(layout))
+        locations = np.array([location for location, _ in layout])
+        self.assertTrue(np.all(np.abs(locations[:, :2]) <= 0.5))
+        self.assertTrue(np.all(locations[:, 2] == 1.0))
+        distances = np.hypot(*(locations[:, None, :2] - locations[None, :, :2]).T)
+        self.assertTrue(np.all(distances[~np.eye(5, dtype=bool)] >= 0.2))
+
+    def test_sample_layout_does_not_fit(self):
+        bank = np.array([[1.0, 0.0, 0.0, 0.0, 1.0]])
+        self.assertIsNone(sample_layout([bank] * 2, np.random.default_rng(0), 0.5, 20))
+
+    def test_at_rest(self):
+        previous = np.tile(np.eye(4), (2, 1, 1))
+        current = previous.copy()
+        current[0, :3, 3] = [0.0005, 0, 0]
+        self.assertTrue(at_rest(previous, current, 0.001, 0.01))
+        current[1, :3, 3] = [0, 0.002, 0]
+        self.assertFalse(at_rest(previous, current, 0.001, 0.01))
+
+    def test_at_rest_turned(self):
+        previous = np.eye(4)[None]
+        current = np.eye(4)[None].copy()
+        current[0, :3, :3] = euler_matrix([0, 0, 0.05])
+        self.assertFalse(at_rest(previous, current, 0.001, 0.01))
+        self.assertTrue(at_rest(previous, current, 0.001, 0.1))
+
+    def test_at_rest_scaled(self):
+        previous = np.diag([2.0, 2.0, 2.0, 1.0])[None]
+        self.assertTrue(at_rest(previous, previous.copy(), 0.001, 0.01))
+
+
+if __name__ == '__main__':
+    unittest.main(argv=sys.argv[0:1])
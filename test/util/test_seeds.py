@@ -0,0 +1,38 @@
+import sys
+import unittest
+
+src_dir = "/workdir"
+sys.path.insert(1, src_dir)
+
+from src.util import seeds  # noqa: E402
+
+
+class SeedsTestCase(unittest.TestCase):
+
+    def test_resolve_seed(self):
+        self.assertEqual(420, seeds.resolve_seed(420))
+        self.assertIsInstance(seeds.resolve_seed(None), int)
+
+    def test_image_generator_repeatable(self):
+        first = seeds.image_generator(420, 7, seeds.POSES).uniform(size=3)
+        again = seeds.image_generator(420, 7, seeds.POSES).uniform(size=3)
+        self.assertEqual(first.tolist(), again.tolist())
+
+    def test_image_generators_independent(self):
+        draws = [seeds.image_generator(420, image, stream).uniform()
+                 for image in range(3) for stream in [seeds.BACKGROUND, seeds.POSES]]
+        self.assertEqual(6, len(set(draws)))
+
+    def test_object_generator(self):
+        self.assertEqual(seeds.object_generator(420, 2).integers(1000000),
+                         seeds.object_generator(420, 2).integers(1000000))
+        self.assertNotEqual(seeds.object_generator(420, 2).uniform(),
+                            seeds.make_generator(420, seeds.IMAGES, 2).uniform())
+
+    def test_run_seed(self):
+        self.assertNotEqual(seeds.image_generator(420, 0, seeds.POSES).uniform(),
+                            seeds.image_generator(421, 0, seeds.POSES).uniform())
+
+
+if __name__ == '__main__':
+    unittest.main(argv=sys.argv[0:1])
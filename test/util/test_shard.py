@@ -0,0 +1,39 @@
+import sys
+import unittest
+
+src_dir = "/workdir"
+sys.path.insert(1, src_dir)
+
+from src.util import shard  # noqa: E402
+
+
+class ShardTestCase(unittest.TestCase):
+
+    def test_split_range(self):
+        self.assertEqual([(0, 4), (4, 3), (7, 3)], shard.split_range(10, 3))
+
+    def test_split_range_small(self):
+        self.assertEqual([(0, 1), (1, 1)], shard.split_range(2, 4))
+
+    def test_shard_arguments(self):
+        args = shard.shard_arguments(['-i', '10', '-si', '5'], 1, (4, 3), 7)
+        parsed_args = shard.Parser().parse_args(args)
+        self.assertEqual(9, parsed_args.start_index)
+        self.assertEqual(3, parsed_args.image_count)
+        self.assertEqual(7, parsed_args.seed)
+        self.assertEqual('images/shard_1/', parsed_args.output_location)
+
+    def test_shard_arguments_run_seed(self):
+        run_args = ['-i', '10', '-s', '42']
+        for index, (start_index, image_count) in enumerate(shard.split_range(10, 3)):
+            args = shard.shard_arguments(run_args, index, (start_index, image_count), 42)
+            self.assertEqual(42, shard.Parser().parse_args(args).seed)
+
+    def test_parse_shard_args(self):
+        shard_count, args = shard.parse_shard_args(['-k', '4', '--', '-i', '10'])
+        self.assertEqual(4, shard_count)
+        self.assertEqual(['-i', '10'], args)
+
+
+if __name__ == '__main__':
+    unittest.main(argv=sys.argv[0:1])